@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+action_space.py - Compact, integer-indexed combo action space.
+
+The agent's actions are all combinations of 1..max_combo "singles"
+(attack_obj, pps, threads, power, duration). Their number grows
+combinatorially, so ActionSpace never materializes them: an action is an
+integer rank, and the combination tuple is rebuilt on demand by unranking.
+Ranks follow the order the old list had (itertools.combinations for r=1,
+then r=2, ...), and the tuples are the same (attack_obj, pps, thr, pw, dur)
+slots main_loop and report.py already consume.
+"""
+
+import itertools
+from math import comb
+
+
+class ActionSpace:
+    def __init__(self, attack_classes, pps_levels, threads_levels,
+                 power_levels, duration_levels, max_combo):
+        self.singles = []
+        for cls in attack_classes:
+            obj = cls()
+            for pps, thr, pw, dur in itertools.product(
+                    pps_levels, threads_levels, power_levels, duration_levels):
+                self.singles.append((obj, pps, thr, pw, dur))
+        # keyed by attack name, not object identity: combos from another
+        # ActionSpace with the same signature (e.g. a second agent) resolve too
+        self._single_index = {_single_key(single): i for i, single in enumerate(self.singles)}
+        self.max_combo = max_combo
+        n = len(self.singles)
+        # offsets[r-1] = rank of the first combination of size r
+        self.offsets = []
+        total = 0
+        for r in range(1, max_combo + 1):
+            self.offsets.append(total)
+            total += comb(n, r)
+        self._len = total
+
+    def signature(self):
+        """JSON-friendly description; equal signatures mean equal rank numbering."""
+        return {
+            "singles": [[obj.name, pps, thr, pw, dur] for obj, pps, thr, pw, dur in self.singles],
+            "max_combo": self.max_combo,
+        }
+
+    def __len__(self):
+        return self._len
+
+    def __iter__(self):
+        for r in range(1, self.max_combo + 1):
+            yield from itertools.combinations(self.singles, r)
+
+    def __getitem__(self, rank):
+        if rank < 0:
+            rank += self._len
+        if not 0 <= rank < self._len:
+            raise IndexError("action rank out of range")
+        return tuple(self.singles[i] for i in self.unrank(rank))
+
+    def unrank(self, rank):
+        """Rank -> increasing tuple of single indices."""
+        r = 1
+        while r < self.max_combo and rank >= self.offsets[r]:
+            r += 1
+        rank -= self.offsets[r - 1]
+        n = len(self.singles)
+        out = []
+        start = 0
+        for k in range(r, 0, -1):
+            for i in range(start, n):
+                block = comb(n - i - 1, k - 1)
+                if rank < block:
+                    out.append(i)
+                    start = i + 1
+                    break
+                rank -= block
+        return tuple(out)
+
+    def rank(self, indices):
+        """Increasing tuple of single indices -> rank."""
+        r = len(indices)
+        n = len(self.singles)
+        rank = self.offsets[r - 1]
+        prev = -1
+        for pos, i in enumerate(indices):
+            k = r - pos
+            for j in range(prev + 1, i):
+                rank += comb(n - j - 1, k - 1)
+            prev = i
+        return rank
+
+    def index(self, combo):
+        """Combination tuple (as returned by [] or select_action) -> rank."""
+        try:
+            indices = sorted(self._single_index[_single_key(single)] for single in combo)
+        except (KeyError, AttributeError, TypeError, ValueError):
+            raise ValueError("combo is not part of this action space")
+        if not 1 <= len(indices) <= self.max_combo:
+            raise ValueError("combo size outside 1..max_combo")
+        if len(set(indices)) != len(indices):
+            raise ValueError("combo repeats a slot")
+        return self.rank(tuple(indices))
+
+
+def _single_key(single):
+    obj, pps, thr, pw, dur = single
+    return obj.name, pps, thr, pw, dur
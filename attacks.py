@@ -14,11 +14,14 @@ add the corresponding Attack subclasses.
 """
 
 import os
+import shlex
 import threading
 import subprocess
 import signal
 import time
 
+from instrument import traced
+
 DEVNULL = subprocess.DEVNULL  # for brevity output redirection
 
 
@@ -41,8 +44,26 @@ class Attack:
         """
         raise NotImplementedError("Must override build_command in subclass")
 
+    def build_argv(self, **kwargs):
+        """build_command(...) as an argv list for ProcessSupervisor (no shell)."""
+        return shlex.split(self.build_command(**kwargs))
+
+    @traced("attack.run")
     def run(self, pps_level=1, power_level=1, duration_level=1,
-            threads_level=1, **kwargs):
+            threads_level=1, supervisor=None, **kwargs):
+        """
+        Starts threads_level instances. With a supervisor.ProcessSupervisor
+        they are its processes and their handles are returned; otherwise each
+        runs in a thread (stopped by stop_all_attacks) and the threads are returned.
+        """
+        if supervisor is not None:
+            argv = self.build_argv(pps_level=pps_level, power_level=power_level,
+                                   duration_level=duration_level, **kwargs)
+            handles = []
+            for i in range(threads_level):
+                print(f"[ATTACK] {self.name} (instance {i + 1}): {' '.join(argv)}")
+                handles.append(supervisor.start(argv, name=self.name))
+            return handles
         threads = []
         for i in range(threads_level):
             t = threading.Thread(
@@ -170,6 +191,11 @@ class RTSCTSFlood(Attack):
         return f"sudo mdk4 {interface} z"
 
 
+# every attack the agent chooses from, in action-space order
+ATTACK_CLASSES = [DeauthFlood, BeaconFlood, AuthDOS, DeauthFloodMDK,
+                  EAPOLStartFlood, WIDSConfusion, RTSCTSFlood]
+
+
 def stop_all_attacks():
     """
     pkill aireplay-ng & pkill mdk4 
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+batch.py - Parallel offline analysis of an archive of captures.
+
+Spreads TrafficAnalyzer feature extraction over a process pool, either one
+task per file or several byte-range tasks per file (see MappedCapture.split),
+and merges the per-chunk counters in a fixed (path, offset) order so the
+result does not depend on scheduling.
+
+Usage: python batch.py captures/*.pcap --workers 8 --chunking range
+"""
+
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from pcap_reader import MappedCapture, PcapFormatError
+from traffic_analyzer import TrafficAnalyzer
+
+
+def analyze_chunk(task):
+    """Worker: analyzes one (path, start, end) task and returns its counters."""
+    path, start, end, bssid, engine = task
+    analyzer = TrafficAnalyzer(pcap_file=path, bssid=bssid, engine=engine)
+    analyzer.analyze_offline(start, end)
+    return analyzer.get_counters()
+
+
+def plan_tasks(paths, bssid="", engine="native", chunking="file", parts=1):
+    """
+    Builds the task list. With chunking="range" each native-readable file is
+    split into up to `parts` record-aligned byte ranges; everything else
+    (scapy engine, unknown formats) is analyzed as a whole file.
+    """
+    tasks = []
+    for path in paths:
+        ranges = [(None, None)]
+        if chunking == "range" and engine == "native" and parts > 1:
+            try:
+                with MappedCapture(path) as cap:
+                    ranges = cap.split(parts) or ranges
+            except (OSError, PcapFormatError) as e:
+                print(f"[WARN] {path}: byte-range split unavailable ({e}), analyzing whole file.")
+        for start, end in ranges:
+            tasks.append((path, start, end, bssid, engine))
+    return tasks
+
+
+def merge_counters(chunks):
+    """
+    Sums counters of several chunks. handshake_detected is recomputed from
+    the merged eapol_count so a split file gives the same answer as a
+    serial pass over it.
+    """
+    merged = {
+        "packet_count": 0,
+        "fallback_count": 0,
+        "eapol_count": 0,
+        "handshake_detected": 0,
+        "subtype_counts": {},
+    }
+    for counters in chunks:
+        for key in ("packet_count", "fallback_count", "eapol_count"):
+            merged[key] += counters[key]
+        for subtype, n in counters["subtype_counts"].items():
+            merged["subtype_counts"][subtype] = merged["subtype_counts"].get(subtype, 0) + n
+    merged["handshake_detected"] = int(merged["eapol_count"] > 3)
+    merged["subtype_counts"] = dict(sorted(merged["subtype_counts"].items()))
+    return merged
+
+
+def analyze_captures(paths, bssid="", workers=None, chunking="file", engine="native"):
+    """
+    Analyzes every capture in paths in parallel.
+    Returns {"files": {path: counters}, "total": counters} where "total" also
+    carries the number of files with a detected handshake.
+    """
+    workers = workers or os.cpu_count() or 1
+    paths = sorted(set(paths))
+    tasks = plan_tasks(paths, bssid, engine, chunking, parts=workers)
+    if workers == 1 or len(tasks) == 1:
+        results = [analyze_chunk(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(analyze_chunk, tasks))
+
+    per_file = {}
+    for task, counters in zip(tasks, results):
+        per_file.setdefault(task[0], []).append(counters)
+    files = {path: merge_counters(per_file[path]) for path in paths}
+    total = merge_counters(files.values())
+    total["handshake_files"] = sum(c["handshake_detected"] for c in files.values())
+    return {"files": files, "total": total}
+
+
+def _jsonable(counters):
+    out = dict(counters)
+    out["subtype_counts"] = {f"{t}.{s}": n for (t, s), n in counters["subtype_counts"].items()}
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch-analyse archived captures.")
+    parser.add_argument("paths", nargs="+", help="pcap/pcapng files")
+    parser.add_argument("--bssid", default="")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunking", choices=("file", "range"), default="file")
+    parser.add_argument("--engine", choices=("native", "scapy"), default="native")
+    parser.add_argument("--json", dest="json_out", default=None, help="write results to this file")
+    args = parser.parse_args()
+
+    result = analyze_captures(args.paths, args.bssid, args.workers, args.chunking, args.engine)
+    for path, counters in result["files"].items():
+        print(f"[BATCH] {path}: packets={counters['packet_count']}, "
+              f"eapol={counters['eapol_count']}, handshake={counters['handshake_detected']}")
+    total = result["total"]
+    print(f"[BATCH] total: files={len(result['files'])}, packets={total['packet_count']}, "
+          f"eapol={total['eapol_count']}, handshake_files={total['handshake_files']}")
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump({"files": {p: _jsonable(c) for p, c in result["files"].items()},
+                       "total": _jsonable(total)}, f, indent=2)
+        print(f"[INFO] Batch results: {args.json_out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,690 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+benchmarks.py - Offline micro-benchmarks for the analysis hot paths.
+
+Everything runs on synthetic data (pcaps, airodump CSVs, SimulatedEnv), so
+the numbers are reproducible without a radio. The regression suite
+(SUITE) reports flat metrics - names ending in "_per_s" are rates (higher
+is better), names ending in "_s" are seconds (lower is better) - which
+can be written as JSON and compared against a stored baseline:
+
+    python benchmarks.py --json bench.json                 # record a baseline
+    python benchmarks.py --baseline bench.json --tolerance 0.25
+    python benchmarks.py --only agent_ops report --quick
+    python benchmarks.py --extra                           # exploratory comparisons too
+
+Comparing exits with status 1 when a metric got worse than the tolerance.
+"""
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from batch import analyze_captures
+from features import window_features, window_features_loop
+from latency_hist import LatencyHistogram
+from action_space import ActionSpace
+from ml_core import QLearningAgent
+from attacks import ATTACK_CLASSES
+from pcap_reader import MappedCapture
+from synthetic import write_synthetic_pcap
+from traffic_analyzer import TrafficAnalyzer
+
+
+def _time_engine(path, engine):
+    analyzer = TrafficAnalyzer(pcap_file=path, bssid="aa:bb:cc:dd:ee:ff", engine=engine)
+    start = time.perf_counter()
+    analyzer.analyze_offline()
+    elapsed = time.perf_counter() - start
+    pps = analyzer.packet_count / elapsed if elapsed else 0.0
+    print(f"[BENCH] pcap {engine}: {analyzer.packet_count} pkts in {elapsed:.3f}s "
+          f"-> {pps:,.0f} pkts/s, features={analyzer.get_features()}")
+    return pps, analyzer.get_features()
+
+
+def bench_pcap_streaming(count=5000):
+    """
+    Packets/sec of TrafficAnalyzer.analyze_offline on a synthetic pcap for
+    the native and scapy engines; checks both yield the same features.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        path = write_synthetic_pcap(os.path.join(tmp, "synthetic.pcap"), count=count)
+        native_pps, native_features = _time_engine(path, "native")
+        scapy_pps, scapy_features = _time_engine(path, "scapy")
+    if scapy_pps:
+        if native_features != scapy_features:
+            print(f"[WARN] engine mismatch: native={native_features} scapy={scapy_features}")
+        print(f"[BENCH] native speedup over scapy: {native_pps / scapy_pps:.0f}x")
+    return native_pps, scapy_pps
+
+
+def bench_mmap_reader(count=200000, parts=4):
+    """Records/sec of the mmap reader over a whole file and over split ranges."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = write_synthetic_pcap(os.path.join(tmp, "synthetic.pcap"), count=count)
+        size_mb = os.path.getsize(path) / 2**20
+        with MappedCapture(path) as cap:
+            start = time.perf_counter()
+            total = sum(1 for _ in cap.records())
+            whole = time.perf_counter() - start
+            split = sum(sum(1 for _ in cap.records(lo, hi)) for lo, hi in cap.split(parts))
+    rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"[BENCH] mmap reader: {total} records ({size_mb:.0f} MB) in {whole:.3f}s "
+          f"-> {total / whole:,.0f} rec/s, {parts}-way split={split}, peak RSS={rss_mb:.0f} MB")
+    return total / whole
+
+
+def bench_batch_scaling(count=400000, max_workers=None):
+    """Wall-clock of batch.analyze_captures with byte-range chunking per worker count."""
+    max_workers = max_workers or os.cpu_count() or 1
+    timings = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = write_synthetic_pcap(os.path.join(tmp, "synthetic.pcap"), count=count)
+        workers = 1
+        while workers <= max_workers:
+            start = time.perf_counter()
+            analyze_captures([path], workers=workers, chunking="range")
+            timings[workers] = time.perf_counter() - start
+            print(f"[BENCH] batch workers={workers}: {timings[workers]:.2f}s "
+                  f"(speedup {timings[1] / timings[workers]:.2f}x)")
+            workers *= 2
+    return timings
+
+
+def bench_window_features(count=200000, window=0.5):
+    """Vectorized window_features against the per-frame Python loop."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = write_synthetic_pcap(os.path.join(tmp, "synthetic.pcap"), count=count)
+        analyzer = TrafficAnalyzer(pcap_file=path, bssid="aa:bb:cc:dd:ee:ff", collect_frames=True)
+        analyzer.analyze_offline()
+    columns = analyzer.frames.arrays()
+    lists = [col.tolist() for col in columns]
+    start = time.perf_counter()
+    window_features(*columns, window=window)
+    vec = time.perf_counter() - start
+    start = time.perf_counter()
+    window_features_loop(*lists, window=window)
+    loop = time.perf_counter() - start
+    print(f"[BENCH] window features: {len(lists[0])} frames, numpy {vec * 1e3:.1f} ms, "
+          f"python loop {loop * 1e3:.1f} ms ({loop / vec:.1f}x)")
+    return vec, loop
+
+
+def bench_latency_record(samples=1000000):
+    """Per-sample cost of LatencyHistogram.record against a plain list append."""
+    values = [0.0005 * (i % 4000) for i in range(samples)]
+    hist = LatencyHistogram()
+    start = time.perf_counter()
+    for v in values:
+        hist.record(v)
+    rec = time.perf_counter() - start
+    plain = []
+    start = time.perf_counter()
+    for v in values:
+        plain.append(v)
+    base = time.perf_counter() - start
+    print(f"[BENCH] latency record: {rec / samples * 1e9:.0f} ns/sample "
+          f"(list append {base / samples * 1e9:.0f} ns), {len(hist.counts)} buckets")
+    return rec / samples
+
+
+def _materialized_actions(levels, max_combo):
+    """The list-of-tuples action space QLearningAgent used to build."""
+    singles = [(cls(), *lv) for cls in ATTACK_CLASSES for lv in itertools.product(*levels)]
+    combos = []
+    for r in range(1, max_combo + 1):
+        combos += itertools.combinations(singles, r)
+    return combos
+
+
+def _measure_alloc(build):
+    tracemalloc.start()
+    start = time.perf_counter()
+    obj = build()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return obj, elapsed, peak
+
+
+def bench_action_space(max_combos=(1, 2, 3, 4)):
+    """Startup time and peak memory: materialized combo list vs ActionSpace."""
+    levels = ([1, 2, 3], [1, 2], [1], [1, 2])
+    rows = []
+    for max_combo in max_combos:
+        combos, list_t, list_mem = _measure_alloc(lambda: _materialized_actions(levels, max_combo))
+        n = len(combos)
+        del combos
+        space, lazy_t, lazy_mem = _measure_alloc(lambda: ActionSpace(ATTACK_CLASSES, *levels, max_combo))
+        print(f"[BENCH] actions max_combo={max_combo}: {n} combos, list {list_t * 1e3:.1f} ms / "
+              f"{list_mem / 2**20:.1f} MB, ActionSpace {lazy_t * 1e3:.2f} ms / {lazy_mem / 2**10:.0f} KB")
+        rows.append((max_combo, n, list_t, list_mem, lazy_t, lazy_mem))
+    return rows
+
+
+def bench_q_backends(max_combos=(1, 2, 3), ops=20000, n_states=20, warmup=20000):
+    """select_action / update_q / update_q_batch throughput per Q backend and action-space size."""
+    import random
+    results = {}
+    for max_combo in max_combos:
+        for backend in ("dict", "dense"):
+            random.seed(0)
+            agent = QLearningAgent(attack_classes=ATTACK_CLASSES, pps_levels=[1, 2],
+                                   threads_levels=[1, 2], power_levels=[1], duration_levels=[1, 2],
+                                   max_combo=max_combo, epsilon_start=0.0, epsilon_end=0.0,
+                                   q_backend=backend)
+            n = len(agent.actions)
+            states = [(i % 7, i % 2, 0) for i in range(n_states)]
+            for i in range(warmup):
+                agent.update_q(states[i % n_states], random.randrange(n), random.random(),
+                               states[(i + 1) % n_states])
+            start = time.perf_counter()
+            for i in range(ops):
+                agent.select_action(states[i % n_states])
+            select_rate = ops / (time.perf_counter() - start)
+            start = time.perf_counter()
+            for i in range(ops):
+                agent.update_q(states[i % n_states], i % n, 1.0, states[(i + 1) % n_states])
+            update_rate = ops / (time.perf_counter() - start)
+            batch = [states[i % n_states] for i in range(ops)]
+            nxt = [states[(i + 1) % n_states] for i in range(ops)]
+            acts = [i % n for i in range(ops)]
+            start = time.perf_counter()
+            agent.update_q_batch(batch, acts, [1.0] * ops, nxt)
+            batch_rate = ops / (time.perf_counter() - start)
+            print(f"[BENCH] Q {backend:<5} actions={n:>6}: select {select_rate:,.0f}/s, "
+                  f"update {update_rate:,.0f}/s, batch update {batch_rate:,.0f}/s")
+            results[(backend, n)] = (select_rate, update_rate, batch_rate)
+    return results
+
+
+def bench_replay_buffer(sizes=(1000, 100000), samples=2000, batch=32):
+    """Replay add/sample rates, uniform vs prioritized, for growing buffer sizes."""
+    from replay_buffer import ReplayBuffer
+    results = {}
+    for capacity in sizes:
+        for prioritized in (False, True):
+            buf = ReplayBuffer(capacity, prioritized=prioritized, seed=0)
+            start = time.perf_counter()
+            for i in range(capacity):
+                buf.add((i % 7, i % 2, 0), i % 50, 1.0, ((i + 1) % 7, 0, 0))
+            add_rate = capacity / (time.perf_counter() - start)
+            start = time.perf_counter()
+            for _ in range(samples):
+                idx = buf.sample(batch)[0]
+                buf.update_priorities(idx, [0.5] * batch)
+            sample_rate = samples / (time.perf_counter() - start)
+            mode = "prioritized" if prioritized else "uniform"
+            print(f"[BENCH] replay {mode:<11} capacity={capacity:>7}: add {add_rate:,.0f}/s, "
+                  f"sample+update {sample_rate:,.0f} batches/s, {buf.nbytes() / 1024:,.0f} KiB")
+            results[(mode, capacity)] = (add_rate, sample_rate)
+    return results
+
+
+def bench_sim_env(steps=200000, episodes=5000):
+    """Raw SimulatedEnv step rate and full agent training rate per Q backend."""
+    import random
+    from sim_env import SimulatedEnv, run_training
+    space = ActionSpace(ATTACK_CLASSES, [1, 2], [1, 2], [1], [1, 2], 2)
+    combos = [space[i] for i in range(0, len(space), 7)]
+    env = SimulatedEnv(seed=0)
+    env.reset()
+    start = time.perf_counter()
+    for i in range(steps):
+        env.step(combos[i % len(combos)])
+    env_rate = steps / (time.perf_counter() - start)
+    print(f"[BENCH] sim env: {env_rate:,.0f} steps/s ({env_rate * 60 / 1e6:.1f}M steps/min)")
+    results = {"env": env_rate}
+    for backend in ("dict", "dense"):
+        random.seed(0)
+        agent = QLearningAgent(attack_classes=ATTACK_CLASSES, pps_levels=[1, 2],
+                               threads_levels=[1, 2], power_levels=[1], duration_levels=[1, 2],
+                               max_combo=2, q_backend=backend)
+        start = time.perf_counter()
+        run_training(agent, SimulatedEnv(seed=0), episodes, 3)
+        rate = episodes * 3 / (time.perf_counter() - start)
+        print(f"[BENCH] sim training {backend:<5}: {rate:,.0f} agent steps/s")
+        results[backend] = rate
+    return results
+
+
+def bench_vector_env(env_counts=(1, 64, 1024), steps=30000):
+    """Vectorized training throughput (env steps/s) for growing numbers of envs."""
+    from vector_env import VectorSimEnv, train_vectorized
+    results = {}
+    for n_envs in env_counts:
+        agent = QLearningAgent(attack_classes=ATTACK_CLASSES, pps_levels=[1, 2],
+                               threads_levels=[1, 2], power_levels=[1], duration_levels=[1, 2],
+                               max_combo=2, q_backend="dense")
+        env = VectorSimEnv(agent.actions, n_envs=n_envs, seed=0)
+        episodes = max(1, steps // (3 * n_envs))
+        start = time.perf_counter()
+        train_vectorized(agent, env, episodes, 3, seed=0)
+        rate = episodes * 3 * n_envs / (time.perf_counter() - start)
+        print(f"[BENCH] vector training envs={n_envs:>5}: {rate:,.0f} env steps/s")
+        results[n_envs] = rate
+    return results
+
+
+def bench_fa_agent(episodes=3000, batch=1024, n_features=41):
+    """
+    Tabular vs linear / tile-coded agents on SimulatedEnv: training rate,
+    mean reward of the last 10% of episodes and parameter memory; plus the
+    batched update rate of the linear agent on feature-vector-sized states.
+    """
+    import random
+    import numpy as np
+    from fa_agent import LinearQAgent
+    from sim_env import SimulatedEnv, run_training
+    kw = dict(attack_classes=ATTACK_CLASSES, pps_levels=[1, 2], threads_levels=[1, 2],
+              power_levels=[1], duration_levels=[1, 2], max_combo=2)
+    agents = {
+        "tabular dict": lambda: QLearningAgent(**kw),
+        "tabular dense": lambda: QLearningAgent(q_backend="dense", **kw),
+        "linear": lambda: LinearQAgent(q_init=500.0, seed=0, **kw),
+        "tiles": lambda: LinearQAgent(approx="tiles", low=[0, 0, 0], high=[8, 1, 1],
+                                      q_init=500.0, seed=0, **kw),
+    }
+    results = {}
+    for name, make in agents.items():
+        random.seed(0)
+        agent = make()
+        start = time.perf_counter()
+        rewards = run_training(agent, SimulatedEnv(seed=0), episodes, 3)
+        rate = episodes * 3 / (time.perf_counter() - start)
+        tail = rewards[-max(1, episodes // 10):]
+        if isinstance(agent, LinearQAgent):
+            params = agent.W.nbytes
+        elif agent.q_backend == "dense":
+            params = agent.Q.q[:len(agent.Q.states())].nbytes
+        else:
+            params = sum(len(row) for row in agent.Q.table.values()) * 8
+        print(f"[BENCH] agent {name:<13}: {rate:,.0f} steps/s, final reward {sum(tail) / len(tail):.2f}, "
+              f"params {params / 1024:,.0f} KiB")
+        results[name] = (rate, sum(tail) / len(tail))
+
+    agent = LinearQAgent(n_features=n_features, seed=0, **kw)
+    rng = np.random.default_rng(0)
+    states = rng.random((batch, n_features))
+    next_states = rng.random((batch, n_features))
+    actions = rng.integers(0, len(agent.actions), batch).tolist()
+    rewards = rng.random(batch)
+    start = time.perf_counter()
+    for _ in range(10):
+        agent.update_q_batch(states, actions, rewards, next_states)
+    rate = 10 * batch / (time.perf_counter() - start)
+    print(f"[BENCH] linear agent {n_features}-feature batched update: {rate:,.0f} transitions/s")
+    results["linear batch"] = rate
+    return results
+
+
+def bench_metrics(sizes=(1000, 100000, 1000000)):
+    """Full-rescan calculate_metrics vs streaming counter query vs vectorized batch."""
+    import random
+    import numpy as np
+    from metrics import calculate_metrics, ConfusionCounter, batch_metrics
+    rng = random.Random(0)
+    results = {}
+    for n in sizes:
+        history = [(rng.randint(0, 1), 1) for _ in range(n)]
+        start = time.perf_counter()
+        calculate_metrics(history)
+        rescan = time.perf_counter() - start
+        counter = ConfusionCounter()
+        start = time.perf_counter()
+        for pred, true in history:
+            counter.update(pred, true)
+        update = (time.perf_counter() - start) / n
+        start = time.perf_counter()
+        counter.metrics()
+        query = time.perf_counter() - start
+        pairs = np.array(history, dtype=np.int8)
+        start = time.perf_counter()
+        batch_metrics(pairs)
+        batch = time.perf_counter() - start
+        print(f"[BENCH] metrics n={n:>8}: rescan {rescan * 1e3:.2f} ms, streaming update "
+              f"{update * 1e9:.0f} ns + query {query * 1e6:.1f} us, batch {batch * 1e3:.2f} ms")
+        results[n] = (rescan, update, query, batch)
+    return results
+
+
+def bench_instrument(calls=200000):
+    """Per-call cost of @traced and span() while disabled and enabled vs a plain call."""
+    import instrument
+
+    def plain(x):
+        return x + 1
+
+    traced = instrument.traced("bench.call")(plain)
+
+    def spanned(x):
+        with instrument.span("bench.span"):
+            return x + 1
+
+    def per_call(fn):
+        start = time.perf_counter()
+        for i in range(calls):
+            fn(i)
+        return (time.perf_counter() - start) / calls
+
+    was_enabled = instrument.enabled()
+    instrument.disable()
+    base = per_call(plain)
+    results = {"plain": base, "traced_off": per_call(traced), "span_off": per_call(spanned)}
+    instrument.reset()
+    instrument.enable(max_events=calls)
+    results["traced_on"] = per_call(traced)
+    results["span_on"] = per_call(spanned)
+    instrument.reset()
+    if not was_enabled:
+        instrument.disable()
+    print(f"[BENCH] instrument: plain {base * 1e9:.0f} ns/call; overhead "
+          + ", ".join(f"{k} +{(v - base) * 1e9:.0f} ns" for k, v in results.items() if k != "plain"))
+    return results
+
+
+# ---------------------------------------------------------------------------
+# Regression suite: flat {metric: value} results, best of `repeat` runs
+# ---------------------------------------------------------------------------
+
+def _best_of(fn, repeat):
+    """Smallest wall-clock seconds of `repeat` calls of fn()."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def suite_pcap_parse(repeat=3, quick=False):
+    """analyze_offline (native engine) and the raw mmap record walk on a synthetic pcap."""
+    count = 20000 if quick else 200000
+    with tempfile.TemporaryDirectory() as tmp:
+        path = write_synthetic_pcap(os.path.join(tmp, "synthetic.pcap"), count=count)
+        analyzer = TrafficAnalyzer(pcap_file=path, bssid="aa:bb:cc:dd:ee:ff", engine="native")
+        parse = _best_of(analyzer.analyze_offline, repeat)
+        with MappedCapture(path) as cap:
+            walk = _best_of(lambda: sum(1 for _ in cap.records()), repeat)
+    return {"pcap_native_pkts_per_s": count / parse, "pcap_mmap_records_per_s": count / walk}
+
+
+def suite_station_csv(repeat=3, quick=False):
+    """
+    Station counting on synthetic airodump CSV sequences: a full csv-module
+    parse per snapshot (parse_station_count) against StationTracker's
+    incremental re-read of the same rewrites.
+    """
+    from synthetic import write_airodump_sequence
+    from station_tracker import StationTracker, parse_station_csv, parse_seen_time
+    bssid = "aa:bb:cc:dd:ee:ff"
+    steps = 10 if quick else 30
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for stations in (20, 2000):
+            directory = os.path.join(tmp, str(stations))
+            os.mkdir(directory)
+            paths = write_airodump_sequence(directory, bssid=bssid, steps=steps, stations=stations)
+            full = _best_of(lambda: [parse_station_csv(p, bssid) for p in paths], repeat)
+
+            def track():
+                parse_seen_time.cache_clear()  # cold, like a fresh run
+                tracker = StationTracker(bssid)
+                for p in paths:
+                    tracker.csv_path = p  # each snapshot stands for one airodump rewrite
+                    tracker.snapshot()
+
+            tracked = _best_of(track, repeat)
+            results[f"station_csv_full_{stations}_per_s"] = steps / full
+            results[f"station_csv_tracker_{stations}_per_s"] = steps / tracked
+    return results
+
+
+def suite_agent_ops(repeat=3, quick=False):
+    """select_action / update_q rate of both Q backends against the action-space size."""
+    import random
+    ops = 2000 if quick else 20000
+    states = [(i % 7, i % 2, 0) for i in range(20)]
+    results = {}
+    for max_combo in (1, 2, 3):
+        for backend in ("dict", "dense"):
+            random.seed(0)
+            agent = QLearningAgent(attack_classes=ATTACK_CLASSES, pps_levels=[1, 2],
+                                   threads_levels=[1, 2], power_levels=[1], duration_levels=[1, 2],
+                                   max_combo=max_combo, epsilon_start=0.0, epsilon_end=0.0,
+                                   q_backend=backend)
+            n = len(agent.actions)
+            for i in range(ops):
+                agent.update_q(states[i % 20], random.randrange(n), random.random(), states[(i + 1) % 20])
+
+            def select():
+                for i in range(ops):
+                    agent.select_action(states[i % 20])
+
+            def update():
+                for i in range(ops):
+                    agent.update_q(states[i % 20], i % n, 1.0, states[(i + 1) % 20])
+
+            results[f"agent_{backend}_{n}_select_per_s"] = ops / _best_of(select, repeat)
+            results[f"agent_{backend}_{n}_update_per_s"] = ops / _best_of(update, repeat)
+    return results
+
+
+def suite_metrics(repeat=3, quick=False):
+    """calculate_metrics on long histories, and the streaming counter that replaces the rescan."""
+    import random
+    from metrics import calculate_metrics, ConfusionCounter
+    rng = random.Random(0)
+    results = {}
+    for n in ((10000, 100000) if quick else (10000, 1000000)):
+        history = [(rng.randint(0, 1), rng.randint(0, 1)) for _ in range(n)]
+        results[f"calculate_metrics_{n}_s"] = _best_of(lambda: calculate_metrics(history), repeat)
+        counter = ConfusionCounter()
+
+        def stream():
+            for pred, true in history:
+                counter.update(pred, true)
+            counter.metrics()
+
+        results[f"confusion_counter_{n}_s"] = _best_of(stream, repeat)
+    return results
+
+
+def suite_report(repeat=3, quick=False):
+    """generate_html on large success-step lists (browser launch disabled)."""
+    import contextlib
+    import io
+    from report import generate_html
+    space = ActionSpace(ATTACK_CLASSES, [1, 2], [1, 2], [1], [1, 2], 2)
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "report.html")
+        for n in ((1000, 10000) if quick else (1000, 100000)):
+            steps = [(i // 3 + 1, i % 3 + 1, space[(i * 7919) % len(space)]) for i in range(n)]
+            best = space[0]
+
+            def render():
+                with contextlib.redirect_stdout(io.StringIO()):
+                    generate_html(steps, best, filename=path, open_browser=False)
+
+            results[f"generate_html_{n}_s"] = _best_of(render, repeat)
+    return results
+
+
+def suite_sim_env(repeat=3, quick=False):
+    """SimulatedEnv step rate and tabular training rate on it."""
+    import random
+    from sim_env import SimulatedEnv, run_training
+    steps = 20000 if quick else 200000
+    episodes = 500 if quick else 5000
+    space = ActionSpace(ATTACK_CLASSES, [1, 2], [1, 2], [1], [1, 2], 2)
+    combos = [space[i] for i in range(0, len(space), 7)]
+
+    def env_steps():
+        env = SimulatedEnv(seed=0)
+        env.reset()
+        for i in range(steps):
+            env.step(combos[i % len(combos)])
+
+    def train():
+        random.seed(0)
+        agent = QLearningAgent(attack_classes=ATTACK_CLASSES, pps_levels=[1, 2],
+                               threads_levels=[1, 2], power_levels=[1], duration_levels=[1, 2],
+                               max_combo=2, q_backend="dense")
+        run_training(agent, SimulatedEnv(seed=0), episodes, 3)
+
+    return {"sim_env_steps_per_s": steps / _best_of(env_steps, repeat),
+            "sim_train_steps_per_s": episodes * 3 / _best_of(train, repeat)}
+
+
+def suite_step_time(repeat=3, quick=False):
+    """
+    Wall-clock time of one main_loop step, with every phase replaced by a
+    sleep of its real length times `scale`, reported in real-step seconds:
+    the old sequential step (attack 3, capture 2, 5 s airodump scan + 1 s
+    settle, probe 1, cooldown 2), the shared StepScheduler window with that
+    scan, and the shared window with the long-lived StationTracker.
+    """
+    from main import STATION_WINDOW
+    from scheduler import StepScheduler
+    scale = 0.02 if quick else 0.05
+    write_interval = 1  # StationTracker's default airodump --write-interval
+
+    def pause(seconds):
+        return lambda: time.sleep(seconds * scale)
+
+    def sequential():
+        for seconds in (3, 2, 5 + 1, 1, 2):
+            pause(seconds)()
+
+    def shared(stations):
+        def step():
+            pause(3)()
+            scheduler.run_window({"capture": pause(2), "stations": pause(stations),
+                                  "probe": pause(1)}, min_duration=2 * scale)
+        return step
+
+    scheduler = StepScheduler()
+    try:
+        results = {
+            "step_sequential_s": _best_of(sequential, repeat) / scale,
+            "step_shared_scan_s": _best_of(shared(5 + 1), repeat) / scale,
+            "step_shared_tracker_s": _best_of(shared(STATION_WINDOW + write_interval), repeat) / scale,
+        }
+    finally:
+        scheduler.close()
+    base = results["step_sequential_s"]
+    for key in ("step_shared_scan_s", "step_shared_tracker_s"):
+        print(f"[INFO] step_time: {key[:-2]} {results[key]:.2f}s vs sequential {base:.2f}s "
+              f"({1.0 - results[key] / base:.0%} shorter)")
+    return results
+
+
+SUITE = {
+    "pcap_parse": suite_pcap_parse,
+    "station_csv": suite_station_csv,
+    "agent_ops": suite_agent_ops,
+    "metrics": suite_metrics,
+    "report": suite_report,
+    "sim_env": suite_sim_env,
+    "step_time": suite_step_time,
+}
+
+EXTRA = [bench_pcap_streaming, bench_mmap_reader, bench_batch_scaling, bench_window_features,
+         bench_latency_record, bench_action_space, bench_q_backends, bench_replay_buffer,
+         bench_sim_env, bench_vector_env, bench_fa_agent, bench_metrics, bench_instrument]
+
+
+def environment():
+    """What the numbers depend on besides the code."""
+    try:
+        import numpy
+        numpy_version = numpy.__version__
+    except ImportError:
+        numpy_version = None
+    return {"python": platform.python_version(), "implementation": platform.python_implementation(),
+            "numpy": numpy_version, "machine": platform.machine(), "system": platform.system(),
+            "cpus": os.cpu_count()}
+
+
+def run_suite(names=None, repeat=3, quick=False):
+    """Runs the selected SUITE entries. Returns the JSON-ready result document."""
+    results = {}
+    for name in names or SUITE:
+        start = time.perf_counter()
+        metrics = SUITE[name](repeat=repeat, quick=quick)
+        for key, value in metrics.items():
+            print(f"[BENCH] {name}: {key} = {value:,.6g}")
+        print(f"[TIMING] {name}: {time.perf_counter() - start:.1f}s")
+        results[name] = metrics
+    return {"created": time.strftime("%Y-%m-%dT%H:%M:%S"), "repeat": repeat, "quick": quick,
+            "environment": environment(), "results": results}
+
+
+def compare(current, baseline, tolerance=0.25):
+    """
+    Metric-by-metric comparison of two result documents. Returns the list of
+    regressions as (benchmark, metric, baseline_value, current_value, change).
+    """
+    if current.get("quick") != baseline.get("quick"):
+        print("[WARN] quick and full runs are being compared; sizes differ")
+    if current.get("environment") != baseline.get("environment"):
+        print("[WARN] baseline was recorded in a different environment")
+    regressions = []
+    for name, metrics in current["results"].items():
+        base_metrics = baseline.get("results", {}).get(name, {})
+        for key, value in metrics.items():
+            base = base_metrics.get(key)
+            if not base:
+                continue
+            change = value / base - 1.0
+            worse = change < -tolerance if key.endswith("_per_s") else change > tolerance
+            tag = "[WARN]" if worse else "[BENCH]"
+            print(f"{tag} {name}: {key} {base:,.6g} -> {value:,.6g} ({change:+.1%})")
+            if worse:
+                regressions.append((name, key, base, value, change))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmark suite on synthetic data.")
+    parser.add_argument("--only", nargs="+", choices=list(SUITE), help="run only these suite entries")
+    parser.add_argument("--repeat", type=int, default=3, help="best of N runs per measurement")
+    parser.add_argument("--quick", action="store_true", help="smaller inputs (smoke test)")
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--baseline", help="compare against a results file written by --json")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed relative slowdown before a metric counts as regressed")
+    parser.add_argument("--extra", action="store_true",
+                        help="also run the exploratory comparisons (printed only)")
+    args = parser.parse_args()
+
+    doc = run_suite(args.only, repeat=args.repeat, quick=args.quick)
+    if args.extra:
+        for bench in EXTRA:
+            bench()
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(doc, f, indent=2, sort_keys=True)
+        print(f"[INFO] Results: {args.json}")
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(doc, baseline, args.tolerance)
+        if regressions:
+            print(f"[ERROR] {len(regressions)} metric(s) regressed by more than {args.tolerance:.0%}")
+            sys.exit(1)
+        print("[INFO] No regressions against the baseline.")
+
+
+if __name__ == "__main__":
+    main()
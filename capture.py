@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+capture.py - Live in-process capture pipeline.
+
+Keeps one capture process running and feeds its pcap stream straight into
+a TrafficAnalyzer's incremental counters, instead of the per-step
+rm / `timeout 2 tcpdump -w file` / re-read round trip. Any pcap byte
+stream works, so a recorded capture piped through os.pipe() can stand in
+for tcpdump.
+"""
+
+import subprocess
+import threading
+
+from instrument import traced
+from pcap_reader import iter_pcap_stream
+
+
+class LiveCapture:
+    def __init__(self, analyzer, stream, proc=None):
+        self.analyzer = analyzer
+        self.stream = stream
+        self.proc = proc
+        self._lock = threading.Lock()
+        self._eof = threading.Event()
+        self._thread = None
+
+    @classmethod
+    def tcpdump(cls, analyzer, interface):
+        """Starts `tcpdump -U -w -` on interface and streams its stdout."""
+        proc = subprocess.Popen(
+            ["sudo", "tcpdump", "-i", interface, "-U", "-w", "-"],
+            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+        )
+        return cls(analyzer, proc.stdout, proc)
+
+    def start(self):
+        self.analyzer.start_window()
+        self._thread = threading.Thread(target=self._reader, daemon=True)
+        self._thread.start()
+        return self
+
+    def _reader(self):
+        try:
+            for ts, linktype, frame in iter_pcap_stream(self.stream):
+                with self._lock:
+                    self.analyzer.process_record(ts, linktype, frame)
+        except Exception as e:
+            print(f"[ERROR] Live capture stream failed: {e}")
+        finally:
+            self._eof.set()
+
+    @property
+    def finished(self):
+        """True once the stream hit EOF (capture process exited or pipe closed)."""
+        return self._eof.is_set()
+
+    def reset(self):
+        """Starts a new measurement window."""
+        with self._lock:
+            self.analyzer.start_window()
+
+    def snapshot(self, vector=False):
+        """Features counted since the last reset; vector=True adds get_feature_vector()."""
+        with self._lock:
+            features = self.analyzer.get_features()
+            features["packet_count"] = self.analyzer.packet_count
+            if vector:
+                features["vector"] = self.analyzer.get_feature_vector()
+        return features
+
+    @traced("capture.window")
+    def window(self, duration, vector=False):
+        """
+        Counts traffic for `duration` seconds and returns its features as soon
+        as the window closes (or earlier, if the stream ends).
+        """
+        self.reset()
+        self._eof.wait(duration)
+        features = self.snapshot(vector)
+        with self._lock:
+            self.analyzer.record_counters()
+        return features
+
+    def wait(self, timeout=None):
+        """Blocks until the stream is exhausted; used when replaying a recorded pcap."""
+        return self._eof.wait(timeout)
+
+    def stop(self, timeout=2.0):
+        if self.proc is not None and self.proc.poll() is None:
+            self.proc.terminate()
+            try:
+                self.proc.wait(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                self.proc.kill()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        try:
+            self.stream.close()
+        except Exception:
+            pass
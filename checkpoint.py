@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+checkpoint.py - Q-table checkpoints for QLearningAgent, with warm start.
+
+A checkpoint is a directory:
+  meta.json        format version, epsilon/alpha/gamma, Q backend, the
+                   action-space signature, the list of states and the
+                   confusion-matrix counts of all recorded outcomes
+  q.npy            dense backend: the (states, actions) float32 table
+  q_rows.npy, q_actions.npy, q_values.npy
+                   dict backend: the visited entries as sparse triplets
+  history.npy      recent (pred, true) pairs, int8 (the totals are in meta.json)
+  success.npy      success_history as (episode, step, action rank)
+
+Arrays are plain .npy files, so the dense table is memory-mapped
+(copy-on-write) on load instead of being read and unpickled. A new
+checkpoint is written next to the old one and swapped in by rename.
+CheckpointWriter snapshots the agent on the caller's thread and writes in
+the background, so main_loop never waits for the disk.
+"""
+
+import json
+import os
+import shutil
+import threading
+from collections import deque
+
+import numpy as np
+
+from metrics import ConfusionCounter
+
+VERSION = 1
+
+
+class CheckpointError(Exception):
+    pass
+
+
+class NoCheckpointError(CheckpointError):
+    """Neither the checkpoint nor its .old predecessor exists (a first run)."""
+
+
+def _check_tabular(agent):
+    if agent.q_backend not in ("dict", "dense"):
+        raise CheckpointError(f"checkpoints hold Q-tables; {type(agent).__name__} "
+                              f"({agent.q_backend}) has none")
+
+
+def snapshot_agent(agent):
+    """(meta, arrays) copy of the learnt state, safe to write from another thread."""
+    _check_tabular(agent)
+    store = agent.Q
+    states = store.states()
+    meta = {
+        "version": VERSION,
+        "epsilon": agent.epsilon,
+        "alpha": agent.alpha,
+        "gamma": agent.gamma,
+        "q_backend": agent.q_backend,
+        "action_space": agent.actions.signature(),
+        "states": [list(s) if isinstance(s, tuple) else s for s in states],
+        "confusion": list(agent.confusion.counts()),
+    }
+    arrays = {
+        "history": np.array(agent.history, dtype=np.int8).reshape(-1, 2),
+        "success": np.array([(ep, st, agent.actions.index(combo))
+                             for ep, st, combo in agent.success_history],
+                            dtype=np.int64).reshape(-1, 3),
+    }
+    if agent.q_backend == "dense":
+        arrays["q"] = store.q[:len(states)].copy()
+    else:
+        rows, actions, values = [], [], []
+        for i, state in enumerate(states):
+            for action, value in store.table[state].items():
+                rows.append(i)
+                actions.append(action)
+                values.append(value)
+        arrays["q_rows"] = np.array(rows, dtype=np.int32)
+        arrays["q_actions"] = np.array(actions, dtype=np.int64)
+        arrays["q_values"] = np.array(values, dtype=np.float64)
+    return meta, arrays
+
+
+def write_checkpoint(path, meta, arrays):
+    """Writes a snapshot into `path`, replacing any previous checkpoint there."""
+    tmp = path.rstrip(os.sep) + ".tmp"
+    old = path.rstrip(os.sep) + ".old"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    for name, arr in arrays.items():
+        np.save(os.path.join(tmp, name + ".npy"), arr)
+    with open(os.path.join(tmp, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    shutil.rmtree(old, ignore_errors=True)
+    if os.path.exists(path):
+        os.rename(path, old)
+    os.rename(tmp, path)
+    shutil.rmtree(old, ignore_errors=True)
+
+
+def save_checkpoint(agent, path):
+    write_checkpoint(path, *snapshot_agent(agent))
+
+
+def load_checkpoint(agent, path, restore_epsilon=True):
+    """
+    Warm-starts agent from the checkpoint in path. The action space must have
+    the same signature, since Q-values are stored by action rank.
+    Returns the checkpoint metadata.
+    """
+    _check_tabular(agent)
+    if not os.path.exists(path) and os.path.exists(path.rstrip(os.sep) + ".old"):
+        path = path.rstrip(os.sep) + ".old"  # crashed between the two renames
+    if not os.path.exists(path):
+        raise NoCheckpointError(f"no checkpoint at {path}")
+    try:
+        with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError) as e:
+        raise CheckpointError(f"no readable checkpoint in {path}: {e}")
+    if meta.get("version") != VERSION:
+        raise CheckpointError(f"unsupported checkpoint version {meta.get('version')}")
+    if meta["action_space"] != agent.actions.signature():
+        raise CheckpointError("checkpoint was saved with a different action space")
+
+    states = [tuple(s) if isinstance(s, list) else s for s in meta["states"]]
+    store = agent.Q
+    if agent.q_backend == "dense":
+        if not states:
+            pass
+        elif meta["q_backend"] == "dense":
+            store.q = np.load(os.path.join(path, "q.npy"), mmap_mode="c")
+        else:
+            q = np.zeros((len(states), len(agent.actions)), dtype=np.float32)
+            q[_load(path, "q_rows"), _load(path, "q_actions")] = _load(path, "q_values")
+            store.q = q
+        store.index = {s: i for i, s in enumerate(states)}
+        store.state_list = list(states)
+    else:
+        store.table.clear()
+        if meta["q_backend"] == "dense":
+            q = _load(path, "q") if states else np.zeros((0, 0), dtype=np.float32)
+            rows, actions = np.nonzero(q)
+            values = q[rows, actions]
+        else:
+            rows, actions, values = _load(path, "q_rows"), _load(path, "q_actions"), _load(path, "q_values")
+        for state in states:
+            store.table[state]
+        for r, a, v in zip(rows.tolist(), actions.tolist(), values.tolist()):
+            store.table[states[r]][a] = v
+
+    history = _load(path, "history")
+    agent.history = deque((tuple(pair) for pair in history.tolist()), maxlen=agent.history.maxlen)
+    if "confusion" in meta:
+        agent.confusion = ConfusionCounter(*meta["confusion"])
+    else:
+        agent.confusion = ConfusionCounter()
+        agent.confusion.update_many(history[:, 0], history[:, 1])
+    agent.success_history = [(ep, st, agent.actions[rank])
+                             for ep, st, rank in _load(path, "success").tolist()]
+    if restore_epsilon:
+        agent.epsilon = meta["epsilon"]
+    return meta
+
+
+def _load(path, name):
+    return np.load(os.path.join(path, name + ".npy"))
+
+
+class CheckpointWriter:
+    """
+    Periodic background checkpoints: maybe_save() snapshots every `every`
+    calls and hands the write to a thread; a save still in flight is not
+    queued behind, the next period simply catches up.
+    """
+
+    def __init__(self, path, every=5):
+        self.path = path
+        self.every = every
+        self.calls = 0
+        self.saved = 0
+        self._thread = None
+
+    def maybe_save(self, agent):
+        self.calls += 1
+        if self.calls % self.every:
+            return False
+        return self.save(agent)
+
+    def save(self, agent, wait=False):
+        if self._thread is not None and self._thread.is_alive():
+            if not wait:
+                return False
+            self._thread.join()
+        snapshot = snapshot_agent(agent)
+        self._thread = threading.Thread(target=self._write, args=snapshot, daemon=True)
+        self._thread.start()
+        if wait:
+            self._thread.join()
+        return True
+
+    def _write(self, meta, arrays):
+        try:
+            write_checkpoint(self.path, meta, arrays)
+            self.saved += 1
+        except OSError as e:
+            print(f"[WARN] Checkpoint to {self.path} failed: {e}")
+
+    def close(self, agent=None):
+        """Waits for the write in flight; with agent, writes a final checkpoint first."""
+        if agent is not None:
+            self.save(agent, wait=True)
+        elif self._thread is not None:
+            self._thread.join()
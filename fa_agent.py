@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+fa_agent.py - Q-learning with linear function approximation (NumPy, CPU only).
+
+LinearQAgent is a drop-in alternative to QLearningAgent (select_action,
+update_q, update_q_batch, decay_epsilon, get_best_action, record_outcome,
+compute_metrics) whose Q(s, a) = W[a] . phi(s) generalizes over a
+continuous state instead of keeping one table row per distinct state.
+A state can be main_loop's tuple or any numeric vector, e.g.
+TrafficAnalyzer.get_feature_vector().
+
+phi(s) is either
+- "linear": [1, x / scale], scale being the running max |x| per feature
+  unless given, or
+- "tiles": per-feature tile coding ("stripes"): every feature falls into
+  one tile of each of `tilings` offset grids over [low, high]; the number
+  of weights grows linearly with the number of features.
+
+Experience replay works as for the tabular agent (replay_capacity,
+replay_k, replay_batch, prioritized_replay); states are stored as float
+rows of the buffer, not interned, so its memory is fixed by the capacity.
+There is no Q-table, so checkpoint.py does not handle this agent.
+
+Rewards are mostly positive, so with zero weights greedy selection locks
+onto the first actions tried; q_init > 0 starts every action optimistic
+so that each gets tried before the agent settles.
+"""
+
+import numpy as np
+
+from ml_core import QLearningAgent
+
+
+class LinearQAgent(QLearningAgent):
+    def __init__(self, attack_classes=None, pps_levels=None, threads_levels=None,
+                 power_levels=None, duration_levels=None, max_combo=2,
+                 alpha=0.05, gamma=0.9, epsilon_start=0.9, epsilon_end=0.1,
+                 epsilon_decay=0.98, n_features=3, approx="linear", scale=None,
+                 tilings=4, tiles=8, low=None, high=None, q_init=0.0, seed=None,
+                 replay_capacity=0, replay_k=0, replay_batch=32, prioritized_replay=False):
+        super().__init__(attack_classes, pps_levels, threads_levels, power_levels,
+                         duration_levels, max_combo, alpha, gamma,
+                         epsilon_start, epsilon_end, epsilon_decay,
+                         replay_capacity=0, replay_k=replay_k,
+                         replay_batch=replay_batch, prioritized_replay=prioritized_replay)
+        self.Q = None  # weights replace the table
+        if replay_capacity > 0:
+            # vectors in float rows rather than the tabular agent's interned tuples
+            from replay_buffer import ReplayBuffer
+            self.replay = ReplayBuffer(replay_capacity, prioritized=prioritized_replay,
+                                       state_dim=n_features)
+        self.q_backend = "linear"
+        self.rng = np.random.default_rng(seed)
+        self.n_features = n_features
+        self.approx = approx
+        n_actions = len(self.actions)
+        if approx == "linear":
+            self.scale = None if scale is None else np.asarray(scale, dtype=np.float64)
+            self._running = np.full(n_features, 1e-9)
+            self.W = np.zeros((n_actions, n_features + 1), dtype=np.float64)
+            self.W[:, 0] = q_init
+        elif approx == "tiles":
+            self.tilings = tilings
+            self.tiles = tiles
+            self.low = np.zeros(n_features) if low is None else np.asarray(low, dtype=np.float64)
+            self.high = np.ones(n_features) if high is None else np.asarray(high, dtype=np.float64)
+            self._width = (self.high - self.low) / (tiles - 1)
+            # tiling t is shifted by t/tilings of a tile; one extra tile absorbs the shift
+            self._offsets = np.arange(tilings)[:, None] / tilings
+            self._base = (np.arange(tilings)[:, None] * n_features
+                          + np.arange(n_features)[None, :]) * (tiles + 1)
+            self.W = np.full((n_actions, tilings * n_features * (tiles + 1)),
+                             q_init / (tilings * n_features), dtype=np.float64)
+        else:
+            raise ValueError(f"unknown approx {approx!r}, expected 'linear' or 'tiles'")
+
+    def features(self, states, learn=False):
+        """phi for a batch of states: (B, F) dense rows, or (B, k) active tile indices."""
+        x = np.asarray(states, dtype=np.float64).reshape(-1, self.n_features)
+        if self.approx == "tiles":
+            pos = (np.clip(x, self.low, self.high) - self.low) / self._width
+            idx = np.floor(pos[:, None, :] + self._offsets[None, :, :]).astype(np.int64)
+            return (idx + self._base[None, :, :]).reshape(len(x), -1)
+        if self.scale is not None:
+            scale = self.scale
+        else:
+            if learn:
+                np.maximum(self._running, np.abs(x).max(axis=0), out=self._running)
+            scale = self._running
+        return np.hstack([np.ones((len(x), 1)), x / scale])
+
+    def q_values(self, states):
+        """(B, n_actions) Q-values for a batch of states."""
+        phi = self.features(states)
+        if self.approx == "tiles":
+            return self.W[:, phi].sum(axis=2).T
+        return phi @ self.W.T
+
+    def _greedy(self, values):
+        ties = np.flatnonzero(values == values.max())
+        return int(ties[0] if len(ties) == 1 else self.rng.choice(ties))
+
+    def select_action(self, state):
+        if self.rng.random() < self.epsilon:
+            return self.actions[int(self.rng.integers(len(self.actions)))]
+        return self.actions[self._greedy(self.q_values([state])[0])]
+
+    def get_best_action(self, state):
+        return self.actions[self._greedy(self.q_values([state])[0])]
+
+    def update_q(self, state, action, reward, next_state):
+        self.update_q_batch([state], [action], [reward], [next_state])
+        if self.replay is not None:
+            self.replay.add(np.ravel(state), self._encode(action), reward, np.ravel(next_state))
+            for _ in range(self.replay_k):
+                self.replay_update(self.replay_batch)
+
+    def replay_update(self, batch_size=32):
+        """One batched update on transitions sampled from the replay buffer."""
+        if self.replay is None or len(self.replay) == 0:
+            return 0
+        idx, states, actions, rewards, next_states, weights = self.replay.sample(batch_size)
+        td_errors = self.update_q_batch(states, actions.tolist(), rewards, next_states, weights)
+        self.replay.update_priorities(idx, td_errors)
+        return len(idx)
+
+    def update_q_batch(self, states, actions, rewards, next_states, sample_weights=None):
+        """
+        Semi-gradient TD(0) on a batch. Targets use the weights from before
+        the batch; the step of an action taken several times is the mean of
+        its per-transition steps, each scaled by its sample weight (replay
+        importance sampling) if given. Returns the TD errors.
+        """
+        actions = np.array([self._encode(a) for a in actions], dtype=np.int64)
+        rewards = np.asarray(rewards, dtype=np.float64)
+        phi = self.features(states, learn=True)
+        target = rewards + self.gamma * self.q_values(next_states).max(axis=1)
+        uniq, inverse, counts = np.unique(actions, return_inverse=True, return_counts=True)
+        weight = 1.0 / counts[inverse]
+        if sample_weights is not None:
+            weight = weight * np.asarray(sample_weights, dtype=np.float64)
+        if self.approx == "tiles":
+            current = self.W[actions[:, None], phi].sum(axis=1)
+            step = (self.alpha / phi.shape[1]) * (target - current) * weight
+            np.add.at(self.W, (np.repeat(actions, phi.shape[1]), phi.ravel()),
+                      np.repeat(step, phi.shape[1]))
+        else:
+            current = (self.W[actions] * phi).sum(axis=1)
+            step = self.alpha * (target - current) * weight
+            np.add.at(self.W, actions, step[:, None] * phi)
+        return target - current
+
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+features.py - Vectorized per-window feature extraction for the RL state.
+
+FrameTable collects classified frames into typed columns (timestamp,
+frame class, src/dst address, RSSI, retry bit). window_features() turns
+those columns into one fixed-size vector with NumPy: per-class rates and
+per-window peaks, retry ratio, RSSI statistics and distinct station counts.
+"""
+
+from array import array
+
+import numpy as np
+
+# (type, subtype) -> frame class index; anything else is "other"
+FRAME_CLASSES = [
+    ("beacon", (0, 8)),
+    ("probe_req", (0, 4)),
+    ("probe_resp", (0, 5)),
+    ("auth", (0, 11)),
+    ("deauth", (0, 12)),
+    ("disassoc", (0, 10)),
+    ("assoc", (0, 0)),
+    ("rts", (1, 11)),
+    ("cts", (1, 12)),
+    ("ack", (1, 13)),
+    ("data", (2, 0)),
+    ("qos_data", (2, 8)),
+    ("null", (2, 4)),
+    ("qos_null", (2, 12)),
+    ("eapol", None),
+    ("other", None),
+]
+CLASS_NAMES = [name for name, _ in FRAME_CLASSES]
+CLASS_INDEX = {key: i for i, (_, key) in enumerate(FRAME_CLASSES) if key is not None}
+EAPOL_CLASS = CLASS_NAMES.index("eapol")
+OTHER_CLASS = CLASS_NAMES.index("other")
+N_CLASSES = len(FRAME_CLASSES)
+
+FEATURE_NAMES = (
+    [f"rate_{name}" for name in CLASS_NAMES]
+    + [f"peak_{name}" for name in CLASS_NAMES]
+    + ["rate_total", "retry_ratio", "rssi_mean", "rssi_std", "rssi_min",
+       "distinct_src", "distinct_dst", "stations_per_window", "duration"]
+)
+N_FEATURES = len(FEATURE_NAMES)
+
+
+def frame_class(ftype, subtype, is_eapol):
+    if is_eapol:
+        return EAPOL_CLASS
+    return CLASS_INDEX.get((ftype, subtype), OTHER_CLASS)
+
+
+class FrameTable:
+    """Append-only columnar store of classified frames."""
+
+    frame_class = staticmethod(frame_class)
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.ts = array("d")
+        self.cls = array("b")
+        self.src = array("q")
+        self.dst = array("q")
+        self.rssi = array("d")
+        self.retry = array("b")
+
+    def __len__(self):
+        return len(self.ts)
+
+    def append(self, ts, cls, src, dst, rssi, retry):
+        self.ts.append(ts)
+        self.cls.append(cls)
+        self.src.append(src)
+        self.dst.append(dst)
+        self.rssi.append(np.nan if rssi is None else rssi)
+        self.retry.append(retry)
+
+    def arrays(self):
+        """
+        Column arrays as zero-copy views of the underlying buffers; the table
+        cannot grow while these views are alive.
+        """
+        return (np.frombuffer(self.ts, dtype=np.float64),
+                np.frombuffer(self.cls, dtype=np.int8),
+                np.frombuffer(self.src, dtype=np.int64),
+                np.frombuffer(self.dst, dtype=np.int64),
+                np.frombuffer(self.rssi, dtype=np.float64),
+                np.frombuffer(self.retry, dtype=np.int8))
+
+
+def window_features(ts, cls, src, dst, rssi, retry, window=0.5):
+    """
+    Fixed-size feature vector (see FEATURE_NAMES) for one step's frames.
+    Rates are frames/s over the whole step; peaks are the busiest window's
+    rate; stations_per_window is the mean number of distinct senders per
+    window of `window` seconds.
+    """
+    out = np.zeros(N_FEATURES, dtype=np.float64)
+    n = len(ts)
+    if n == 0:
+        return out
+    t0 = ts.min()
+    duration = max(float(ts.max() - t0), window)
+    win = ((ts - t0) // window).astype(np.int64)
+    n_win = int(win.max()) + 1
+    cls = cls.astype(np.int64)
+
+    per_class = np.bincount(cls, minlength=N_CLASSES)
+    hist = np.bincount(win * N_CLASSES + cls, minlength=n_win * N_CLASSES)
+    hist = hist.reshape(n_win, N_CLASSES)
+    out[:N_CLASSES] = per_class / duration
+    out[N_CLASSES:2 * N_CLASSES] = hist.max(axis=0) / window
+
+    k = 2 * N_CLASSES
+    out[k] = n / duration
+    out[k + 1] = retry.mean()
+    valid = rssi[~np.isnan(rssi)]
+    if valid.size:
+        out[k + 2] = valid.mean()
+        out[k + 3] = valid.std()
+        out[k + 4] = valid.min()
+    has_src = src != 0
+    senders = src[has_src]
+    uniq_senders, sender_ids = np.unique(senders, return_inverse=True)
+    out[k + 5] = uniq_senders.size
+    out[k + 6] = np.unique(dst[dst != 0]).size
+    if senders.size:
+        # dense sender ids keep the (window, sender) key small: shifting the
+        # 48-bit address itself overflows int64 beyond 32767 windows
+        pairs = win[has_src] * uniq_senders.size + sender_ids
+        out[k + 7] = np.unique(pairs).size / n_win
+    out[k + 8] = duration
+    return out
+
+
+def window_features_loop(ts, cls, src, dst, rssi, retry, window=0.5):
+    """Per-frame Python reference of window_features, used by benchmarks."""
+    out = [0.0] * N_FEATURES
+    n = len(ts)
+    if n == 0:
+        return out
+    t0 = min(ts)
+    duration = max(max(ts) - t0, window)
+    per_class = [0] * N_CLASSES
+    hist = {}
+    senders, receivers, win_senders = set(), set(), set()
+    rssi_vals = []
+    retries = 0
+    for i in range(n):
+        c = int(cls[i])
+        w = int((ts[i] - t0) // window)
+        per_class[c] += 1
+        hist[(w, c)] = hist.get((w, c), 0) + 1
+        retries += retry[i]
+        if rssi[i] == rssi[i]:
+            rssi_vals.append(rssi[i])
+        if src[i]:
+            senders.add(src[i])
+            win_senders.add((w, src[i]))
+        if dst[i]:
+            receivers.add(dst[i])
+    n_win = max(w for w, _ in hist) + 1
+    for c in range(N_CLASSES):
+        out[c] = per_class[c] / duration
+        out[N_CLASSES + c] = max((hist.get((w, c), 0) for w in range(n_win)), default=0) / window
+    k = 2 * N_CLASSES
+    out[k] = n / duration
+    out[k + 1] = retries / n
+    if rssi_vals:
+        mean = sum(rssi_vals) / len(rssi_vals)
+        out[k + 2] = mean
+        out[k + 3] = (sum((v - mean) ** 2 for v in rssi_vals) / len(rssi_vals)) ** 0.5
+        out[k + 4] = min(rssi_vals)
+    out[k + 5] = len(senders)
+    out[k + 6] = len(receivers)
+    out[k + 7] = len(win_senders) / n_win
+    out[k + 8] = duration
+    return out
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+frame_parser.py - Native radiotap/802.11 frame classifier.
+
+Reads the radiotap length, the 802.11 frame control and the addresses
+straight from the record buffer with struct, which is all the analyzer
+needs. Frames that cannot be classified here return None and are left
+to the scapy fallback.
+"""
+
+import struct
+
+LINKTYPE_ETHERNET = 1
+LINKTYPE_IEEE802_11 = 105
+LINKTYPE_RADIOTAP = 127
+
+TYPE_MGMT = 0
+TYPE_CTRL = 1
+TYPE_DATA = 2
+
+# control subtypes carrying a transmitter address after addr1
+CTRL_WITH_TA = {8, 9, 10, 11, 14, 15}
+
+ETHERTYPE_EAPOL = 0x888E
+ETHERTYPE_VLAN = 0x8100
+LLC_SNAP_PREFIX = b"\xaa\xaa\x03\x00\x00\x00"
+
+_U16 = struct.Struct("<H")
+_U32 = struct.Struct("<I")
+_BE16 = struct.Struct(">H")
+
+# radiotap fields preceding dBm antenna signal (bit 5): (align, size)
+_RADIOTAP_FIELDS = ((8, 8), (1, 1), (1, 1), (2, 4), (1, 2))
+_RT_ANTSIGNAL = 1 << 5
+
+
+def classify_frame(frame, linktype):
+    """
+    Classifies one captured frame.
+    Returns (type, subtype, bssid, is_eapol) where bssid is 6 raw bytes or
+    None, or None if the frame cannot be classified natively. Non-802.11
+    (Ethernet) frames have type and subtype None.
+    """
+    n = len(frame)
+    if linktype == LINKTYPE_RADIOTAP:
+        if n < 8 or frame[0] != 0:
+            return None
+        off = _U16.unpack_from(frame, 2)[0]
+        if off < 8:
+            return None
+    elif linktype == LINKTYPE_IEEE802_11:
+        off = 0
+    elif linktype == LINKTYPE_ETHERNET:
+        if n < 14:
+            return None
+        ethertype = _BE16.unpack_from(frame, 12)[0]
+        if ethertype == ETHERTYPE_VLAN:
+            return None
+        return None, None, None, ethertype == ETHERTYPE_EAPOL
+    else:
+        return None
+    if n < off + 10:
+        return None
+
+    fc0 = frame[off]
+    fc1 = frame[off + 1]
+    if fc0 & 0x03:
+        return None  # unknown protocol version
+    ftype = (fc0 >> 2) & 0x03
+    subtype = fc0 >> 4
+
+    if ftype == TYPE_CTRL:
+        if subtype in CTRL_WITH_TA and n < off + 16:
+            return None  # truncated: let scapy decide what it is
+        return ftype, subtype, None, False
+    if n < off + 24:
+        return None
+
+    if ftype == TYPE_MGMT:
+        return ftype, subtype, bytes(frame[off + 16:off + 22]), False
+    if ftype != TYPE_DATA:
+        return None
+
+    ds = fc1 & 0x03
+    if ds == 0:
+        bssid = bytes(frame[off + 16:off + 22])
+    elif ds == 1:
+        bssid = bytes(frame[off + 4:off + 10])
+    elif ds == 2:
+        bssid = bytes(frame[off + 10:off + 16])
+    else:
+        bssid = None
+
+    # protected frames carry no cleartext LLC
+    if fc1 & 0x40:
+        return ftype, subtype, bssid, False
+    hdr = off + 24
+    if ds == 3:
+        hdr += 6
+    if subtype & 0x08:
+        hdr += 2
+        if fc1 & 0x80:
+            hdr += 4
+    if n < hdr + 8:
+        return ftype, subtype, bssid, False
+    is_eapol = (frame[hdr:hdr + 6] == LLC_SNAP_PREFIX
+                and _BE16.unpack_from(frame, hdr + 6)[0] == ETHERTYPE_EAPOL)
+    return ftype, subtype, bssid, is_eapol
+
+
+def radiotap_rssi(frame):
+    """dBm antenna signal from a radiotap header, or None if absent."""
+    present = _U32.unpack_from(frame, 4)[0]
+    if not present & _RT_ANTSIGNAL:
+        return None
+    pos = 8
+    word = present
+    while word & 0x80000000:  # extended presence bitmaps
+        if len(frame) < pos + 4:
+            return None
+        word = _U32.unpack_from(frame, pos)[0]
+        pos += 4
+    for bit, (align, size) in enumerate(_RADIOTAP_FIELDS):
+        if present & (1 << bit):
+            pos += -pos % align + size
+    if pos >= _U16.unpack_from(frame, 2)[0]:
+        return None
+    rssi = frame[pos]
+    return rssi - 256 if rssi > 127 else rssi
+
+
+def frame_fields(frame, linktype):
+    """
+    Per-frame fields for the feature stage (see features.py).
+    Returns (rssi, retry, src, dst) where src/dst are 48-bit integers (0 when
+    the frame has no such address) and rssi is None when not recorded,
+    or None for frames classify_frame cannot handle.
+    """
+    n = len(frame)
+    rssi = None
+    if linktype == LINKTYPE_RADIOTAP:
+        if n < 8:
+            return None
+        off = _U16.unpack_from(frame, 2)[0]
+        rssi = radiotap_rssi(frame)
+    elif linktype == LINKTYPE_IEEE802_11:
+        off = 0
+    else:
+        return None
+    if n < off + 10:
+        return None
+    retry = (frame[off + 1] >> 3) & 1
+    dst = int.from_bytes(frame[off + 4:off + 10], "big")
+    src = int.from_bytes(frame[off + 10:off + 16], "big") if n >= off + 16 else 0
+    return rssi, retry, src, dst
+
+
+def format_mac(raw):
+    return ":".join(f"{b:02x}" for b in raw)
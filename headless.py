@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+headless.py - Unattended runs of main_loop from a JSON config and/or CLI.
+
+No input() prompts, no network scan and no browser: the interface and the
+targets are given up front, and the targets run one after another. Every
+target must be listed explicitly with its BSSID and channel and carry
+"authorized": true - only queue networks you are permitted to test.
+
+Example config:
+  {
+    "interface": "wlan0",
+    "monitor": false,
+    "episodes": 15,
+    "steps_per_episode": 3,
+    "agent": {"alpha": 0.1, "epsilon_decay": 0.98, "max_combo": 2},
+    "output_dir": "runs",
+    "report": "{name}-report.html",
+    "checkpoint": "{name}-ckpt",
+    "targets": [
+      {"name": "lab-ap1", "bssid": "AA:BB:CC:DD:EE:01", "channel": 6, "authorized": true},
+      {"name": "lab-ap2", "bssid": "AA:BB:CC:DD:EE:02", "channel": 11, "authorized": true,
+       "episodes": 5}
+    ]
+  }
+
+Usage:
+  python headless.py --config audit.json
+  python headless.py --config audit.json --episodes 5 --set alpha=0.2
+  python headless.py --interface wlan0mon --monitor --target AA:BB:CC:DD:EE:01:6 --authorized
+"""
+
+import argparse
+import copy
+import json
+import os
+import sys
+import time
+
+DEFAULT_CONFIG = {
+    "interface": None,
+    "monitor": False,           # true: the interface already is in monitor mode
+    "episodes": 15,
+    "steps_per_episode": 3,
+    "step_cooldown": 2,
+    "capture_mode": "live",
+    "engine": "threads",
+    "checkpoint_every": 5,
+    "agent": {},                # QLearningAgent keyword arguments, see main.DEFAULT_AGENT_PARAMS
+    "attacks": None,            # attack class names; None = all of attacks.ATTACK_CLASSES
+    "output_dir": ".",
+    "report": "{name}-report.html",
+    "trace": None,
+    "checkpoint": None,
+    "profile": None,
+    "pause_between": 5,         # seconds between two targets
+    "targets": [],
+}
+
+# settings a single target may override
+TARGET_KEYS = ("episodes", "steps_per_episode", "step_cooldown", "capture_mode", "engine",
+               "checkpoint_every", "agent", "attacks", "report", "trace", "checkpoint", "profile")
+
+AGENT_KEYS = ("pps_levels", "threads_levels", "power_levels", "duration_levels", "max_combo",
+              "alpha", "gamma", "epsilon_start", "epsilon_end", "epsilon_decay", "q_backend",
+              "replay_capacity", "replay_k", "replay_batch", "prioritized_replay", "history_limit")
+
+
+class ConfigError(ValueError):
+    pass
+
+
+def load_config(path=None, overrides=None):
+    """DEFAULT_CONFIG, updated by the JSON file at path, then by overrides."""
+    config = copy.deepcopy(DEFAULT_CONFIG)
+    if path:
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            raise ConfigError(f"cannot read config {path}: {e}")
+        if not isinstance(data, dict):
+            raise ConfigError(f"{path}: expected a JSON object")
+        unknown = set(data) - set(DEFAULT_CONFIG)
+        if unknown:
+            raise ConfigError(f"{path}: unknown keys {sorted(unknown)}")
+        config.update(data)
+    for key, value in (overrides or {}).items():
+        if key == "agent":
+            config["agent"] = dict(config["agent"] or {}, **value)
+        else:
+            config[key] = value
+    return config
+
+
+def _check_settings(settings, where):
+    from main import is_valid_mac
+    import attacks
+    for key in ("episodes", "steps_per_episode"):
+        if not isinstance(settings[key], int) or settings[key] < 1:
+            raise ConfigError(f"{where}: {key} must be a positive integer")
+    if settings["capture_mode"] not in ("live", "file"):
+        raise ConfigError(f"{where}: capture_mode must be 'live' or 'file'")
+    if settings["engine"] not in ("threads", "async"):
+        raise ConfigError(f"{where}: engine must be 'threads' or 'async'")
+    unknown = set(settings["agent"] or {}) - set(AGENT_KEYS)
+    if unknown:
+        raise ConfigError(f"{where}: unknown agent parameters {sorted(unknown)}")
+    for name in settings["attacks"] or []:
+        if not isinstance(getattr(attacks, name, None), type):
+            raise ConfigError(f"{where}: unknown attack {name!r}")
+    if not is_valid_mac(str(settings["bssid"])):
+        raise ConfigError(f"{where}: invalid BSSID {settings['bssid']!r}")
+    if not str(settings["channel"]).isdigit():
+        raise ConfigError(f"{where}: invalid channel {settings['channel']!r}")
+
+
+def plan_runs(config):
+    """
+    Validates the config and expands it into one settings dict per target,
+    with the output paths resolved. Raises ConfigError.
+    """
+    if not config["interface"]:
+        raise ConfigError("no interface given")
+    if not config["targets"]:
+        raise ConfigError("no targets given")
+    runs = []
+    names = set()
+    for i, target in enumerate(config["targets"], 1):
+        where = f"target #{i}"
+        if not isinstance(target, dict) or "bssid" not in target or "channel" not in target:
+            raise ConfigError(f"{where}: needs 'bssid' and 'channel'")
+        if target.get("authorized") is not True:
+            raise ConfigError(f"{where} ({target['bssid']}): not marked \"authorized\": true")
+        unknown = set(target) - set(TARGET_KEYS) - {"name", "bssid", "channel", "authorized"}
+        if unknown:
+            raise ConfigError(f"{where}: unknown keys {sorted(unknown)}")
+        settings = {key: config[key] for key in TARGET_KEYS}
+        settings.update({k: v for k, v in target.items() if k in TARGET_KEYS and k != "agent"})
+        settings["agent"] = dict(config["agent"] or {}, **target.get("agent", {}))
+        settings["bssid"] = target["bssid"]
+        settings["channel"] = target["channel"]
+        settings["name"] = target.get("name") or target["bssid"].replace(":", "").lower()
+        _check_settings(settings, where)
+        if settings["name"] in names:
+            raise ConfigError(f"{where}: duplicate name {settings['name']!r}")
+        names.add(settings["name"])
+        for key in ("report", "trace", "checkpoint", "profile"):
+            if settings[key]:
+                path = settings[key].format(name=settings["name"], index=i,
+                                            bssid=settings["bssid"].replace(":", "").lower())
+                settings[key] = os.path.join(config["output_dir"], path)
+        runs.append(settings)
+    return runs
+
+
+def run_target(monitor_if, settings):
+    """One main_loop run for one target. Returns (best_combo, success_steps)."""
+    import attacks
+    from main import main_loop
+    classes = None
+    if settings["attacks"]:
+        classes = [getattr(attacks, name) for name in settings["attacks"]]
+    return main_loop(
+        monitor_if, settings["bssid"], str(settings["channel"]),
+        capture_mode=settings["capture_mode"], engine=settings["engine"],
+        trace_path=settings["trace"], checkpoint_path=settings["checkpoint"],
+        checkpoint_every=settings["checkpoint_every"], profile_path=settings["profile"],
+        episodes=settings["episodes"], steps_per_episode=settings["steps_per_episode"],
+        step_cooldown=settings["step_cooldown"], agent_params=settings["agent"],
+        attack_classes=classes, report_path=settings["report"], open_browser=False)
+
+
+def run_queue(config, run=run_target):
+    """
+    Runs every target in order on one monitor interface. A failing target is
+    reported and the queue moves on. Returns [(name, ok, seconds, detail)].
+    """
+    runs = plan_runs(config)
+    for settings in runs:
+        # templates may name subdirectories, e.g. "{name}/report.html"
+        for key in ("report", "trace", "checkpoint", "profile"):
+            if settings[key]:
+                os.makedirs(os.path.dirname(settings[key]) or ".", exist_ok=True)
+    monitor_if = config["interface"]
+    if not config["monitor"]:
+        from main import monitor_mode_setup
+        monitor_if = monitor_mode_setup(monitor_if)
+    results = []
+    for i, settings in enumerate(runs, 1):
+        if i > 1 and config["pause_between"]:
+            time.sleep(config["pause_between"])
+        print(f"\n[INFO] ===== TARGET {i}/{len(runs)}: {settings['name']} "
+              f"({settings['bssid']}, ch {settings['channel']}) =====")
+        start = time.perf_counter()
+        try:
+            best_combo, success_steps = run(monitor_if, settings)
+        except KeyboardInterrupt:
+            print(f"[WARN] Queue interrupted during {settings['name']}")
+            results.append((settings["name"], False, time.perf_counter() - start, "interrupted"))
+            break
+        except Exception as e:
+            print(f"[ERROR] {settings['name']}: {e}")
+            results.append((settings["name"], False, time.perf_counter() - start, str(e)))
+            continue
+        best = " + ".join(atk.name for atk, *_ in best_combo) if best_combo else "-"
+        results.append((settings["name"], True, time.perf_counter() - start,
+                        f"{len(success_steps)} successful steps, best: {best}"))
+    print("\n[INFO] Queue summary:")
+    for name, ok, seconds, detail in results:
+        print(f"  {'OK  ' if ok else 'FAIL'} {name:<20} {seconds:7.1f}s  {detail}")
+    return results
+
+
+def parse_target(text):
+    """'AA:BB:CC:DD:EE:FF:6' or 'name=AA:BB:CC:DD:EE:FF:6' -> target dict."""
+    name, _, spec = text.rpartition("=")
+    bssid, _, channel = spec.rpartition(":")
+    if not bssid or not channel.isdigit():
+        raise argparse.ArgumentTypeError(f"expected [name=]BSSID:channel, got {text!r}")
+    target = {"bssid": bssid, "channel": int(channel)}
+    if name:
+        target["name"] = name
+    return target
+
+
+def parse_setting(text):
+    """'alpha=0.2' -> ('alpha', 0.2); values are JSON where they parse as JSON."""
+    key, sep, value = text.partition("=")
+    if not sep or key.strip() not in AGENT_KEYS:
+        raise argparse.ArgumentTypeError(f"expected agent_param=value, one of {', '.join(AGENT_KEYS)}")
+    try:
+        value = json.loads(value)
+    except json.JSONDecodeError:
+        pass
+    return key.strip(), value
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Unattended Q-learning audit runs on queued targets.")
+    parser.add_argument("--config", help="JSON config (see the module docstring)")
+    parser.add_argument("--interface", help="wireless interface")
+    parser.add_argument("--monitor", action="store_true", default=None,
+                        help="the interface already is in monitor mode (skip airmon-ng)")
+    parser.add_argument("--target", action="append", type=parse_target, default=[],
+                        help="[name=]BSSID:channel, repeatable; appended to the config's targets")
+    parser.add_argument("--authorized", action="store_true",
+                        help="confirm that the --target networks may be tested")
+    parser.add_argument("--episodes", type=int)
+    parser.add_argument("--steps", type=int, dest="steps_per_episode")
+    parser.add_argument("--set", action="append", type=parse_setting, default=[],
+                        help="agent parameter, e.g. --set alpha=0.2 --set 'pps_levels=[1,2,3]'")
+    parser.add_argument("--engine", choices=["threads", "async"])
+    parser.add_argument("--capture-mode", choices=["live", "file"], dest="capture_mode")
+    parser.add_argument("--output-dir", dest="output_dir")
+    parser.add_argument("--dry-run", action="store_true", help="validate and print the plan only")
+    args = parser.parse_args()
+
+    overrides = {key: getattr(args, key)
+                 for key in ("interface", "monitor", "episodes", "steps_per_episode",
+                             "engine", "capture_mode", "output_dir")
+                 if getattr(args, key) is not None}
+    if args.set:
+        overrides["agent"] = dict(args.set)
+    try:
+        config = load_config(args.config, overrides)
+        for target in args.target:
+            target["authorized"] = args.authorized
+        config["targets"] = list(config["targets"]) + args.target
+        runs = plan_runs(config)
+    except ConfigError as e:
+        print(f"[ERROR] {e}")
+        sys.exit(2)
+
+    if args.dry_run:
+        for settings in runs:
+            print(f"[INFO] {settings['name']}: {settings['bssid']} ch {settings['channel']}, "
+                  f"{settings['episodes']}x{settings['steps_per_episode']} steps, "
+                  f"agent={settings['agent']}, report={settings['report']}")
+        return
+    results = run_queue(config)
+    if not all(ok for _, ok, _, _ in results) or len(results) < len(runs):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+instrument.py - Lightweight spans and counters for the hot paths of a run.
+
+Disabled (the default), span() returns a shared no-op context manager and
+@traced functions cost one flag check per call. Enabled, every span is
+kept as a Chrome trace "complete" event (open the exported JSON in
+chrome://tracing or Perfetto) and folded into a per-name aggregate for the
+end-of-run summary. Events beyond max_events are only aggregated.
+
+    import instrument
+    instrument.enable()
+    with instrument.span("parse", file=path): ...
+    instrument.count("frames", n)
+    instrument.export_chrome_trace("/tmp/run-trace.json")
+    instrument.print_summary()
+"""
+
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+
+
+class _State:
+    enabled = False
+    max_events = 1000000
+    events = []
+    counters = {}
+    totals = {}
+    lock = threading.Lock()
+    t0 = time.perf_counter()
+
+
+_state = _State()
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("name", "args", "start")
+
+    def __init__(self, name, args):
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        complete(self.name, self.start, time.perf_counter() - self.start, self.args)
+        return False
+
+
+def enable(max_events=1000000):
+    _state.enabled = True
+    _state.max_events = max_events
+
+
+def disable():
+    _state.enabled = False
+
+
+def enabled():
+    return _state.enabled
+
+
+def reset():
+    with _state.lock:
+        _state.events = []
+        _state.counters = {}
+        _state.totals = {}
+        _state.t0 = time.perf_counter()
+
+
+def span(name, **args):
+    """Context manager timing a block as `name` (no-op while disabled)."""
+    if not _state.enabled:
+        return _NULL
+    return _Span(name, args or None)
+
+
+def complete(name, start, seconds, args=None):
+    """Records an already measured span (start is a perf_counter value)."""
+    if not _state.enabled:
+        return
+    with _state.lock:
+        agg = _state.totals.get(name)
+        if agg is None:
+            _state.totals[name] = [1, seconds, seconds]
+        else:
+            agg[0] += 1
+            agg[1] += seconds
+            if seconds > agg[2]:
+                agg[2] = seconds
+        if len(_state.events) < _state.max_events:
+            _state.events.append((name, start, seconds, threading.get_ident(), args))
+
+
+def count(name, n=1):
+    """Adds n to counter `name` (no-op while disabled)."""
+    if not _state.enabled:
+        return
+    with _state.lock:
+        _state.counters[name] = _state.counters.get(name, 0) + n
+
+
+def traced(name):
+    """
+    Decorator: runs the function inside span(name) while instrumentation is
+    enabled. For coroutine functions the span covers the awaited call.
+    """
+    def wrap(fn):
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def inner_async(*args, **kwargs):
+                if not _state.enabled:
+                    return await fn(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return await fn(*args, **kwargs)
+                finally:
+                    complete(name, start, time.perf_counter() - start)
+            return inner_async
+
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            if not _state.enabled:
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                complete(name, start, time.perf_counter() - start)
+        return inner
+    return wrap
+
+
+def summary():
+    """{name: {"count", "total", "mean", "max"}} in seconds, plus {"counters": {...}}."""
+    with _state.lock:
+        out = {name: {"count": n, "total": total, "mean": total / n, "max": peak}
+               for name, (n, total, peak) in _state.totals.items()}
+        out["counters"] = dict(_state.counters)
+    return out
+
+
+def print_summary():
+    data = summary()
+    counters = data.pop("counters")
+    for name, s in sorted(data.items(), key=lambda item: -item[1]["total"]):
+        print(f"[TRACE] {name:<28} n={s['count']:>6}  total={s['total']:.3f}s  "
+              f"mean={s['mean'] * 1000:.2f}ms  max={s['max'] * 1000:.2f}ms")
+    for name, value in sorted(counters.items()):
+        print(f"[TRACE] counter {name} = {value}")
+
+
+def export_chrome_trace(path):
+    """Writes the recorded spans and final counter values as Chrome trace JSON."""
+    pid = os.getpid()
+    with _state.lock:
+        events = list(_state.events)
+        counters = dict(_state.counters)
+        t0 = _state.t0
+    trace = []
+    for name, start, seconds, tid, args in events:
+        event = {"name": name, "cat": name.split(".", 1)[0], "ph": "X", "pid": pid, "tid": tid,
+                 "ts": (start - t0) * 1e6, "dur": seconds * 1e6}
+        if args:
+            event["args"] = {k: v if isinstance(v, (int, float, str, bool)) else str(v)
+                             for k, v in args.items()}
+        trace.append(event)
+    end = max(((start + seconds - t0) * 1e6 for _, start, seconds, _, _ in events), default=0.0)
+    for name, value in counters.items():
+        trace.append({"name": name, "ph": "C", "pid": pid, "ts": end, "args": {"value": value}})
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": trace, "displayTimeUnit": "ms"}, f)
+    return len(trace)
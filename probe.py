@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+probe.py - Concurrent asyncio TCP/HTTP prober for performance measurement.
+
+Keeps `concurrency` connections in flight for the whole measurement window,
+so one slow connect no longer eats the window, and records the latency of
+every successful request into a LatencyHistogram instead of just counting
+successes.
+
+Rewards compare rates against fixed bonuses (reward.py) that were tuned for
+the original one-connection-at-a-time probe, so the analyzer uses
+connection_rate - the rate per in-flight connection - which keeps that
+scale whatever the concurrency.
+"""
+
+import asyncio
+import time
+
+from latency_hist import LatencyHistogram
+
+HTTP_REQUEST = b"GET / HTTP/1.0\r\nHost: example.com\r\n\r\n"
+
+
+class ProbeResult:
+    def __init__(self, duration, histogram=None, concurrency=1):
+        self.duration = duration
+        self.concurrency = concurrency
+        self.successes = 0
+        self.failures = 0
+        self.histogram = histogram if histogram is not None else LatencyHistogram()
+
+    @property
+    def rate(self):
+        """Successful requests per second (the original performance metric)."""
+        return self.successes / float(self.duration) if self.duration else 0.0
+
+    @property
+    def connection_rate(self):
+        """rate per in-flight connection: the single-socket scale the reward constants assume."""
+        return self.rate / self.concurrency
+
+    def percentile(self, p):
+        """Latency percentile in seconds, None without samples."""
+        return self.histogram.percentile(p)
+
+    def summary(self):
+        return {
+            "rate": self.rate,
+            "connection_rate": self.connection_rate,
+            "successes": self.successes,
+            "failures": self.failures,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+        }
+
+
+async def request_once(host, port, timeout, request=HTTP_REQUEST):
+    """One connect/send/recv round trip; returns its latency or None on failure."""
+    start = time.perf_counter()
+    writer = None
+    try:
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+        writer.write(request)
+        await writer.drain()
+        remaining = timeout - (time.perf_counter() - start)
+        await asyncio.wait_for(reader.read(1024), max(remaining, 0.001))
+        return time.perf_counter() - start
+    except (OSError, asyncio.TimeoutError, ValueError):
+        return None
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+async def probe(host, port=80, duration=1.0, concurrency=8, timeout=1.0,
+                request=HTTP_REQUEST, histogram=None):
+    """
+    Probes host:port for `duration` seconds with up to `concurrency` requests
+    in flight. No request outlives the window. Latencies go into `histogram`
+    (a fresh LatencyHistogram by default).
+    """
+    concurrency = max(1, concurrency)
+    result = ProbeResult(duration, histogram, concurrency)
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + duration
+
+    async def worker():
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return
+            latency = await request_once(host, port, min(timeout, remaining), request)
+            if latency is None:
+                if loop.time() >= deadline:
+                    return  # cut off by the window, not a failure of the target
+                result.failures += 1
+                # avoid spinning on instant refusals
+                await asyncio.sleep(min(0.01, max(deadline - loop.time(), 0)))
+            else:
+                result.successes += 1
+                result.histogram.record(latency)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return result
+
+
+def run_probe(host, port=80, duration=1.0, concurrency=8, timeout=1.0, histogram=None):
+    """Blocking wrapper around probe() for synchronous callers."""
+    return asyncio.run(probe(host, port, duration, concurrency, timeout,
+                             histogram=histogram))
+
+
+async def start_stand_in_server(host="127.0.0.1", port=0, delay=0.0):
+    """
+    Minimal asyncio HTTP stand-in for exercising the prober offline.
+    Replies to each request after `delay` seconds (a callable is invoked per
+    request). Returns the asyncio server; its port is
+    server.sockets[0].getsockname()[1].
+    """
+    async def handle(reader, writer):
+        try:
+            await reader.read(1024)
+            wait = delay() if callable(delay) else delay
+            if wait:
+                await asyncio.sleep(wait)
+            writer.write(b"HTTP/1.0 200 OK\r\nContent-Length: 2\r\n\r\nok")
+            await writer.drain()
+        except (OSError, asyncio.CancelledError):
+            pass  # client gone or server shutting down
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle, host, port)
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+qstore.py - Pluggable Q-table backends for QLearningAgent.
+
+- DictQStore (default): the original defaultdict(lambda: defaultdict(float)),
+  where only visited actions have entries.
+- DenseQStore: one float32 row of len(actions) per interned state, with
+  NumPy argmax/max and batched TD updates. Unvisited actions count as 0.0.
+
+Both map a state to Q-values indexed by action rank (see action_space.py).
+
+batch_td_update (used by experience replay and update_q_batch) has the same
+semantics in both: every target uses the Q-values from before the batch,
+and a (state, action) pair occurring several times gets a single update
+towards the mean of its targets - a batch equals one synchronous sweep,
+independent of the order of its transitions. Optional per-transition
+weights (prioritized replay's importance-sampling weights) scale each
+transition's share of that update. The one remaining difference is that
+the dense max over a next state includes unvisited actions at 0.0.
+"""
+
+import itertools
+import random
+from collections import defaultdict
+
+
+class DictQStore:
+    def __init__(self, n_actions):
+        self.n_actions = n_actions
+        self.table = defaultdict(lambda: defaultdict(float))
+
+    def __getitem__(self, state):
+        return self.table[state]
+
+    def __contains__(self, state):
+        return state in self.table
+
+    def states(self):
+        return list(self.table)
+
+    def best_action(self, state):
+        """Rank of the best visited action in state, None if nothing visited."""
+        qv = self.table.get(state)
+        return max(qv, key=qv.get) if qv else None
+
+    def max_value(self, state):
+        qv = self.table.get(state)
+        return max(qv.values()) if qv else 0.0
+
+    def get(self, state, action):
+        qv = self.table.get(state)
+        return qv.get(action, 0.0) if qv else 0.0
+
+    def td_update(self, state, action, reward, next_state, alpha, gamma):
+        old = self.table[state][action]
+        nxt = self.max_value(next_state)
+        self.table[state][action] = old + alpha * (reward + gamma * nxt - old)
+
+    def batch_td_update(self, states, actions, rewards, next_states, alpha, gamma, weights=None):
+        """Pre-batch targets, one update per (state, action) towards their (weighted) mean."""
+        if weights is None:
+            weights = itertools.repeat(1.0)
+        targets = {}
+        for s, a, r, ns, w in zip(states, actions, rewards, next_states, weights):
+            key = (s, int(a))
+            target = float(r) + gamma * self.max_value(ns)
+            total, wsum, n = targets.get(key, (0.0, 0.0, 0))
+            targets[key] = (total + w * target, wsum + w, n + 1)
+        for (s, a), (total, wsum, n) in targets.items():
+            old = self.table[s][a]
+            self.table[s][a] = old + alpha * (total - wsum * old) / n
+
+
+class DenseQStore:
+    def __init__(self, n_actions, initial_states=16):
+        import numpy as np
+        self.np = np
+        self.n_actions = n_actions
+        self.index = {}
+        self.state_list = []
+        self.q = np.zeros((initial_states, n_actions), dtype=np.float32)
+
+    def __contains__(self, state):
+        return state in self.index
+
+    def __getitem__(self, state):
+        """Row of Q-values for state (a view; interns the state)."""
+        return self.q[self.intern(state)]
+
+    def states(self):
+        return list(self.state_list)
+
+    def intern(self, state):
+        """Row index of state, allocating a zero row on first sight."""
+        row = self.index.get(state)
+        if row is None:
+            row = len(self.state_list)
+            if row == self.q.shape[0]:
+                grown = self.np.zeros((row * 2, self.n_actions), dtype=self.np.float32)
+                grown[:row] = self.q
+                self.q = grown
+            self.index[state] = row
+            self.state_list.append(state)
+        return row
+
+    def best_action(self, state):
+        """Argmax rank over all actions (ties broken at random), None for an unseen state."""
+        row = self.index.get(state)
+        if row is None:
+            return None
+        values = self.q[row]
+        best = values.max()
+        ties = self.np.flatnonzero(values == best)
+        return int(ties[0] if len(ties) == 1 else random.choice(ties))
+
+    def max_value(self, state):
+        row = self.index.get(state)
+        return float(self.q[row].max()) if row is not None else 0.0
+
+    def get(self, state, action):
+        row = self.index.get(state)
+        return float(self.q[row, action]) if row is not None else 0.0
+
+    def td_update(self, state, action, reward, next_state, alpha, gamma):
+        nxt = self.max_value(next_state)
+        row = self.intern(state)
+        old = self.q[row, action]
+        self.q[row, action] = old + alpha * (reward + gamma * nxt - old)
+
+    def batch_td_update(self, states, actions, rewards, next_states, alpha, gamma, weights=None):
+        """
+        Applies a batch of TD updates at once. All targets use the Q-values
+        from before the batch; a (state, action) pair that occurs several
+        times gets one update towards the (weighted) mean of its targets.
+        """
+        np = self.np
+        rows = np.fromiter((self.intern(s) for s in states), dtype=np.int64, count=len(states))
+        next_rows = np.fromiter((self.intern(s) for s in next_states), dtype=np.int64,
+                                count=len(next_states))
+        self.batch_td_update_rows(rows, np.asarray(actions, dtype=np.int64),
+                                  np.asarray(rewards, dtype=np.float32), next_rows, alpha, gamma,
+                                  weights)
+
+    def batch_td_update_rows(self, rows, actions, rewards, next_rows, alpha, gamma, weights=None):
+        """batch_td_update on already interned row indices."""
+        np = self.np
+        # max over each distinct next state once, not once per transition
+        uniq, inverse = np.unique(next_rows, return_inverse=True)
+        target = rewards + gamma * self.q[uniq].max(axis=1)[inverse]
+        keys = rows * self.n_actions + actions
+        pairs, inverse, counts = np.unique(keys, return_inverse=True, return_counts=True)
+        rows, actions = pairs // self.n_actions, pairs % self.n_actions
+        old = self.q[rows, actions]
+        if weights is None:
+            delta = np.bincount(inverse, weights=target, minlength=len(pairs)) / counts - old
+        else:
+            w = np.asarray(weights, dtype=np.float64)
+            delta = (np.bincount(inverse, weights=w * target, minlength=len(pairs))
+                     - np.bincount(inverse, weights=w, minlength=len(pairs)) * old) / counts
+        self.q[rows, actions] = old + (alpha * delta).astype(np.float32)
+
+    def best_actions_rows(self, rows, rng=None):
+        """
+        Vectorized argmax for many interned rows. With a NumPy Generator,
+        ties are broken at random like best_action; otherwise the lowest rank wins.
+        """
+        np = self.np
+        # many envs share few states: take each distinct row's argmax once
+        uniq, inverse = np.unique(rows, return_inverse=True)
+        values = self.q[uniq]
+        best = values.argmax(axis=1)
+        out = best[inverse]
+        if rng is None:
+            return out
+        for i in np.flatnonzero((values == values.max(axis=1, keepdims=True)).sum(axis=1) > 1):
+            ties = np.flatnonzero(values[i] == values[i, best[i]])
+            members = np.flatnonzero(inverse == i)
+            out[members] = ties[rng.integers(0, len(ties), len(members))]
+        return out
+
+
+Q_BACKENDS = {"dict": DictQStore, "dense": DenseQStore}
+
+
+def make_q_store(backend, n_actions):
+    try:
+        return Q_BACKENDS[backend](n_actions)
+    except KeyError:
+        raise ValueError(f"unknown Q backend {backend!r}, expected one of {sorted(Q_BACKENDS)}")
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+replay_buffer.py - Fixed-capacity experience replay for QLearningAgent.
+
+Transitions are stored in preallocated NumPy ring arrays (state index,
+action rank, reward, next state index). States are interned to integers
+with a reference count per stored transition; an overwritten slot releases
+its states and unreferenced ids are reused, so at most 2 * capacity
+distinct states are held. With state_dim, states are numeric vectors kept
+directly in (capacity, state_dim) float rows instead (LinearQAgent).
+
+Prioritized sampling uses a sum tree, giving O(log n) sampling and
+priority updates. It draws transition i with P(i) ~ priority^alpha; the
+importance-sampling weights (N * P(i))^-beta, scaled to max 1 per batch,
+undo that bias in the updates (beta=1 corrects it fully).
+"""
+
+import numpy as np
+
+
+class SumTree:
+    """Binary sum tree over `capacity` leaf priorities."""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        size = 1
+        while size < capacity:
+            size *= 2
+        self.size = size
+        self.tree = np.zeros(2 * size, dtype=np.float64)
+
+    @property
+    def total(self):
+        return float(self.tree[1])
+
+    def update(self, idx, priority):
+        pos = idx + self.size
+        delta = priority - self.tree[pos]
+        while pos >= 1:
+            self.tree[pos] += delta
+            pos //= 2
+
+    def find(self, value):
+        """Leaf index whose cumulative priority range contains value."""
+        pos = 1
+        tree = self.tree
+        while pos < self.size:
+            left = 2 * pos
+            if value < tree[left]:
+                pos = left
+            else:
+                value -= tree[left]
+                pos = left + 1
+        return pos - self.size
+
+    def find_many(self, values):
+        """Vectorized find: descends the tree for all values at once."""
+        values = np.array(values, dtype=np.float64)
+        pos = np.ones(len(values), dtype=np.int64)
+        tree = self.tree
+        while pos[0] < self.size:
+            left = 2 * pos
+            left_sum = tree[left]
+            go_right = values >= left_sum
+            values -= np.where(go_right, left_sum, 0.0)
+            pos = left + go_right
+        return pos - self.size
+
+
+class ReplayBuffer:
+    def __init__(self, capacity=10000, prioritized=False, alpha=0.6, beta=0.4, eps=1e-3,
+                 state_dim=None, seed=None):
+        self.capacity = capacity
+        self.prioritized = prioritized
+        self.alpha = alpha
+        self.beta = beta
+        self.eps = eps
+        self.state_dim = state_dim
+        if state_dim is None:
+            self.states = np.zeros(capacity, dtype=np.int32)
+            self.next_states = np.zeros(capacity, dtype=np.int32)
+        else:
+            self.states = np.zeros((capacity, state_dim), dtype=np.float64)
+            self.next_states = np.zeros((capacity, state_dim), dtype=np.float64)
+        self.actions = np.zeros(capacity, dtype=np.int64)
+        self.rewards = np.zeros(capacity, dtype=np.float32)
+        self.state_index = {}
+        self.state_list = []
+        self.refs = []
+        self.free = []
+        self.pos = 0
+        self.size = 0
+        self.max_priority = 1.0
+        self.tree = SumTree(capacity) if prioritized else None
+        self.rng = np.random.default_rng(seed)
+
+    def __len__(self):
+        return self.size
+
+    def intern(self, state):
+        """Id of state, taking one reference to it (see release)."""
+        idx = self.state_index.get(state)
+        if idx is None:
+            if self.free:
+                idx = self.free.pop()
+                self.state_list[idx] = state
+            else:
+                idx = len(self.state_list)
+                self.state_list.append(state)
+                self.refs.append(0)
+            self.state_index[state] = idx
+        self.refs[idx] += 1
+        return idx
+
+    def release(self, idx):
+        """Drops one reference; the id is freed for reuse at zero."""
+        self.refs[idx] -= 1
+        if self.refs[idx] == 0:
+            del self.state_index[self.state_list[idx]]
+            self.state_list[idx] = None
+            self.free.append(idx)
+
+    def n_states(self):
+        """Distinct states currently interned."""
+        return len(self.state_index)
+
+    def add(self, state, action, reward, next_state):
+        """Stores one transition (action as rank), overwriting the oldest when full."""
+        i = self.pos
+        if self.state_dim is not None:
+            self.states[i] = state
+            self.next_states[i] = next_state
+        else:
+            old = (int(self.states[i]), int(self.next_states[i])) if self.size == self.capacity else ()
+            self.states[i] = self.intern(state)
+            self.next_states[i] = self.intern(next_state)
+            for idx in old:
+                self.release(idx)
+        self.actions[i] = action
+        self.rewards[i] = reward
+        if self.tree is not None:
+            self.tree.update(i, self.max_priority ** self.alpha)
+        self.pos = (i + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def sample_indices(self, batch_size):
+        if self.size == 0:
+            return np.zeros(0, dtype=np.int64)
+        if self.tree is None:
+            return self.rng.integers(0, self.size, size=batch_size)
+        # stratified: one draw per equal slice of the total priority mass
+        total = self.tree.total
+        bounds = (np.arange(batch_size) + self.rng.random(batch_size)) * (total / batch_size)
+        return np.minimum(self.tree.find_many(bounds), self.size - 1)
+
+    def weights(self, indices):
+        """Importance-sampling weights of sampled indices (all 1.0 when uniform)."""
+        if self.tree is None or len(indices) == 0:
+            return np.ones(len(indices), dtype=np.float64)
+        probs = self.tree.tree[np.asarray(indices) + self.tree.size] / self.tree.total
+        w = (self.size * probs) ** -self.beta
+        return w / w.max()
+
+    def sample(self, batch_size):
+        """
+        Returns (indices, states, actions, rewards, next_states, weights);
+        states are keys, or (B, state_dim) arrays with state_dim.
+        """
+        idx = self.sample_indices(batch_size)
+        if self.state_dim is not None:
+            states, next_states = self.states[idx], self.next_states[idx]
+        else:
+            states = [self.state_list[s] for s in self.states[idx]]
+            next_states = [self.state_list[s] for s in self.next_states[idx]]
+        return idx, states, self.actions[idx], self.rewards[idx], next_states, self.weights(idx)
+
+    def update_priorities(self, indices, td_errors):
+        """Sets priorities from absolute TD errors (prioritized mode only)."""
+        if self.tree is None:
+            return
+        for i, err in zip(np.asarray(indices).tolist(), np.abs(td_errors).tolist()):
+            priority = err + self.eps
+            self.max_priority = max(self.max_priority, priority)
+            self.tree.update(i, priority ** self.alpha)
+
+    def nbytes(self):
+        """Bytes held by the ring arrays and the sum tree (not the interned states)."""
+        arrays = (self.states, self.actions, self.rewards, self.next_states)
+        total = sum(a.nbytes for a in arrays)
+        if self.tree is not None:
+            total += self.tree.tree.nbytes
+        return total
@@ -37,7 +37,7 @@ def cli_summary(success_steps, best_combo):
         print("The best combination has not been determined.")
 
 
-def generate_html(success_steps, best_combo, filename="wifi_audit_report.html"):
+def generate_html(success_steps, best_combo, filename="wifi_audit_report.html", open_browser=True):
     now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     html = [
         "<!DOCTYPE html><html lang='ru'><head><meta charset='UTF-8'><title>Wi-Fi Audit</title>",
@@ -79,4 +79,5 @@ def generate_html(success_steps, best_combo, filename="wifi_audit_report.html"):
     with open(filename, "w", encoding="utf-8") as f:
         f.write("\n".join(html))
     print(f"[INFO] HTML- report: {filename}")
-    webbrowser.open(f"file://{os.path.abspath(filename)}")
+    if open_browser:
+        webbrowser.open(f"file://{os.path.abspath(filename)}")
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+reward.py - Step state/reward shaping shared by main_loop and the offline environments.
+"""
+
+
+def effective_count(new_count, baseline_size):
+    """Stations still associated; 0 once fewer than half the baseline remain."""
+    return new_count if new_count >= (baseline_size / 2) else 0
+
+
+def step_reward(baseline_perf, current_perf, old_count, effective):
+    """
+    Throughput drop plus a bonus for stations knocked off:
+    0.5 per station lost, 5.0 (or 1.0 if none were left) when all are gone.
+    """
+    reward = baseline_perf - current_perf
+    if effective < old_count and effective > 0:
+        reward += 0.5 * (old_count - effective)
+    if effective == 0:
+        reward += 5.0 if old_count > 0 else 1.0
+    return reward
+
+
+def outcome_label(reward):
+    """Predicted success label recorded for the metrics (1 = success)."""
+    return 1 if reward >= 1.0 else 0
+
+
+def step_reward_array(baseline_perf, current_perf, old_count, effective):
+    """step_reward over NumPy arrays of steps."""
+    import numpy as np
+    reward = baseline_perf - current_perf
+    reward = reward + np.where((effective < old_count) & (effective > 0),
+                               0.5 * (old_count - effective), 0.0)
+    return reward + np.where(effective == 0, np.where(old_count > 0, 5.0, 1.0), 0.0)
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+scheduler.py - Step scheduler overlapping the measurement phases.
+
+After the attack of a step stops, capture, station counting and
+performance probing all observe the same post-attack period, so they can
+run side by side in one measurement window instead of one after another.
+The scheduler also keeps a per-phase timing breakdown of every step.
+"""
+
+import time
+
+import instrument
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+
+class StepScheduler:
+    def __init__(self, max_workers=4):
+        self.max_workers = max_workers
+        self._pool = None
+        self.steps = []
+        self.current = None
+
+    def begin_step(self):
+        self.current = {"_start": time.perf_counter()}
+        return self.current
+
+    def end_step(self):
+        step = self.current
+        if step is None:
+            return None
+        start = step.pop("_start")
+        step["total"] = time.perf_counter() - start
+        instrument.complete("step", start, step["total"])
+        self.steps.append(step)
+        self.current = None
+        return step
+
+    @contextmanager
+    def phase(self, name):
+        """Times a serial phase of the current step (e.g. the attack)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def record(self, name, seconds):
+        """Adds seconds to phase `name` of the current step."""
+        instrument.complete("step." + name, time.perf_counter() - seconds, seconds)
+        if self.current is None:
+            self.begin_step()
+        self.current[name] = self.current.get(name, 0.0) + seconds
+
+    def run_window(self, phases, min_duration=0.0):
+        """
+        Runs phases ({name: zero-arg callable}) concurrently and waits for all
+        of them; the window lasts at least min_duration seconds. Returns
+        {name: result}; an exception in any phase is re-raised.
+        """
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.max_workers)
+        start = time.perf_counter()
+
+        def timed(name, fn):
+            t0 = time.perf_counter()
+            try:
+                return fn()
+            finally:
+                self.record(name, time.perf_counter() - t0)
+
+        futures = {name: self._pool.submit(timed, name, fn) for name, fn in phases.items()}
+        results = {name: fut.result() for name, fut in futures.items()}
+        remaining = min_duration - (time.perf_counter() - start)
+        if remaining > 0:
+            time.sleep(remaining)
+        self.record("window", time.perf_counter() - start)
+        return results
+
+    def format_step(self, step=None):
+        step = step or (self.steps[-1] if self.steps else {})
+        parts = [f"{name}={secs:.2f}s" for name, secs in step.items() if name != "total"]
+        if "total" in step:
+            parts.append(f"total={step['total']:.2f}s")
+        return "[TIMING] " + ", ".join(parts)
+
+    def summary(self):
+        """Mean seconds per phase over all finished steps."""
+        totals = {}
+        for step in self.steps:
+            for name, secs in step.items():
+                totals[name] = totals.get(name, 0.0) + secs
+        n = len(self.steps) or 1
+        return {name: secs / n for name, secs in totals.items()}
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+sim_env.py - Offline stochastic stand-in for the radio side of main_loop.
+
+SimulatedEnv produces the same state (effective, handshake_detected, 0) and
+the same shaped reward (reward.py) that main_loop builds from the station
+tracker, TrafficAnalyzer features and the performance probe, so
+QLearningAgent can be trained and tuned without hardware.
+
+Every attack class has an AttackModel: per unit of intensity
+(pps * threads * power * duration) a connected station is knocked off with
+probability `knock`, throughput keeps a (1 - drop) share, and a knocked-off
+station re-associating produces a captured handshake with probability
+`handshake`. Effects of the slots of a combo combine independently.
+
+Run: python sim_env.py --episodes 20000
+"""
+
+import argparse
+import random
+import time
+from collections import namedtuple
+
+from reward import effective_count, step_reward, outcome_label
+
+AttackModel = namedtuple("AttackModel", "knock drop handshake")
+
+# keyed by Attack.name
+ATTACK_MODELS = {
+    "DeauthFlood":     AttackModel(knock=0.25, drop=0.30, handshake=0.35),
+    "BeaconFlood":     AttackModel(knock=0.02, drop=0.10, handshake=0.00),
+    "AuthDOS":         AttackModel(knock=0.05, drop=0.25, handshake=0.02),
+    "DeauthFloodMDK":  AttackModel(knock=0.22, drop=0.30, handshake=0.30),
+    "EAPOLStartFlood": AttackModel(knock=0.04, drop=0.15, handshake=0.10),
+    "WIDSConfusion":   AttackModel(knock=0.10, drop=0.20, handshake=0.10),
+    "RTSCTSFlood":     AttackModel(knock=0.01, drop=0.35, handshake=0.00),
+}
+DEFAULT_MODEL = AttackModel(knock=0.05, drop=0.10, handshake=0.05)
+
+
+def combo_params(combo, models=None):
+    """
+    (p_stay, throughput_share, p_handshake) of an action combo: the chance a
+    station survives the step, the share of baseline throughput left and the
+    chance a re-association is captured as a handshake.
+    """
+    models = models or ATTACK_MODELS
+    stay = share = miss = 1.0
+    for atk, pps, thr, pw, dur in combo:
+        model = models.get(atk.name, DEFAULT_MODEL)
+        units = pps * thr * pw * dur
+        stay *= (1.0 - model.knock) ** units
+        share *= (1.0 - model.drop) ** units
+        miss *= 1.0 - model.handshake
+    return stay, share, 1.0 - miss
+
+
+class SimulatedEnv:
+    def __init__(self, models=None, stations=8, baseline_throughput=50.0,
+                 noise=2.0, reconnect=0.3, seed=None):
+        self.models = models or ATTACK_MODELS
+        self.stations = stations
+        self.baseline = baseline_throughput
+        self.noise = noise
+        self.reconnect = reconnect
+        self.rng = random.Random(seed)
+        self._params = {}
+        self.connected = stations
+        self.state = None
+
+    def reset(self):
+        """Starts a run: every baseline station associated. Returns the initial state."""
+        self.connected = self.stations
+        self.state = (self.stations, 0, 0)
+        return self.state
+
+    def params(self, combo):
+        p = self._params.get(combo)
+        if p is None:
+            p = self._params[combo] = combo_params(combo, self.models)
+        return p
+
+    def step(self, combo):
+        """
+        Plays one attack step. Returns (next_state, reward, info) where info
+        carries station_count, features, throughput and pred like main_loop.
+        """
+        if self.state is None:
+            self.reset()
+        stay, share, p_handshake = self.params(combo)
+        rand = self.rng.random
+        connected = self.connected
+        knocked = 0
+        for _ in range(connected):
+            if rand() >= stay:
+                knocked += 1
+        new_count = connected - knocked
+
+        handshake = 1 if knocked and rand() < p_handshake else 0
+        throughput = self.baseline * share + self.rng.gauss(0.0, self.noise)
+        if throughput < 0.0:
+            throughput = 0.0
+
+        effective = effective_count(new_count, self.stations)
+        reward = step_reward(self.baseline, throughput, self.state[0], effective)
+        next_state = (effective, handshake, 0)
+
+        # stations drift back between steps
+        for _ in range(self.stations - new_count):
+            if rand() < self.reconnect:
+                new_count += 1
+        self.connected = new_count
+        self.state = next_state
+        info = {
+            "station_count": connected - knocked,
+            "features": {"eapol_count": 4 * handshake, "handshake_detected": handshake},
+            "throughput": throughput,
+            "pred": outcome_label(reward),
+        }
+        return next_state, reward, info
+
+
+def run_training(agent, env, episodes=15, steps_per_episode=3, on_episode=None, trace=None):
+    """
+    The learning part of main_loop against an offline env: select, step,
+    record_outcome, update_q, then compute_metrics and decay_epsilon per
+    episode. If the env reports the transition it actually played (info
+    "state"/"action", e.g. a ReplayEnv), the update and the trace use that
+    one. Steps are appended to `trace` (a step_trace.TraceWriter) if given.
+    Returns the mean reward of every episode.
+    """
+    state = env.reset()
+    rewards = []
+    for episode in range(1, episodes + 1):
+        total = 0.0
+        for step in range(1, steps_per_episode + 1):
+            combo = agent.select_action(state)
+            agent.current_context = (episode, step, combo)
+            next_state, reward, info = env.step(combo)
+            agent.record_outcome(info["pred"], 1)
+            played = info.get("state", state)
+            action = info.get("action", combo)
+            agent.update_q(played, action, reward, next_state)
+            if trace is not None:
+                rank = action if isinstance(action, int) else agent.actions.index(action)
+                trace.append(episode, step, played, rank, next_state, reward,
+                             station_count=info["station_count"], features=info["features"],
+                             probe={"throughput": info["throughput"]})
+            state = next_state
+            total += reward
+        rewards.append(total / steps_per_episode)
+        if on_episode is not None:
+            on_episode(episode, agent)
+        agent.decay_epsilon()
+    return rewards
+
+
+def main():
+    from attacks import ATTACK_CLASSES
+    from ml_core import QLearningAgent
+
+    parser = argparse.ArgumentParser(description="Train the Q-learning agent against the simulated env.")
+    parser.add_argument("--episodes", type=int, default=20000)
+    parser.add_argument("--steps", type=int, default=3, help="steps per episode")
+    parser.add_argument("--stations", type=int, default=8)
+    parser.add_argument("--alpha", type=float, default=0.1)
+    parser.add_argument("--gamma", type=float, default=0.9)
+    parser.add_argument("--epsilon-decay", type=float, default=0.98)
+    parser.add_argument("--q-backend", default="dict", choices=["dict", "dense"])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    agent = QLearningAgent(
+        attack_classes=ATTACK_CLASSES,
+        pps_levels=[1, 2], threads_levels=[1, 2], power_levels=[1], duration_levels=[1, 2],
+        max_combo=2, alpha=args.alpha, gamma=args.gamma,
+        epsilon_start=0.9, epsilon_end=0.1, epsilon_decay=args.epsilon_decay,
+        q_backend=args.q_backend,
+    )
+    env = SimulatedEnv(stations=args.stations, seed=args.seed)
+    start = time.perf_counter()
+    rewards = run_training(agent, env, args.episodes, args.steps)
+    elapsed = time.perf_counter() - start
+    steps = args.episodes * args.steps
+    tail = rewards[-max(1, len(rewards) // 10):]
+    acc, prec, rec, f1 = agent.compute_metrics()
+    print(f"[INFO] {steps} steps in {elapsed:.2f}s ({steps / elapsed:,.0f} steps/s)")
+    print(f"[INFO] mean reward first episode={rewards[0]:.2f}, last 10%={sum(tail) / len(tail):.2f}")
+    print(f"[METRICS] Acc={acc:.2f}, Prec={prec:.2f}, Recall={rec:.2f}, F1={f1:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+station_tracker.py - Long-lived station tracking from airodump-ng CSV output.
+
+Instead of starting a fresh airodump-ng for every step (parse_station_count),
+one airodump-ng keeps running and StationTracker re-reads its CSV only when
+the file changed. Only the "Station MAC" section is scanned, by one
+compiled regex that picks out the rows of our BSSID, and the "Last time
+seen" values - which repeat across stations and rewrites - are parsed
+once each.
+"""
+
+import csv
+import functools
+import os
+import re
+import shutil
+import signal
+import subprocess
+import tempfile
+import time
+
+MAC_RE = re.compile(r'^([0-9A-Fa-f]{2}:){5}[0-9A-Fa-f]{2}$')
+STATION_HEADER = b"Station MAC"
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+@functools.lru_cache(maxsize=4096)
+def parse_seen_time(text):
+    """
+    airodump 'Last time seen' (local time) -> epoch seconds, None if invalid.
+    Cached: most stations of one rewrite share the same few seconds, and
+    strptime dominates the cost of re-parsing a changed line.
+    """
+    try:
+        return time.mktime(time.strptime(text.strip(), TIME_FORMAT))
+    except ValueError:
+        return None
+
+
+def parse_station_csv(path, bssid):
+    """Full parse of one airodump-ng CSV: the set of station MACs associated with bssid."""
+    with open(path, newline='', encoding="utf-8", errors="ignore") as f:
+        rows = list(csv.reader(f))
+    station_macs = set()
+    header = None
+    for idx, row in enumerate(rows):
+        if row and row[0].strip() == "Station MAC":
+            header = idx
+            break
+    if header is not None:
+        for row in rows[header + 1:]:
+            if len(row) >= 6 and MAC_RE.match(row[0].strip()):
+                if row[5].strip().lower() == bssid.lower():
+                    station_macs.add(row[0].strip())
+    return station_macs
+
+
+class StationTracker:
+    def __init__(self, bssid, monitor_if=None, channel=None,
+                 prefix="/tmp/airodump-tracker", write_interval=1, csv_path=None):
+        self.bssid = bssid.lower()
+        # Station MAC, First seen, Last seen, Power, # packets, BSSID[, Probed ESSIDs]
+        self._row_re = re.compile(
+            r"^[ \t]*([0-9A-Fa-f]{2}(?::[0-9A-Fa-f]{2}){5})[ \t]*,[^,\n]*,([^,\n]*),[^,\n]*,[^,\n]*,"
+            r"[ \t]*(?i:" + re.escape(self.bssid) + r")[ \t\r]*(?:,|$)",
+            re.MULTILINE)
+        self.monitor_if = monitor_if
+        self.channel = channel
+        self.prefix = prefix
+        self.write_interval = write_interval
+        self.csv_path = csv_path or f"{prefix}-01.csv"
+        self.proc = None
+        self._file_key = None
+        self._section = None
+        self._stations = {}
+
+    def start(self):
+        """Launches the long-running airodump-ng for this BSSID/channel."""
+        for suffix in ("-01.csv", "-01.kismet.csv", "-01.kismet.netxml", "-01.log.csv"):
+            subprocess.run(["sudo", "rm", "-f", self.prefix + suffix],
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        self.proc = subprocess.Popen(
+            ["sudo", "airodump-ng", "--bssid", self.bssid, "--channel", str(self.channel),
+             "--write", self.prefix, "--output-format", "csv",
+             "--write-interval", str(self.write_interval), self.monitor_if],
+            start_new_session=True,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        return self
+
+    def stop(self):
+        if self.proc is None:
+            return
+        try:
+            os.killpg(os.getpgid(self.proc.pid), signal.SIGTERM)
+        except (ProcessLookupError, PermissionError):
+            pass
+        try:
+            self.proc.wait(timeout=3)
+        except subprocess.TimeoutExpired:
+            pass
+        self.proc = None
+
+    def invalidate(self):
+        """Forgets the cached file state so the next refresh re-reads the CSV."""
+        self._file_key = None
+
+    def refresh(self):
+        """Re-reads the CSV if it was rewritten. Returns True if the station set changed."""
+        try:
+            st = os.stat(self.csv_path)
+        except FileNotFoundError:
+            return False
+        key = (st.st_mtime_ns, st.st_size)
+        if key == self._file_key:
+            return False
+        with open(self.csv_path, "rb") as f:
+            data = f.read()
+        idx = data.find(STATION_HEADER)
+        if idx < 0:
+            return False  # caught mid-rewrite: keep the previous snapshot
+        self._file_key = key
+        section = data[idx:]
+        if section == self._section:
+            return False
+        self._section = section
+
+        # every rewrite changes most lines ("Last time seen", power, packets),
+        # so there is nothing to reuse per line; the regex skips other BSSIDs in C
+        rows = self._row_re.findall(section.decode("utf-8", errors="ignore"))
+        times = {text: parse_seen_time(text) or 0.0 for text in {seen for _, seen in rows}}
+        stations = {}
+        for mac, seen in rows:
+            seen = times[seen]
+            if seen >= stations.get(mac, 0.0):
+                stations[mac] = seen
+        changed = stations.keys() != self._stations.keys()
+        self._stations = stations
+        return changed
+
+    def snapshot(self, since=None):
+        """Station MACs associated with the BSSID, optionally only those seen at or after `since` (epoch)."""
+        self.refresh()
+        if since is None:
+            return set(self._stations)
+        since = int(since)  # airodump timestamps have one-second resolution
+        return {mac for mac, seen in self._stations.items() if seen >= since}
+
+    def count(self, baseline=None, since=None):
+        """Same return convention as main.parse_station_count."""
+        macs = self.snapshot(since)
+        if baseline is not None:
+            return len(macs & baseline)
+        return len(macs), macs
+
+    def window(self, duration, baseline=None):
+        """
+        Counts stations seen during the next `duration` seconds, waiting one
+        extra write interval so airodump has flushed the last of them.
+        """
+        since = time.time()
+        time.sleep(duration + self.write_interval)
+        return self.count(baseline, since)
+
+
+def replay_csv_sequence(paths, bssid, since=None, csv_path=None):
+    """
+    Test harness: copies recorded airodump CSVs one by one over the tracked
+    file, the way airodump rewrites it, and yields the snapshot after each.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        tracker = StationTracker(bssid, csv_path=csv_path or os.path.join(tmp, "replay-01.csv"))
+        for path in paths:
+            shutil.copyfile(path, tracker.csv_path)
+            tracker.invalidate()  # mtime may not tick between quick copies
+            yield tracker.snapshot(since)
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+step_trace.py - Versioned step traces of main_loop runs, and replay of them.
+
+File layout (little-endian):
+  magic b"WPATRACE", u16 version, u32 metadata length, metadata (JSON:
+  action-space signature plus free-form run info), then fixed-size step
+  records (RECORD_FORMAT / TRACE_DTYPE).
+
+TraceWriter appends and flushes one record per step, so a crash loses at
+most the step in flight; a torn last record is dropped on load and cut off
+before appending again. load_trace() maps all records into one NumPy
+structured array, and ReplayEnv / train_from_trace serve them back to
+QLearningAgent without any radio.
+"""
+
+import json
+import math
+import os
+import struct
+import time
+
+from reward import outcome_label
+
+MAGIC = b"WPATRACE"
+VERSION = 1
+HEADER = struct.Struct("<8sHI")
+# episode, step, state[3], action rank, next_state[3], station_count,
+# eapol_count, handshake, throughput, failures, p50, p95, p99, reward, time
+RECORD_FORMAT = struct.Struct("<II3iq3iiiidi3ddd")
+TRACE_FIELDS = [
+    ("episode", "<u4"), ("step", "<u4"), ("state", "<i4", (3,)), ("action", "<i8"),
+    ("next_state", "<i4", (3,)), ("station_count", "<i4"), ("eapol_count", "<i4"),
+    ("handshake", "<i4"), ("throughput", "<f8"), ("failures", "<i4"),
+    ("p50", "<f8"), ("p95", "<f8"), ("p99", "<f8"), ("reward", "<f8"), ("time", "<f8"),
+]
+
+
+class TraceFormatError(Exception):
+    pass
+
+
+def trace_dtype():
+    import numpy as np
+    return np.dtype(TRACE_FIELDS)
+
+
+def _read_header(f):
+    head = f.read(HEADER.size)
+    if len(head) < HEADER.size:
+        raise TraceFormatError("truncated trace header")
+    magic, version, meta_len = HEADER.unpack(head)
+    if magic != MAGIC:
+        raise TraceFormatError("not a trace file")
+    if version != VERSION:
+        raise TraceFormatError(f"unsupported trace version {version}")
+    meta = f.read(meta_len)
+    if len(meta) < meta_len:
+        raise TraceFormatError("truncated trace metadata")
+    return json.loads(meta.decode("utf-8")), HEADER.size + meta_len
+
+
+def _num(value, missing=math.nan):
+    return missing if value is None else value
+
+
+class TraceWriter:
+    def __init__(self, path, action_space=None, meta=None, fsync=False):
+        self.path = path
+        self.fsync = fsync
+        self.meta = dict(meta or {})
+        if action_space is not None:
+            self.meta["action_space"] = action_space.signature()
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            self._resume()
+        else:
+            blob = json.dumps(self.meta).encode("utf-8")
+            self.f = open(path, "wb")
+            self.f.write(HEADER.pack(MAGIC, VERSION, len(blob)) + blob)
+            self.f.flush()
+            self.count = 0
+
+    def _resume(self):
+        """Continues an existing trace, cutting off a torn last record."""
+        with open(self.path, "rb") as f:
+            meta, offset = _read_header(f)
+        if "action_space" in self.meta and meta.get("action_space") != self.meta["action_space"]:
+            raise TraceFormatError("trace was recorded with a different action space")
+        self.meta = meta
+        size = os.path.getsize(self.path)
+        self.count = (size - offset) // RECORD_FORMAT.size
+        self.f = open(self.path, "r+b")
+        self.f.truncate(offset + self.count * RECORD_FORMAT.size)
+        self.f.seek(0, os.SEEK_END)
+
+    def append(self, episode, step, state, action, next_state, reward,
+               station_count=0, features=None, probe=None, timestamp=None):
+        """
+        Writes one step. action is the rank in the action space, features the
+        TrafficAnalyzer.get_features() dict, probe get_reward_inputs().
+        """
+        features = features or {}
+        probe = probe or {}
+        self.f.write(RECORD_FORMAT.pack(
+            episode, step, *state, action, *next_state, station_count,
+            features.get("eapol_count", 0), int(features.get("handshake_detected", 0)),
+            _num(probe.get("throughput")), _num(probe.get("failures"), -1),
+            _num(probe.get("p50")), _num(probe.get("p95")), _num(probe.get("p99")),
+            reward, time.time() if timestamp is None else timestamp,
+        ))
+        self.f.flush()
+        if self.fsync:
+            os.fsync(self.f.fileno())
+        self.count += 1
+
+    def close(self):
+        if self.f is not None:
+            self.f.close()
+            self.f = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def load_trace(path):
+    """(metadata, records) with records a structured array of TRACE_DTYPE."""
+    import numpy as np
+    with open(path, "rb") as f:
+        meta, offset = _read_header(f)
+        f.seek(0)
+        data = f.read()
+    body = len(data) - offset
+    count = body // RECORD_FORMAT.size
+    if body % RECORD_FORMAT.size:
+        print(f"[WARN] {path}: dropping torn last record ({body % RECORD_FORMAT.size} bytes)")
+    records = np.frombuffer(data, dtype=trace_dtype(), count=count, offset=offset)
+    return meta, records
+
+
+def _state(row):
+    return tuple(int(v) for v in row)
+
+
+class ReplayEnv:
+    """
+    Serves a recorded trace with SimulatedEnv's reset/step interface.
+
+    mode="sequential" replays the recorded steps in order whatever the agent
+    picks (off-policy evaluation of the logged run). mode="lookup" answers
+    with an outcome recorded for the same (state, action) when one exists,
+    and falls back to the next sequential record otherwise. Either way the
+    outcome belongs to the logged transition, which info reports as "state"
+    and "action" (a rank); learners must update on those, not on their pick.
+    """
+
+    def __init__(self, trace, action_space=None, mode="sequential", seed=None):
+        import random
+        if isinstance(trace, (str, os.PathLike)):
+            self.meta, self.records = load_trace(trace)
+        else:
+            self.meta, self.records = {}, trace
+        if len(self.records) == 0:
+            raise TraceFormatError("empty trace")
+        if action_space is not None and "action_space" in self.meta \
+                and self.meta["action_space"] != action_space.signature():
+            raise TraceFormatError("trace was recorded with a different action space")
+        self.action_space = action_space
+        self.mode = mode
+        self.rng = random.Random(seed)
+        self.pos = 0
+        self.state = None
+        self._outcomes = None
+        if mode == "lookup":
+            self._outcomes = {}
+            for i, rec in enumerate(self.records):
+                key = (_state(rec["state"]), int(rec["action"]))
+                self._outcomes.setdefault(key, []).append(i)
+
+    def __len__(self):
+        return len(self.records)
+
+    def reset(self):
+        self.pos = 0
+        self.state = _state(self.records[0]["state"])
+        return self.state
+
+    def step(self, action):
+        """Returns (next_state, reward, info) like SimulatedEnv.step."""
+        if self.state is None:
+            self.reset()
+        idx = None
+        if self._outcomes is not None:
+            rank = action if isinstance(action, int) else self.action_space.index(action)
+            hits = self._outcomes.get((self.state, rank))
+            if hits:
+                idx = hits[0] if len(hits) == 1 else self.rng.choice(hits)
+        if idx is None:
+            idx = self.pos
+            self.pos = (self.pos + 1) % len(self.records)
+        rec = self.records[idx]
+        next_state = _state(rec["next_state"])
+        reward = float(rec["reward"])
+        self.state = next_state
+        info = {
+            "state": _state(rec["state"]),
+            "action": int(rec["action"]),
+            "station_count": int(rec["station_count"]),
+            "features": {"eapol_count": int(rec["eapol_count"]),
+                         "handshake_detected": int(rec["handshake"])},
+            "throughput": float(rec["throughput"]),
+            "pred": outcome_label(reward),
+            "index": idx,
+        }
+        return next_state, reward, info
+
+
+def train_from_trace(agent, trace, epochs=1, batch_size=4096):
+    """
+    Off-policy Q-learning over the recorded transitions, in batches through
+    update_q_batch. Returns the number of updates applied.
+    """
+    if isinstance(trace, (str, os.PathLike)):
+        meta, records = load_trace(trace)
+        sig = meta.get("action_space")
+        if sig is not None and sig != agent.actions.signature():
+            raise TraceFormatError("trace was recorded with a different action space")
+    else:
+        records = trace
+    states = [_state(s) for s in records["state"]]
+    next_states = [_state(s) for s in records["next_state"]]
+    actions = records["action"].tolist()
+    rewards = records["reward"].tolist()
+    done = 0
+    for _ in range(epochs):
+        for lo in range(0, len(records), batch_size):
+            hi = lo + batch_size
+            agent.update_q_batch(states[lo:hi], actions[lo:hi], rewards[lo:hi], next_states[lo:hi])
+            done += len(actions[lo:hi])
+    return done
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+supervisor.py - Launches and stops exactly its own attack processes.
+
+Commands are started from argv lists (no shell), each in its own session,
+so its process group id equals its pid. Stopping sends SIGTERM to every
+group it started, waits until a common deadline and SIGKILLs whatever is
+left - other mdk4/aireplay-ng instances on the host are never touched, and
+no Python thread blocks per instance. Start and stop latencies are kept
+for reporting.
+
+Works with any command, e.g. ProcessSupervisor().start(["sleep", "30"]).
+"""
+
+import os
+import signal
+import subprocess
+import time
+
+DEVNULL = subprocess.DEVNULL
+
+
+class ManagedProcess:
+    def __init__(self, name, argv, proc, start_latency):
+        self.name = name
+        self.argv = argv
+        self.proc = proc
+        self.pid = proc.pid
+        self.pgid = proc.pid  # start_new_session: leader of its own group
+        self.start_latency = start_latency
+        self.stop_latency = None
+        self.killed = False
+
+    def running(self):
+        return self.proc.poll() is None
+
+    @property
+    def returncode(self):
+        return self.proc.returncode
+
+
+def signal_group(pgid, sig):
+    """Signals a process group; falls back to sudo kill for groups owned by root."""
+    try:
+        os.killpg(pgid, sig)
+    except ProcessLookupError:
+        pass
+    except PermissionError:
+        subprocess.run(["sudo", "-n", "kill", f"-{int(sig)}", "--", f"-{pgid}"],
+                       stdout=DEVNULL, stderr=DEVNULL)
+
+
+class ProcessSupervisor:
+    def __init__(self, term_timeout=2.0):
+        self.term_timeout = term_timeout
+        self.procs = []
+        self.start_latencies = []
+        self.stop_latencies = []
+        self.killed = 0
+
+    def start(self, argv, name=None):
+        """Starts argv (a list) in a new session. Returns its ManagedProcess."""
+        if isinstance(argv, str):
+            raise TypeError("argv must be a list, commands are never run through a shell")
+        t0 = time.perf_counter()
+        proc = subprocess.Popen(argv, start_new_session=True,
+                                stdin=DEVNULL, stdout=DEVNULL, stderr=DEVNULL)
+        handle = ManagedProcess(name or os.path.basename(argv[0]), list(argv), proc,
+                                time.perf_counter() - t0)
+        self.procs.append(handle)
+        self.start_latencies.append(handle.start_latency)
+        return handle
+
+    def stop(self, handles=None, timeout=None):
+        """
+        SIGTERM to each group, then SIGKILL to those still alive after
+        `timeout` seconds. Defaults to every process started. Returns the
+        seconds the whole stop took.
+        """
+        handles = list(self.procs if handles is None else handles)
+        timeout = self.term_timeout if timeout is None else timeout
+        t0 = time.perf_counter()
+        live = [h for h in handles if h.running()]
+        for h in live:
+            signal_group(h.pgid, signal.SIGTERM)
+        deadline = t0 + timeout
+        for h in live:
+            try:
+                h.proc.wait(timeout=max(0.0, deadline - time.perf_counter()))
+            except subprocess.TimeoutExpired:
+                signal_group(h.pgid, signal.SIGKILL)
+                h.killed = True
+                self.killed += 1
+                try:
+                    h.proc.wait(timeout=1.0)
+                except subprocess.TimeoutExpired:
+                    print(f"[WARN] {h.name} (pid {h.pid}) survived SIGKILL")
+            h.stop_latency = time.perf_counter() - t0
+            self.stop_latencies.append(h.stop_latency)
+        for h in handles:
+            h.proc.poll()
+        done = {id(h) for h in handles}
+        self.procs = [h for h in self.procs if id(h) not in done]
+        return time.perf_counter() - t0
+
+    def running(self):
+        return [h for h in self.procs if h.running()]
+
+    def summary(self):
+        """Mean/max start and stop latency in seconds, plus how many needed SIGKILL."""
+        def stats(values):
+            if not values:
+                return {"count": 0, "mean": 0.0, "max": 0.0}
+            return {"count": len(values), "mean": sum(values) / len(values), "max": max(values)}
+        return {"start": stats(self.start_latencies), "stop": stats(self.stop_latencies),
+                "killed": self.killed}
+
+    def close(self):
+        self.stop()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+sweep.py - Parallel hyperparameter sweeps of QLearningAgent on the offline envs.
+
+Every run is a config dict (DEFAULT_CONFIG plus overrides). Its hash names
+the run, seeds it deterministically and keys its result file in the cache
+directory, so an interrupted sweep resumes with only the missing runs.
+The hash is salted with CODE_VERSION: bump it whenever a change to the
+agent, the envs or the reward makes cached results stale.
+Runs go to a process pool; results are reported in config order.
+
+Usage:
+  python sweep.py --param alpha=0.05,0.1,0.2 --param gamma=0.8,0.9 --repeats 3
+  python sweep.py --param epsilon_decay=0.9,0.95,0.98 --param 'pps_levels=[[1,2],[1,2,3]]' --random 4
+"""
+
+import argparse
+import csv
+import hashlib
+import itertools
+import json
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from attacks import ATTACK_CLASSES
+
+# part of every config hash; bump to invalidate all cached results
+CODE_VERSION = 2
+
+# the hard-coded agent setup of main_loop
+DEFAULT_CONFIG = {
+    "alpha": 0.1,
+    "gamma": 0.9,
+    "epsilon_start": 0.9,
+    "epsilon_end": 0.1,
+    "epsilon_decay": 0.98,
+    "max_combo": 2,
+    "pps_levels": [1, 2],
+    "threads_levels": [1, 2],
+    "power_levels": [1],
+    "duration_levels": [1, 2],
+    "attacks": [cls.__name__ for cls in ATTACK_CLASSES],
+    "env": "vector",
+    "n_envs": 64,
+    "stations": 8,
+    "episodes": 300,
+    "steps_per_episode": 3,
+    "repeat": 0,
+}
+
+
+def config_hash(config):
+    blob = json.dumps([CODE_VERSION, config], sort_keys=True, separators=(",", ":")).encode("utf-8")
+    return hashlib.sha256(blob).hexdigest()[:16]
+
+
+def make_configs(grid, base=None, repeats=1, samples=None, seed=0):
+    """
+    Configs for the cartesian product of grid ({key: [values]}), or `samples`
+    of them drawn with a seeded RNG, each repeated with repeat=0..repeats-1.
+    """
+    base = dict(DEFAULT_CONFIG, **(base or {}))
+    keys = sorted(grid)
+    combos = list(itertools.product(*(grid[k] for k in keys)))
+    if samples is not None and samples < len(combos):
+        combos = random.Random(seed).sample(combos, samples)
+    configs = []
+    for values in combos:
+        for repeat in range(repeats):
+            configs.append(dict(base, **dict(zip(keys, values)), repeat=repeat))
+    return configs
+
+
+def convergence_episode(rewards, fraction=0.9):
+    """
+    First episode whose smoothed reward has covered `fraction` of the way
+    from the first to the final level (final = mean of the last 10%).
+    """
+    n = len(rewards)
+    if n == 0:
+        return None
+    width = max(1, n // 20)
+    final = sum(rewards[-max(1, n // 10):]) / max(1, n // 10)
+    start = sum(rewards[:width]) / width
+    target = start + fraction * (final - start)
+    rising = final >= start
+    acc = 0.0
+    for i, r in enumerate(rewards):
+        acc += r
+        if i >= width:
+            acc -= rewards[i - width]
+        smoothed = acc / min(i + 1, width)
+        if (smoothed >= target) if rising else (smoothed <= target):
+            return i + 1
+    return n
+
+
+def run_config(config):
+    """Worker: trains one agent for config. Returns the result dict."""
+    import attacks
+    from ml_core import QLearningAgent
+
+    key = config_hash(config)
+    seed = int(key[:8], 16)
+    random.seed(seed)
+    agent = QLearningAgent(
+        attack_classes=[getattr(attacks, name) for name in config["attacks"]],
+        pps_levels=config["pps_levels"], threads_levels=config["threads_levels"],
+        power_levels=config["power_levels"], duration_levels=config["duration_levels"],
+        max_combo=config["max_combo"], alpha=config["alpha"], gamma=config["gamma"],
+        epsilon_start=config["epsilon_start"], epsilon_end=config["epsilon_end"],
+        epsilon_decay=config["epsilon_decay"],
+        q_backend="dense" if config["env"] == "vector" else "dict",
+    )
+    start = time.perf_counter()
+    if config["env"] == "vector":
+        from vector_env import VectorSimEnv, train_vectorized
+        env = VectorSimEnv(agent.actions, n_envs=config["n_envs"],
+                           stations=config["stations"], seed=seed)
+        rewards, _ = train_vectorized(agent, env, config["episodes"],
+                                      config["steps_per_episode"], seed=seed)
+        rewards = rewards.tolist()
+    elif config["env"] == "sim":
+        from sim_env import SimulatedEnv, run_training
+        env = SimulatedEnv(stations=config["stations"], seed=seed)
+        rewards = run_training(agent, env, config["episodes"], config["steps_per_episode"])
+    else:
+        raise ValueError(f"unknown env {config['env']!r}")
+    elapsed = time.perf_counter() - start
+
+    tail = rewards[-max(1, len(rewards) // 10):]
+    best = agent.get_best_action((config["stations"], 0, 0))
+    return {
+        "hash": key,
+        "config": config,
+        "final_reward": sum(tail) / len(tail),
+        "converge_episode": convergence_episode(rewards),
+        "seconds": elapsed,
+        "best_combo": [[atk.name, pps, thr, pw, dur] for atk, pps, thr, pw, dur in best] if best else None,
+    }
+
+
+def _cache_path(cache_dir, key):
+    return os.path.join(cache_dir, f"{key}.json")
+
+
+def _store(cache_dir, result):
+    path = _cache_path(cache_dir, result["hash"])
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(result, f)
+    os.replace(tmp, path)
+
+
+def run_sweep(configs, cache_dir=".sweep_cache", workers=None):
+    """
+    Runs every config not yet in cache_dir on a process pool, storing each
+    result as soon as it finishes. Returns the results in config order.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    results = {}
+    pending = []
+    queued = set()
+    for config in configs:
+        key = config_hash(config)
+        try:
+            with open(_cache_path(cache_dir, key), encoding="utf-8") as f:
+                results[key] = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            if key not in queued:
+                queued.add(key)
+                pending.append(config)
+    print(f"[INFO] Sweep: {len(configs)} runs, {len(results) + len(pending)} distinct: "
+          f"{len(results)} cached, {len(pending)} to run.")
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(pending) <= 1:
+        for config in pending:
+            result = run_config(config)
+            _store(cache_dir, result)
+            results[result["hash"]] = result
+    elif pending:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(run_config, config) for config in pending]
+            for done, fut in enumerate(as_completed(futures), 1):
+                result = fut.result()
+                _store(cache_dir, result)
+                results[result["hash"]] = result
+                print(f"[INFO] Sweep: {done}/{len(pending)} done")
+    return [results[config_hash(c)] for c in configs]
+
+
+def summarize(results):
+    """
+    One row per distinct config (repeats averaged), best final reward first.
+    Varied parameters are the keys whose values differ across results.
+    """
+    varied = sorted(k for k in DEFAULT_CONFIG if k != "repeat"
+                    and len({json.dumps(r["config"].get(k)) for r in results}) > 1)
+    groups = {}
+    for r in results:
+        cfg = {k: v for k, v in r["config"].items() if k != "repeat"}
+        groups.setdefault(config_hash(cfg), []).append(r)
+    rows = []
+    for runs in groups.values():
+        n = len(runs)
+        row = {k: runs[0]["config"].get(k) for k in varied}
+        row["runs"] = n
+        row["final_reward"] = sum(r["final_reward"] for r in runs) / n
+        row["converge_episode"] = sum(r["converge_episode"] or 0 for r in runs) / n
+        row["seconds"] = sum(r["seconds"] for r in runs) / n
+        rows.append(row)
+    rows.sort(key=lambda row: -row["final_reward"])
+    return varied, rows
+
+
+def print_table(varied, rows):
+    cols = varied + ["runs", "final_reward", "converge_episode", "seconds"]
+    cells = [[json.dumps(row[c]) if c in varied else
+              (f"{row[c]:.2f}" if isinstance(row[c], float) else str(row[c])) for c in cols]
+             for row in rows]
+    widths = [max([len(c)] + [len(line[i]) for line in cells]) for i, c in enumerate(cols)]
+    print(" | ".join(c.ljust(w) for c, w in zip(cols, widths)))
+    print("-+-".join("-" * w for w in widths))
+    for line in cells:
+        print(" | ".join(v.ljust(w) for v, w in zip(line, widths)))
+
+
+def write_csv(path, varied, rows):
+    cols = varied + ["runs", "final_reward", "converge_episode", "seconds"]
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(cols)
+        for row in rows:
+            writer.writerow([json.dumps(row[c]) if c in varied else row[c] for c in cols])
+
+
+def parse_param(text):
+    """'alpha=0.05,0.1' -> ('alpha', [0.05, 0.1]); a value starting with '[' is a JSON list of values."""
+    key, _, values = text.partition("=")
+    key = key.strip()
+    if key not in DEFAULT_CONFIG:
+        raise argparse.ArgumentTypeError(f"unknown parameter {key!r}")
+    values = values.strip()
+    if values.startswith("["):
+        parsed = json.loads(values)
+    else:
+        parsed = [json.loads(v) if v.strip()[:1].isdigit() or v.strip()[:1] in "-." else v.strip()
+                  for v in values.split(",")]
+    return key, parsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hyperparameter sweep on the offline environments.")
+    parser.add_argument("--param", action="append", type=parse_param, default=[],
+                        help="key=v1,v2,... (repeatable); lists as JSON, e.g. 'pps_levels=[[1,2],[1,2,3]]'")
+    parser.add_argument("--random", type=int, default=None, help="sample this many grid points")
+    parser.add_argument("--repeats", type=int, default=1)
+    parser.add_argument("--episodes", type=int, default=None)
+    parser.add_argument("--env", choices=("vector", "sim"), default=None)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0, help="seed of the --random sampling")
+    parser.add_argument("--cache-dir", default=".sweep_cache")
+    parser.add_argument("--csv", dest="csv_out", default=None, help="write the summary table here")
+    args = parser.parse_args()
+
+    base = {}
+    if args.episodes is not None:
+        base["episodes"] = args.episodes
+    if args.env is not None:
+        base["env"] = args.env
+    configs = make_configs(dict(args.param), base, args.repeats, args.random, args.seed)
+    results = run_sweep(configs, args.cache_dir, args.workers)
+    varied, rows = summarize(results)
+    print_table(varied, rows)
+    if args.csv_out:
+        write_csv(args.csv_out, varied, rows)
+        print(f"[INFO] Sweep summary: {args.csv_out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+synthetic.py - Synthetic capture fixtures for offline analysis and benchmarks.
+
+Builds radiotap/802.11 pcap files with plain struct packing, and airodump-ng
+style CSV files, so fixtures can be generated without scapy or a
+monitor-mode interface.
+"""
+
+import random
+import struct
+import time
+
+PCAP_MAGIC = 0xA1B2C3D4
+LINKTYPE_RADIOTAP = 127
+
+# frame control: (type << 2) | (subtype << 4)
+FC_BEACON = 0x80
+FC_DEAUTH = 0xC0
+FC_AUTH = 0xB0
+FC_DATA = 0x08
+FC_QOS_DATA = 0x88
+
+LLC_SNAP_EAPOL = b"\xaa\xaa\x03\x00\x00\x00\x88\x8e"
+LLC_SNAP_IPV4 = b"\xaa\xaa\x03\x00\x00\x00\x08\x00"
+
+
+def mac_bytes(mac):
+    return bytes(int(x, 16) for x in mac.split(":"))
+
+
+def random_mac(rng):
+    return ":".join(f"{rng.randrange(256):02x}" for _ in range(6))
+
+
+def radiotap_header(rssi=-50):
+    """Radiotap with Flags and dBm antenna signal fields (10 bytes)."""
+    present = (1 << 1) | (1 << 5)
+    flags = 0
+    return struct.pack("<BBHIBb", 0, 0, 10, present, flags, rssi)
+
+
+def dot11_frame(fc, addr1, addr2, addr3, body=b"", retry=False, seq=0):
+    flags = 0x08 if retry else 0x00
+    if fc & 0x0C == 0x08:
+        flags |= 0x01  # to-DS
+    hdr = struct.pack("<BBH", fc, flags, 0)
+    hdr += mac_bytes(addr1) + mac_bytes(addr2) + mac_bytes(addr3)
+    hdr += struct.pack("<H", (seq & 0xFFF) << 4)
+    if fc == FC_QOS_DATA:
+        hdr += b"\x00\x00"
+    return hdr + body
+
+
+def eapol_key_body(msg=1):
+    key_info = (0x008A, 0x010A, 0x13CA, 0x030A)[(msg - 1) % 4]
+    eapol = struct.pack(">BBHBH", 2, 3, 95, 2, key_info) + b"\x00" * 90
+    return LLC_SNAP_EAPOL + eapol
+
+
+def write_pcap(path, records, linktype=LINKTYPE_RADIOTAP, snaplen=65535):
+    """Write (timestamp, frame_bytes) records as a classic pcap file."""
+    with open(path, "wb") as f:
+        f.write(struct.pack("<IHHiIII", PCAP_MAGIC, 2, 4, 0, 0, snaplen, linktype))
+        for ts, data in records:
+            sec = int(ts)
+            usec = int((ts - sec) * 1e6)
+            f.write(struct.pack("<IIII", sec, usec, len(data), len(data)))
+            f.write(data)
+    return path
+
+
+def synthetic_frames(bssid, count=10000, stations=20, eapol_every=50,
+                     start_ts=1700000000.0, seed=0):
+    """
+    Yield (timestamp, frame) records mimicking a monitor-mode capture:
+    beacons, deauth/auth bursts, station data and periodic EAPOL handshakes.
+    """
+    rng = random.Random(seed)
+    macs = [random_mac(rng) for _ in range(stations)]
+    ts = start_ts
+    for i in range(count):
+        ts += rng.expovariate(1000.0)
+        rssi = rng.randint(-90, -30)
+        retry = rng.random() < 0.1
+        sta = macs[i % stations]
+        roll = i % eapol_every
+        if roll == 0:
+            body = eapol_key_body(1 + (i // eapol_every) % 4)
+            frame = dot11_frame(FC_DATA, bssid, sta, bssid, body, retry, i)
+        elif roll % 10 == 1:
+            frame = dot11_frame(FC_BEACON, "ff:ff:ff:ff:ff:ff", bssid, bssid,
+                                b"\x00" * 12, retry, i)
+        elif roll % 10 == 2:
+            frame = dot11_frame(FC_DEAUTH, sta, bssid, bssid, b"\x07\x00", retry, i)
+        elif roll % 10 == 3:
+            frame = dot11_frame(FC_AUTH, bssid, sta, bssid, b"\x00" * 6, retry, i)
+        else:
+            body = LLC_SNAP_IPV4 + b"\x45" + b"\x00" * 39
+            frame = dot11_frame(FC_QOS_DATA, bssid, sta, bssid, body, retry, i)
+        yield ts, radiotap_header(rssi) + frame
+
+
+def write_synthetic_pcap(path, bssid="aa:bb:cc:dd:ee:ff", count=10000, **kwargs):
+    return write_pcap(path, synthetic_frames(bssid, count=count, **kwargs))
+
+
+def airodump_csv(bssid, stations, channel=6, essid="test", now=None, other_bssid=None):
+    """
+    Text of an airodump-ng CSV. stations: iterable of (mac, last_seen_epoch)
+    associated with bssid; other_bssid adds one foreign station.
+    """
+    now = now or time.time()
+    fmt = lambda t: time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(t))
+    lines = [
+        "",
+        "BSSID, First time seen, Last time seen, channel, Speed, Privacy, Cipher, "
+        "Authentication, Power, # beacons, # IV, LAN IP, ID-length, ESSID, Key",
+        f"{bssid.upper()}, {fmt(now - 60)}, {fmt(now)}, {channel:>2}, 54, WPA2, CCMP, PSK, "
+        f"-40, 100, 0, 0.  0.  0.  0, {len(essid):>3}, {essid}, ",
+        "",
+        "Station MAC, First time seen, Last time seen, Power, # packets, BSSID, Probed ESSIDs",
+    ]
+    for i, (mac, seen) in enumerate(stations):
+        lines.append(f"{mac.upper()}, {fmt(seen - 30)}, {fmt(seen)}, -{40 + i % 40}, "
+                     f"{10 + i}, {bssid.upper()}, ")
+    if other_bssid:
+        lines.append(f"02:00:00:00:00:01, {fmt(now - 30)}, {fmt(now)}, -70, 3, "
+                     f"{other_bssid.upper()}, ")
+    lines.append("")
+    return "\r\n".join(lines) + "\r\n"
+
+
+def write_airodump_sequence(directory, bssid="aa:bb:cc:dd:ee:ff", steps=10,
+                            stations=20, drop_every=3, start=1700000000.0, seed=0):
+    """
+    Writes steps successive CSV snapshots (one per second of airodump time)
+    in which every drop_every-th station stops being seen, like a deauth run.
+    Returns the file paths in order.
+    """
+    import os
+    rng = random.Random(seed)
+    macs = [random_mac(rng) for _ in range(stations)]
+    last_seen = {mac: start for mac in macs}
+    paths = []
+    for step in range(steps):
+        now = start + step
+        for i, mac in enumerate(macs):
+            if not (drop_every and i % drop_every == 0 and step > 0):
+                last_seen[mac] = now
+        path = os.path.join(directory, f"airodump-{step:03d}.csv")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(airodump_csv(bssid, last_seen.items(), now=now,
+                                 other_bssid="11:22:33:44:55:66"))
+        paths.append(path)
+    return paths
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+test_action_space.py - ActionSpace rank/index round trips and rejected combos.
+
+Run: python -m pytest -q test_action_space.py
+"""
+
+import pytest
+
+from action_space import ActionSpace
+from attacks import ATTACK_CLASSES
+
+
+def make_space():
+    return ActionSpace(ATTACK_CLASSES, [1, 2], [1], [1], [1, 2], 2)
+
+
+def test_index_round_trip():
+    space = make_space()
+    for rank in range(0, len(space), 13):
+        assert space.index(space[rank]) == rank
+    # combos from another space with the same signature resolve too
+    other = make_space()
+    assert space.index(other[len(space) - 1]) == len(space) - 1
+    assert space.index(tuple(reversed(other[len(space) - 1]))) == len(space) - 1
+
+
+def test_index_rejects_invalid_combos():
+    space = make_space()
+    single = space[0][0]
+    with pytest.raises(ValueError, match="repeats a slot"):
+        space.index((single, single))
+    with pytest.raises(ValueError, match="size"):
+        space.index(())
+    with pytest.raises(ValueError, match="size"):
+        space.index(space[0] + space[1] + space[2])
+    with pytest.raises(ValueError, match="not part"):
+        space.index(((single[0], 9, 1, 1, 1),))
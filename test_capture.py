@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+test_capture.py - LiveCapture fed a synthetic pcap through a pipe, against analyze_offline.
+
+Run: python -m pytest -q test_capture.py
+"""
+
+import os
+import threading
+import time
+
+import instrument
+from capture import LiveCapture
+from synthetic import write_synthetic_pcap
+from traffic_analyzer import TrafficAnalyzer
+
+BSSID = "aa:bb:cc:dd:ee:ff"
+
+
+def offline(path):
+    analyzer = TrafficAnalyzer(pcap_file=path, bssid=BSSID)
+    analyzer.analyze_offline()
+    return analyzer
+
+
+def piped(path, chunk=1000, delay=0.0):
+    """Read end of a pipe that a thread fills with the pcap in odd-sized chunks."""
+    read_fd, write_fd = os.pipe()
+    with open(path, "rb") as f:
+        data = f.read()
+
+    def feed():
+        time.sleep(delay)
+        with os.fdopen(write_fd, "wb", buffering=0) as out:
+            for i in range(0, len(data), chunk):
+                out.write(data[i:i + chunk])
+
+    threading.Thread(target=feed, daemon=True).start()
+    return os.fdopen(read_fd, "rb", buffering=0)
+
+
+def test_pipe_matches_offline(tmp_path):
+    path = write_synthetic_pcap(str(tmp_path / "cap.pcap"), BSSID, count=3000, eapol_every=40)
+    ref = offline(path)
+    analyzer = TrafficAnalyzer(pcap_file=None, bssid=BSSID)
+    live = LiveCapture(analyzer, piped(path, chunk=777)).start()
+    assert live.wait(10)
+    assert live.finished
+    features = live.snapshot()
+    live.stop()
+    assert features == dict(ref.get_features(), packet_count=ref.packet_count)
+    assert analyzer.packet_count == 3000
+    assert analyzer.subtype_counts == ref.subtype_counts
+    assert analyzer.fallback_count == ref.fallback_count == 0
+
+
+def test_window_counts_and_instruments(tmp_path):
+    path = write_synthetic_pcap(str(tmp_path / "cap.pcap"), BSSID, count=2000, eapol_every=25)
+    ref = offline(path)
+    analyzer = TrafficAnalyzer(pcap_file=None, bssid=BSSID)
+    # the writer starts after the window has opened; the window closes at EOF
+    live = LiveCapture(analyzer, piped(path, delay=0.3)).start()
+    instrument.reset()
+    instrument.enable()
+    try:
+        t0 = time.perf_counter()
+        features = live.window(30)
+        elapsed = time.perf_counter() - t0
+    finally:
+        instrument.disable()
+    live.stop()
+    assert elapsed < 10
+    assert features["packet_count"] == ref.packet_count == 2000
+    assert features["eapol_count"] == ref.eapol_count == 80
+    assert features["handshake_detected"] == 1
+    data = instrument.summary()
+    assert data["capture.window"]["count"] == 1
+    assert data["counters"]["capture.packets"] == 2000
+    assert data["counters"]["capture.eapol"] == 80
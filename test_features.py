@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+test_features.py - window_features against its per-frame reference.
+
+Run: python -m pytest -q test_features.py
+"""
+
+import numpy as np
+import pytest
+
+from features import window_features, window_features_loop
+
+
+@pytest.mark.parametrize("span", [10.0, 40000.0])
+def test_matches_loop_reference(span):
+    # 40000 s at 0.5 s windows is 80000 windows, past the old 2^15 packing limit
+    rng = np.random.default_rng(0)
+    n = 5000
+    ts = np.sort(rng.random(n) * span)
+    cls = rng.integers(0, 4, n)
+    src = rng.integers(1, 2 ** 48, 20, dtype=np.uint64)[rng.integers(0, 20, n)]
+    src[::7] = 0
+    dst = src[::-1].copy()
+    rssi = rng.normal(-60.0, 5.0, n)
+    retry = rng.integers(0, 2, n)
+    fast = window_features(ts, cls, src, dst, rssi, retry)
+    ref = window_features_loop(ts.tolist(), cls.tolist(), src.tolist(), dst.tolist(),
+                               rssi.tolist(), retry.tolist())
+    assert np.allclose(fast, ref)
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+test_frame_parser.py - The native classifier against scapy on synthetic captures.
+
+Run: python -m pytest -q test_frame_parser.py
+"""
+
+import struct
+
+import pytest
+
+from frame_parser import LINKTYPE_RADIOTAP, classify_frame
+from synthetic import (FC_QOS_DATA, LLC_SNAP_IPV4, eapol_key_body, mac_bytes,
+                       radiotap_header, synthetic_frames, write_synthetic_pcap)
+from traffic_analyzer import TrafficAnalyzer
+
+scapy_dot11 = pytest.importorskip("scapy.layers.dot11")
+from scapy.layers.eap import EAPOL  # noqa: E402
+
+BSSID = "aa:bb:cc:dd:ee:ff"
+STA = "02:11:22:33:44:55"
+OTHER = "02:66:77:88:99:aa"
+
+
+def raw_frame(fc, flags, addrs, body=b"", qos=False):
+    """802.11 frame with explicit flags and 1-4 addresses (the 4th after seq ctl)."""
+    hdr = struct.pack("<BBH", fc, flags, 0) + b"".join(mac_bytes(a) for a in addrs[:3])
+    if len(addrs) > 2:
+        hdr += struct.pack("<H", 0x10)
+    if len(addrs) > 3:
+        hdr += mac_bytes(addrs[3])
+    if qos:
+        hdr += b"\x00\x00"
+    return radiotap_header() + hdr + body
+
+
+def edge_frames():
+    eapol = eapol_key_body(2)
+    return [
+        raw_frame(0x08, 0x02, [STA, BSSID, OTHER], eapol),                 # from-DS EAPOL
+        raw_frame(0x08, 0x00, [STA, OTHER, BSSID], eapol),                 # ad hoc EAPOL
+        raw_frame(0x88, 0x03, [BSSID, STA, OTHER, OTHER], eapol, True),    # 4-address QoS EAPOL
+        raw_frame(0x88, 0x41, [BSSID, STA, BSSID], b"\x00" * 24, True),    # protected
+        raw_frame(0x08, 0x01, [BSSID, STA, BSSID], LLC_SNAP_IPV4 + b"\x45" + b"\x00" * 19),
+        raw_frame(0x48, 0x01, [BSSID, STA, BSSID]),                         # null data
+        raw_frame(0xB4, 0x00, [BSSID, STA]),                                # RTS
+        raw_frame(0xD4, 0x00, [STA]),                                       # ACK
+        raw_frame(0x40, 0x00, ["ff:ff:ff:ff:ff:ff", STA, "ff:ff:ff:ff:ff:ff"], b"\x00\x00"),
+        raw_frame(FC_QOS_DATA, 0x01, [BSSID, STA, BSSID], b"\xaa\xaa\x03", True),  # short LLC
+    ]
+
+
+def scapy_view(frame):
+    """(type, subtype, bssid, is_eapol) as scapy dissects the frame."""
+    pkt = scapy_dot11.RadioTap(frame)
+    dot11 = pkt[scapy_dot11.Dot11]
+    ds = int(dot11.FCfield) & 0x03
+    if dot11.type == 1:
+        bssid = None
+    elif dot11.type == 0 or ds == 0:
+        bssid = dot11.addr3
+    else:
+        bssid = {1: dot11.addr1, 2: dot11.addr2, 3: None}[ds]
+    return dot11.type, dot11.subtype, bssid, pkt.haslayer(EAPOL)
+
+
+def native_view(frame):
+    info = classify_frame(frame, LINKTYPE_RADIOTAP)
+    assert info is not None
+    ftype, subtype, bssid, is_eapol = info
+    if bssid is not None:
+        bssid = ":".join(f"{b:02x}" for b in bssid)
+    return ftype, subtype, bssid, is_eapol
+
+
+def test_synthetic_frames_match_scapy():
+    frames = [frame for _, frame in synthetic_frames(BSSID, count=400, stations=7, eapol_every=9)]
+    assert sum(native_view(f)[3] for f in frames) == 45
+    for frame in frames:
+        assert native_view(frame) == scapy_view(frame)
+
+
+def test_edge_frames_classified():
+    assert [native_view(f)[3] for f in edge_frames()] == [True] * 3 + [False] * 7
+
+
+@pytest.mark.parametrize("index", range(len(edge_frames())))
+def test_edge_frames_match_scapy(index):
+    frame = edge_frames()[index]
+    assert native_view(frame) == scapy_view(frame)
+
+
+def test_engines_agree(tmp_path):
+    path = write_synthetic_pcap(str(tmp_path / "cap.pcap"), BSSID, count=3000, eapol_every=40)
+    results = {}
+    for engine in ("native", "scapy"):
+        analyzer = TrafficAnalyzer(pcap_file=path, bssid=BSSID, engine=engine)
+        analyzer.analyze_offline()
+        results[engine] = (analyzer.packet_count, analyzer.subtype_counts, analyzer.get_features())
+        if engine == "native":
+            assert analyzer.fallback_count == 0
+    assert results["native"] == results["scapy"]
+    assert results["native"][2] == {"eapol_count": 75, "handshake_detected": 1}
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+test_headless.py - Config validation and the target queue, without radio or main_loop.
+
+Run: python -m pytest -q test_headless.py
+"""
+
+import os
+
+import pytest
+
+from headless import ConfigError, load_config, plan_runs, run_queue
+
+
+def make_config(tmp_path, targets, **settings):
+    config = load_config(overrides=dict({"interface": "wlan0mon", "monitor": True,
+                                         "pause_between": 0, "output_dir": str(tmp_path)},
+                                        **settings))
+    config["targets"] = targets
+    return config
+
+
+def target(n, **extra):
+    return dict({"bssid": f"AA:BB:CC:DD:EE:0{n}", "channel": 6, "authorized": True}, **extra)
+
+
+def test_plan_requires_authorized(tmp_path):
+    for flag in (None, False, "true", 1):
+        t = target(1)
+        if flag is None:
+            del t["authorized"]
+        else:
+            t["authorized"] = flag
+        with pytest.raises(ConfigError, match="authorized"):
+            plan_runs(make_config(tmp_path, [target(2), t]))
+
+
+def test_plan_rejects_bad_targets(tmp_path):
+    with pytest.raises(ConfigError, match="duplicate name"):
+        plan_runs(make_config(tmp_path, [target(1, name="ap"), target(2, name="ap")]))
+    with pytest.raises(ConfigError, match="duplicate name"):
+        plan_runs(make_config(tmp_path, [target(1), target(1)]))
+    with pytest.raises(ConfigError, match="unknown keys"):
+        plan_runs(make_config(tmp_path, [target(1, episdoes=3)]))
+    with pytest.raises(ConfigError, match="invalid BSSID"):
+        plan_runs(make_config(tmp_path, [dict(target(1), bssid="AA:BB:CC")]))
+    with pytest.raises(ConfigError, match="unknown attack"):
+        plan_runs(make_config(tmp_path, [target(1, attacks=["NoSuchFlood"])]))
+    with pytest.raises(ConfigError, match="unknown agent parameters"):
+        plan_runs(make_config(tmp_path, [target(1, agent={"alpah": 0.2})]))
+    with pytest.raises(ConfigError, match="no targets"):
+        plan_runs(make_config(tmp_path, []))
+
+
+def test_plan_resolves_templates(tmp_path):
+    config = make_config(tmp_path, [target(1, name="lab", episodes=4, agent={"alpha": 0.5}), target(2)],
+                         report="{name}/report.html", checkpoint="ckpt-{index}-{bssid}",
+                         agent={"alpha": 0.2, "gamma": 0.8})
+    first, second = plan_runs(config)
+    assert first["report"] == os.path.join(str(tmp_path), "lab", "report.html")
+    assert first["checkpoint"] == os.path.join(str(tmp_path), "ckpt-1-aabbccddee01")
+    assert second["name"] == "aabbccddee02"
+    assert second["report"] == os.path.join(str(tmp_path), "aabbccddee02", "report.html")
+    assert (first["episodes"], second["episodes"]) == (4, 15)
+    assert first["agent"] == {"alpha": 0.5, "gamma": 0.8}
+    assert second["agent"] == {"alpha": 0.2, "gamma": 0.8}
+    assert first["trace"] is None
+
+
+def test_queue_moves_on_after_failure(tmp_path):
+    config = make_config(tmp_path, [target(1, name="a"), target(2, name="b"), target(3, name="c")],
+                         report="{name}/report.html")
+    seen = []
+
+    def run(monitor_if, settings):
+        seen.append((monitor_if, settings["name"]))
+        assert os.path.isdir(os.path.dirname(settings["report"]))
+        if settings["name"] == "b":
+            raise RuntimeError("airodump-ng died")
+        return None, [(1, 1, None)]
+
+    results = run_queue(config, run=run)
+    assert seen == [("wlan0mon", "a"), ("wlan0mon", "b"), ("wlan0mon", "c")]
+    assert [(name, ok) for name, ok, _, _ in results] == [("a", True), ("b", False), ("c", True)]
+    assert results[1][3] == "airodump-ng died"
+    assert results[0][3] == "1 successful steps, best: -"
+
+
+def test_queue_stops_on_interrupt(tmp_path):
+    config = make_config(tmp_path, [target(1, name="a"), target(2, name="b")])
+
+    def run(monitor_if, settings):
+        raise KeyboardInterrupt
+
+    results = run_queue(config, run=run)
+    assert [(name, ok, detail) for name, ok, _, detail in results] == [("a", False, "interrupted")]
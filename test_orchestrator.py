@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+test_orchestrator.py - Orchestrator over SimIO, and run_commands with sleep stand-ins.
+
+Run: python -m pytest -q test_orchestrator.py
+"""
+
+import asyncio
+import os
+import time
+
+import pytest
+
+from attacks import ATTACK_CLASSES
+from ml_core import QLearningAgent
+from orchestrator import Orchestrator, SimIO, run, run_commands
+from sim_env import SimulatedEnv
+
+
+def make_agent():
+    return QLearningAgent(attack_classes=ATTACK_CLASSES, pps_levels=[1], threads_levels=[1],
+                          power_levels=[1], duration_levels=[1], max_combo=1)
+
+
+def alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    return True
+
+
+def pid_command(path, ignore_term=False):
+    """sh that records its pid, then becomes `sleep 30` (optionally deaf to SIGTERM)."""
+    trap = "trap '' TERM; " if ignore_term else ""
+    return ["sh", "-c", f"{trap}echo $$ > {path}; exec sleep 30"]
+
+
+async def read_pid(path):
+    for _ in range(200):
+        if os.path.exists(path) and open(path).read().strip():
+            return int(open(path).read())
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"{path} never written")
+
+
+class SlowStationsIO(SimIO):
+    async def stations(self, seconds):
+        await asyncio.sleep(5)
+        return 0
+
+
+def test_run_with_simio():
+    agent = make_agent()
+    steps = []
+    orch = Orchestrator(agent, SimIO(SimulatedEnv(seed=1)), episodes=4, steps_per_episode=3,
+                        cooldown=0, verbose=False, on_step=lambda *args: steps.append(args))
+    rewards = run(orch)
+    assert len(rewards) == 4
+    assert len(steps) == 12
+    assert agent.Q.best_action((8, 0, 0)) is not None
+    assert orch.timeouts_hit == {}
+    summary = orch.summary()
+    assert {"attack", "capture", "stations", "probe", "window"} <= set(summary)
+
+
+def test_stations_timeout_keeps_previous_count():
+    steps = []
+    orch = Orchestrator(make_agent(), SlowStationsIO(SimulatedEnv(seed=2)), episodes=1,
+                        steps_per_episode=2, cooldown=0, timeouts={"stations": 0.05},
+                        verbose=False, on_step=lambda *args: steps.append(args))
+    run(orch)
+    assert orch.timeouts_hit == {"stations": 2}
+    for _, _, state, _, next_state, reward, new_count, _, current_perf in steps:
+        # no full-drop bonus: the count is the one from before the step
+        assert new_count == state[0]
+        assert next_state[0] == state[0]
+        assert reward == pytest.approx(orch.baseline_perf - current_perf)
+
+
+def test_run_commands_stops_sleep(tmp_path):
+    path = str(tmp_path / "pid")
+
+    async def go():
+        task = asyncio.ensure_future(run_commands([pid_command(path), ["sleep", "30"]], 0.3))
+        pid = await read_pid(path)
+        assert alive(pid)
+        latency = await task
+        return pid, latency
+
+    pid, latency = asyncio.run(go())
+    assert not alive(pid)
+    assert latency < 1.0
+
+
+def test_run_commands_kills_after_term_timeout(tmp_path):
+    path = str(tmp_path / "pid")
+
+    async def go():
+        task = asyncio.ensure_future(
+            run_commands([pid_command(path, ignore_term=True)], 0.2, term_timeout=0.3))
+        pid = await read_pid(path)
+        return pid, await task
+
+    pid, latency = asyncio.run(go())
+    assert not alive(pid)
+    assert 0.3 <= latency < 2.0
+
+
+def test_cancel_stops_commands(tmp_path):
+    path = str(tmp_path / "pid")
+
+    async def go():
+        task = asyncio.ensure_future(
+            run_commands([pid_command(path, ignore_term=True)], 30, term_timeout=0.2))
+        pid = await read_pid(path)
+        t0 = time.perf_counter()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return pid, time.perf_counter() - t0
+
+    pid, elapsed = asyncio.run(go())
+    assert not alive(pid)
+    assert elapsed < 2.0
+
+
+def test_cancel_run_stops_attack_in_flight(tmp_path):
+    path = str(tmp_path / "pid")
+    io = SimIO(SimulatedEnv(seed=3), time_scale=10.0, commands=lambda combo: [pid_command(path)])
+    orch = Orchestrator(make_agent(), io, episodes=1, steps_per_episode=1, attack_seconds=3,
+                        cooldown=0, timeouts={"attack": 60}, verbose=False)
+
+    async def go():
+        task = asyncio.ensure_future(orch.run())
+        pid = await read_pid(path)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return pid
+
+    assert not alive(asyncio.run(go()))
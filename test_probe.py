@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+test_probe.py - The concurrent prober against the asyncio stand-in server.
+
+Run: python -m pytest -q test_probe.py
+"""
+
+import asyncio
+
+import pytest
+
+from probe import probe, start_stand_in_server
+
+DELAY = 0.02
+
+
+async def measure(concurrency, delay=DELAY, duration=0.6):
+    server = await start_stand_in_server(delay=delay)
+    port = server.sockets[0].getsockname()[1]
+    try:
+        return await probe("127.0.0.1", port, duration, concurrency, timeout=1.0)
+    finally:
+        server.close()
+        await server.wait_closed()
+
+
+def test_rate_and_latency():
+    result = asyncio.run(measure(1))
+    assert result.failures == 0
+    # one connection: one request per server delay, minus connect overhead
+    assert 0.5 / DELAY <= result.rate <= 1.0 / DELAY
+    assert result.connection_rate == result.rate
+    assert DELAY <= result.percentile(50) <= 2.5 * DELAY
+    assert result.percentile(50) <= result.percentile(99)
+    assert result.summary()["connection_rate"] == result.rate
+
+
+def test_connection_rate_keeps_single_connection_scale():
+    single = asyncio.run(measure(1))
+    parallel = asyncio.run(measure(8))
+    assert parallel.failures == 0
+    # the raw rate scales with the connections; the reward input does not
+    assert parallel.rate > 4 * single.rate
+    assert parallel.connection_rate == pytest.approx(parallel.rate / 8)
+    assert parallel.connection_rate == pytest.approx(single.connection_rate, rel=0.35)
+
+
+def test_slow_target_lowers_rate():
+    fast = asyncio.run(measure(4, delay=DELAY))
+    slow = asyncio.run(measure(4, delay=5 * DELAY))
+    assert slow.connection_rate < fast.connection_rate / 2.5
+    assert slow.percentile(50) >= 5 * DELAY
+
+
+def test_unreachable_target_counts_failures():
+    async def go():
+        server = await start_stand_in_server()
+        port = server.sockets[0].getsockname()[1]
+        server.close()
+        await server.wait_closed()
+        return await probe("127.0.0.1", port, 0.2, 2, timeout=0.2)
+
+    result = asyncio.run(go())
+    assert result.successes == 0 and result.failures > 0
+    assert result.rate == result.connection_rate == 0.0
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+test_replay_buffer.py - ReplayBuffer state interning, IS weights and weighted batch updates.
+
+Run: python -m pytest -q test_replay_buffer.py
+"""
+
+import numpy as np
+import pytest
+
+from qstore import DenseQStore, DictQStore
+from replay_buffer import ReplayBuffer
+
+
+def test_interned_states_stay_bounded():
+    buf = ReplayBuffer(capacity=50, seed=0)
+    for i in range(5000):
+        buf.add((i, 0, 0), i % 7, float(i), (i + 1, 0, 0))
+    # the 50 live transitions reference states 4950..5000
+    assert buf.n_states() == 51
+    assert len(buf.state_list) <= 2 * buf.capacity
+    idx, states, actions, rewards, next_states, weights = buf.sample(200)
+    for s, a, r, ns in zip(states, actions, rewards, next_states):
+        assert s[0] >= 4950
+        assert ns == (s[0] + 1, 0, 0)
+        assert a == s[0] % 7 and r == s[0]
+    assert np.all(weights == 1.0)
+
+
+def test_shared_states_survive_overwrites():
+    buf = ReplayBuffer(capacity=4, seed=0)
+    for i in range(40):
+        buf.add((i % 3, 0, 0), 0, 0.0, (0, 0, 0))
+    assert buf.n_states() == 3
+    assert sum(buf.refs) == 2 * buf.capacity
+
+
+def test_importance_weights():
+    buf = ReplayBuffer(capacity=8, prioritized=True, alpha=1.0, beta=1.0, seed=0)
+    for i in range(8):
+        buf.add((i, 0, 0), 0, 0.0, (i, 0, 0))
+    buf.update_priorities(range(8), [7.0] + [1.0] * 7)
+    idx, _, _, _, _, weights = buf.sample(64)
+    assert weights.max() == pytest.approx(1.0)
+    # beta=1: weight ~ 1 / P(i), so the 7x more likely transition 0 weighs 1/7
+    assert np.all(weights[idx == 0] == pytest.approx(1.001 / 7.001))
+    assert np.all(weights[idx != 0] == pytest.approx(1.0))
+    # half the draws hit transition 0; the weights undo that for a uniform mean
+    idx, _, _, _, _, weights = buf.sample(20000)
+    values = idx.astype(np.float64)
+    assert values.mean() == pytest.approx(2.0, abs=0.1)
+    assert np.sum(weights * values) / np.sum(weights) == pytest.approx(3.5, abs=0.1)
+
+
+@pytest.mark.parametrize("store_cls", [DictQStore, DenseQStore])
+def test_weighted_batch_update(store_cls):
+    store = store_cls(4)
+    s, ns = (1, 0, 0), (2, 0, 0)
+    store.batch_td_update([s, s], [1, 1], [10.0, 0.0], [ns, ns], alpha=1.0, gamma=0.0)
+    assert store.get(s, 1) == pytest.approx(5.0)
+    store = store_cls(4)
+    store.batch_td_update([s, s], [1, 1], [10.0, 0.0], [ns, ns], alpha=1.0, gamma=0.0,
+                          weights=[1.0, 0.5])
+    # step = (1.0 * 10 + 0.5 * 0 - 1.5 * 0) / 2
+    assert store.get(s, 1) == pytest.approx(5.0)
+    store.batch_td_update([s, s], [1, 1], [10.0, 0.0], [ns, ns], alpha=1.0, gamma=0.0,
+                          weights=[0.5, 1.0])
+    # old=5: step = (0.5 * 10 + 1.0 * 0 - 1.5 * 5) / 2
+    assert store.get(s, 1) == pytest.approx(3.75)
+
+
+def test_vector_states_in_float_rows():
+    buf = ReplayBuffer(capacity=16, prioritized=True, state_dim=3, seed=0)
+    for i in range(1000):
+        x = np.array([i * 0.5, 1.0 / (i + 1), -i])
+        buf.add(x, i % 5, 1.0, x + 1.0)
+    assert buf.n_states() == 0
+    assert buf.states.shape == (16, 3)
+    idx, states, actions, rewards, next_states, weights = buf.sample(32)
+    assert states.shape == next_states.shape == (32, 3)
+    assert np.allclose(next_states, states + 1.0)
+    assert np.all(states[:, 0] >= 984 * 0.5)
+
+
+def test_linear_agent_replay():
+    from attacks import ATTACK_CLASSES
+    from fa_agent import LinearQAgent
+    agent = LinearQAgent(attack_classes=ATTACK_CLASSES, max_combo=1, replay_capacity=8,
+                         replay_k=2, prioritized_replay=True, seed=0)
+    assert agent.replay.state_dim == agent.n_features
+    for i in range(100):
+        agent.update_q((i % 9, i % 2, 0.5 * i), agent.actions[i % 3], 1.0, ((i + 1) % 9, 0, 0))
+    assert len(agent.replay) == 8
+    assert np.allclose(agent.replay.states[(agent.replay.pos - 1) % 8], (99 % 9, 1, 49.5))
+    assert np.all(np.isfinite(agent.W))
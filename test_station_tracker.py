@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+test_station_tracker.py - StationTracker on replayed airodump CSV sequences.
+
+Run: python -m pytest -q test_station_tracker.py
+"""
+
+from station_tracker import parse_station_csv, replay_csv_sequence
+from synthetic import write_airodump_sequence
+
+BSSID = "aa:bb:cc:dd:ee:ff"
+START = 1700000000.0
+
+
+def test_replay_matches_full_parse(tmp_path):
+    paths = write_airodump_sequence(str(tmp_path), bssid=BSSID, steps=6, stations=12,
+                                    drop_every=3, start=START)
+    snapshots = list(replay_csv_sequence(paths, BSSID))
+    assert len(snapshots) == len(paths)
+    for path, macs in zip(paths, snapshots):
+        # every station stays listed (with an old last-seen); the foreign one never counts
+        assert macs == parse_station_csv(path, BSSID)
+        assert len(macs) == 12
+        assert "02:00:00:00:00:01" not in macs
+
+
+def test_replay_counts_station_drops(tmp_path):
+    # every 3rd station stops being seen after the first snapshot
+    paths = write_airodump_sequence(str(tmp_path), bssid=BSSID, steps=6, stations=12,
+                                    drop_every=3, start=START)
+    counts = [len(macs) for macs in replay_csv_sequence(paths, BSSID, since=START + 1)]
+    assert counts == [0, 8, 8, 8, 8, 8]
+
+    everyone = parse_station_csv(paths[0], BSSID)
+    recent = list(replay_csv_sequence(paths, BSSID, since=START + 1))[-1]
+    dropped = everyone - recent
+    assert len(dropped) == 4
+    assert all(mac in everyone for mac in recent)
+
+
+def test_replay_without_drops(tmp_path):
+    paths = write_airodump_sequence(str(tmp_path), bssid=BSSID, steps=4, stations=5,
+                                    drop_every=0, start=START)
+    counts = [len(macs) for macs in replay_csv_sequence(paths, BSSID, since=START + 1)]
+    assert counts == [0, 5, 5, 5]
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+test_supervisor.py - ProcessSupervisor on sleep process groups.
+
+Run: python -m pytest -q test_supervisor.py
+"""
+
+import os
+import time
+
+import pytest
+
+from supervisor import ProcessSupervisor
+
+pytestmark = pytest.mark.skipif(not os.path.isdir("/proc"), reason="needs /proc")
+
+
+def alive(pid):
+    """Running and not a zombie (orphaned grandchildren may wait to be reaped)."""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            return f.read().rsplit(")", 1)[1].split()[0] != "Z"
+    except FileNotFoundError:
+        return False
+
+
+def wait_for_file(path, timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if os.path.exists(path) and open(path).read().strip():
+            return open(path).read().split()
+        time.sleep(0.01)
+    raise AssertionError(f"{path} never written")
+
+
+def group_command(path, ignore_term=False):
+    """sh leading a group with a background sleep child; writes both pids to path."""
+    trap = "trap '' TERM; " if ignore_term else ""
+    return ["sh", "-c", f"{trap}sleep 30 & echo $$ $! > {path}; wait"]
+
+
+def test_stop_terminates_whole_group(tmp_path):
+    sup = ProcessSupervisor(term_timeout=2.0)
+    handle = sup.start(group_command(tmp_path / "pids"))
+    pids = [int(p) for p in wait_for_file(tmp_path / "pids")]
+    assert all(alive(p) for p in pids)
+    sup.stop()
+    assert not any(alive(p) for p in pids)
+    assert not handle.killed and sup.killed == 0
+    assert handle.returncode is not None
+    assert sup.procs == []
+
+
+def test_term_ignored_escalates_to_kill(tmp_path):
+    sup = ProcessSupervisor(term_timeout=0.3)
+    handle = sup.start(group_command(tmp_path / "pids", ignore_term=True))
+    pids = [int(p) for p in wait_for_file(tmp_path / "pids")]
+    elapsed = sup.stop()
+    assert not any(alive(p) for p in pids)
+    assert handle.killed and sup.killed == 1
+    assert 0.3 <= elapsed < 2.0
+    assert sup.summary()["killed"] == 1
+
+
+def test_stop_launched_leaves_others_alone(tmp_path):
+    sup = ProcessSupervisor(term_timeout=0.5)
+    mine = [sup.start(["sleep", "30"]) for _ in range(2)]
+    other = sup.start(group_command(tmp_path / "pids"))
+    outside = ProcessSupervisor().start(["sleep", "30"])
+    other_pids = [int(p) for p in wait_for_file(tmp_path / "pids")]
+    sup.stop(mine)
+    assert not any(h.running() for h in mine)
+    assert other.running() and all(alive(p) for p in other_pids)
+    assert outside.running()
+    assert sup.running() == [other]
+    sup.stop()
+    assert not any(alive(p) for p in other_pids)
+    outside.proc.kill()
+    outside.proc.wait()
+
+
+def test_context_manager_cleans_up_on_error(tmp_path):
+    with pytest.raises(RuntimeError):
+        with ProcessSupervisor(term_timeout=0.3) as sup:
+            handles = [sup.start(["sleep", "30"]),
+                       sup.start(group_command(tmp_path / "pids", ignore_term=True))]
+            pids = [int(p) for p in wait_for_file(tmp_path / "pids")]
+            raise RuntimeError("step failed")
+    assert not any(h.running() for h in handles)
+    assert not any(alive(p) for p in pids)
+    summary = sup.summary()
+    assert summary["start"]["count"] == 2 and summary["stop"]["count"] == 2
+
+
+def test_rejects_shell_strings():
+    with pytest.raises(TypeError):
+        ProcessSupervisor().start("sleep 30")
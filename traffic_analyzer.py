@@ -1,60 +1,89 @@
 import time
-import socket
 import os
 
+from probe import probe, run_probe
+from latency_hist import LatencyHistogram
+from pcap_reader import iter_capture_records, iter_pcap_stream, PcapFormatError
+from frame_parser import classify_frame, frame_fields
+from instrument import traced, count
+
 class TrafficAnalyzer:
     """
     Target Performance Analyzer.
     In addition to pcap analysis (if scapy is used), methods have been added
     for actively measuring baseline and current performance over TCP connections.
     """
-    def __init__(self, pcap_file, bssid):
+    def __init__(self, pcap_file, bssid, engine="native", collect_frames=False,
+                 target=None, port=80, probe_concurrency=8, probe_timeout=1.0):
         self.pcap_file = pcap_file
         self.bssid = bssid.lower()
         self.baseline = None
+        self.target = target or self.bssid
+        self.port = port
+        self.probe_concurrency = probe_concurrency
+        self.probe_timeout = probe_timeout
+        self.last_probe = None
+        self.baseline_latency = None
+        self.latency = LatencyHistogram()
+        self.engine = engine
+        self.collect_frames = collect_frames
+        self.frames = None
+        self.eapol_count = 0
+        self.handshake_detected = False
+        self.packet_count = 0
+        self.fallback_count = 0
+        self.subtype_counts = {}
+        self._layers = None
+        self._l2types = None
 
     def establish_baseline(self, duration=2):
-    """Measures the target's baseline performance through TCP connection attempts."""
-        start = time.time()
-        success_count = 0
-        while time.time() - start < duration:
-            try:
-                s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                s.settimeout(1.0)
-                s.connect((self.bssid, 80))
-                s.send(b"GET / HTTP/1.0\r\nHost: example.com\r\n\r\n")
-                _ = s.recv(1024)
-                success_count += 1
-            except Exception:
-                pass
-            finally:
-                try:
-                    s.close()
-                except:
-                    pass
-        self.baseline = success_count / float(duration)
+        """Measures the target's baseline performance through TCP connection attempts."""
+        result = self._measure(duration)
+        self.baseline = result.connection_rate
+        self.baseline_latency = result.histogram
         return self.baseline
 
+    @traced("probe.get_current_performance")
     def get_current_performance(self, duration=1):
-        start = time.time()
-        success_count = 0
-        while time.time() - start < duration:
-            try:
-                s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                s.settimeout(1.0)
-                s.connect((self.bssid, 80))
-                s.send(b"GET / HTTP/1.0\r\nHost: example.com\r\n\r\n")
-                _ = s.recv(1024)
-                success_count += 1
-            except Exception:
-                pass
-            finally:
-                try:
-                    s.close()
-                except:
-                    pass
-        current_perf = success_count / float(duration)
-        return current_perf
+        return self._measure(duration).connection_rate
+
+    def _measure(self, duration):
+        """
+        Runs the concurrent prober against the target for `duration` seconds.
+        The full result (latency percentiles, failures) is kept in last_probe.
+        """
+        self.last_probe = run_probe(self.target, self.port, duration,
+                                    self.probe_concurrency, self.probe_timeout)
+        self.latency.merge(self.last_probe.histogram)
+        return self.last_probe
+
+    @traced("probe.measure_async")
+    async def measure_async(self, duration):
+        """_measure for callers already running an event loop."""
+        self.last_probe = await probe(self.target, self.port, duration,
+                                      self.probe_concurrency, self.probe_timeout)
+        self.latency.merge(self.last_probe.histogram)
+        return self.last_probe
+
+    def get_reward_inputs(self):
+        """
+        Performance figures of the last probe for reward shaping: throughput
+        (successful requests/s per probe connection, the scale of baseline and
+        the reward) and latency percentiles in seconds, next to the baseline
+        values. self.latency accumulates every probe of the run.
+        """
+        result = self.last_probe
+        base = self.baseline_latency
+        inputs = {
+            "throughput": result.connection_rate if result else None,
+            "total_throughput": result.rate if result else None,
+            "baseline_throughput": self.baseline,
+            "failures": result.failures if result else None,
+        }
+        for p in (50, 95, 99):
+            inputs[f"p{p}"] = result.percentile(p) if result else None
+            inputs[f"baseline_p{p}"] = base.percentile(p) if base else None
+        return inputs
 
     def get_reward(self):
         current_perf = self.get_current_performance(duration=1)
@@ -70,49 +99,229 @@ class TrafficAnalyzer:
         reward = self.get_reward()
         return reward
 
-    def analyze_offline(self):
-
-        try:
-            from scapy.all import rdpcap
-            from scapy.layers.dot11 import Dot11
-            from scapy.layers.eap import EAPOL
-        except ImportError:
-            print("[WARN] Scapy is not instalkled. Offline analysis is not available.")
-            return
+    @traced("capture.analyze_offline")
+    def analyze_offline(self, start=None, end=None):
+        """
+        Analyzes self.pcap_file with the configured engine.
+        "native" classifies frames straight from the pcap record buffers and
+        only hands unclassifiable frames to scapy; "scapy" dissects every
+        packet. Both produce the same get_features() output.
+        start/end restrict the native engine to records beginning in that
+        byte range (see MappedCapture.split).
+        """
         if not self.pcap_file or not os.path.exists(self.pcap_file):
             print(f"[WARN] pcap file {self.pcap_file} not found.")
             return
+        self._reset_counters()
+        if self.engine == "native":
+            try:
+                self._analyze_native(start, end)
+                self.record_counters()
+                return
+            except PcapFormatError:
+                # neither pcap nor pcapng: let scapy try to read it
+                self._reset_counters()
+        self._analyze_scapy()
+        self.record_counters()
+
+    def record_counters(self):
+        """Adds this analysis' packet/fallback/EAPOL counts to the instrument counters."""
+        count("capture.packets", self.packet_count)
+        count("capture.fallback_frames", self.fallback_count)
+        count("capture.eapol", self.eapol_count)
+
+    def _reset_counters(self):
         self.eapol_count = 0
         self.handshake_detected = False
+        self.packet_count = 0
+        self.fallback_count = 0
+        self.subtype_counts = {}
+
+    def _analyze_native(self, start=None, end=None):
+        self._frame_table()
+        process = self.process_record
         try:
-            packets = rdpcap(self.pcap_file)
-            for pkt in packets:
-                self._process_packet(pkt)
+            for ts, linktype, frame in iter_capture_records(self.pcap_file, start, end):
+                process(ts, linktype, frame)
+        except PcapFormatError:
+            raise
         except Exception as e:
             print(f"[ERROR] Reading pcap {self.pcap_file} failed: {e}")
 
-    def _process_packet(self, pkt):
+    def process_record(self, ts, linktype, frame):
+        """Incrementally counts one raw capture record (native engine)."""
+        info = classify_frame(frame, linktype)
+        if info is None:
+            self._process_fallback(frame, linktype)
+            return
+        self._process_frame(info)
+        if self.frames is not None:
+            self._collect_frame(self.frames, ts, frame, linktype, info)
+
+    def start_window(self):
+        """Clears the incremental counters before a new measurement window."""
+        self._reset_counters()
+        self._frame_table()
+
+    def analyze_stream(self, stream, window=None, on_window=None):
+        """
+        Incrementally analyzes a pcap byte stream (`tcpdump -U -w -`, or a pipe
+        fed with a recorded pcap). With window set (seconds of capture time),
+        on_window(index, analyzer) is called whenever a window closes, before
+        the counters restart; the last window closes at end of stream.
+        Returns the number of closed windows.
+        """
+        self.start_window()
+        closed = 0
+        window_end = None
         try:
-            from scapy.layers.dot11 import Dot11
+            for ts, linktype, frame in iter_pcap_stream(stream):
+                if window is not None:
+                    if window_end is None:
+                        window_end = ts + window
+                    while ts >= window_end:
+                        closed = self._close_window(closed, on_window)
+                        window_end += window
+                self.process_record(ts, linktype, frame)
+        except Exception as e:
+            print(f"[ERROR] Reading pcap stream failed: {e}")
+        if window_end is not None:
+            closed = self._close_window(closed, on_window)
+        return closed
+
+    def _close_window(self, index, on_window):
+        if on_window is not None:
+            on_window(index, self)
+        self.start_window()
+        return index + 1
+
+    def _analyze_scapy(self):
+        """
+        Streams the pcap with scapy's PcapReader instead of rdpcap, so memory
+        stays flat regardless of capture size. Dissection is restricted to the
+        radiotap/802.11/LLC/EAPOL layers that _process_packet actually needs.
+        """
+        try:
+            from scapy.all import PcapReader, conf
+            from scapy.layers.dot11 import RadioTap, Dot11, Dot11QoS
+            from scapy.layers.l2 import LLC, SNAP
             from scapy.layers.eap import EAPOL
         except ImportError:
+            print("[WARN] Scapy is not instalkled. Offline analysis is not available.")
+            return
+        self._layers = (Dot11, EAPOL)
+        conf.layers.filter([RadioTap, Dot11, Dot11QoS, LLC, SNAP, EAPOL])
+        try:
+            with PcapReader(self.pcap_file) as reader:
+                for pkt in reader:
+                    self._process_packet(pkt)
+        except Exception as e:
+            print(f"[ERROR] Reading pcap {self.pcap_file} failed: {e}")
+        finally:
+            conf.layers.unfilter()
+
+    def _process_frame(self, info):
+        """Counts a frame classified by frame_parser.classify_frame."""
+        self.packet_count += 1
+        if info[0] is not None:
+            self._count_subtype(info[0], info[1])
+        if info[3]:
+            self._count_eapol()
+
+    def _frame_table(self):
+        """Fresh FrameTable when frame collection is enabled (needs numpy)."""
+        self.frames = None
+        if not self.collect_frames:
+            return None
+        try:
+            from features import FrameTable
+        except ImportError:
+            print("[WARN] NumPy is not installed. Feature vectors are not available.")
+            return None
+        self.frames = FrameTable()
+        return self.frames
+
+    def _collect_frame(self, table, ts, frame, linktype, info):
+        fields = frame_fields(frame, linktype)
+        if fields is None:
             return
+        rssi, retry, src, dst = fields
+        table.append(ts, table.frame_class(info[0], info[1], info[3]), src, dst, rssi, retry)
+
+    def _process_fallback(self, frame, linktype):
+        """Dissects a frame the native parser could not classify with scapy."""
+        self.fallback_count += 1
+        if self._l2types is None:
+            try:
+                from scapy.all import conf, Raw
+            except ImportError:
+                self.packet_count += 1
+                return
+            self._l2types = (conf.l2types, Raw)
+        l2types, Raw = self._l2types
+        cls = l2types.get(linktype, Raw)
+        try:
+            pkt = cls(bytes(frame))
+        except Exception:
+            pkt = Raw(bytes(frame))
+        self._process_packet(pkt)
+
+    def _count_subtype(self, ftype, subtype):
+        key = (ftype, subtype)
+        self.subtype_counts[key] = self.subtype_counts.get(key, 0) + 1
+
+    def _count_eapol(self):
+        self.eapol_count += 1
+        if self.eapol_count > 3:
+            self.handshake_detected = True
+
+    def _process_packet(self, pkt):
+        self.packet_count += 1
+        layers = self._layers
+        if layers is None:
+            try:
+                from scapy.layers.dot11 import Dot11
+                from scapy.layers.eap import EAPOL
+            except ImportError:
+                return
+            layers = self._layers = (Dot11, EAPOL)
+        Dot11, EAPOL = layers
         if pkt.haslayer(Dot11):
-            pass
+            dot11 = pkt[Dot11]
+            self._count_subtype(dot11.type, dot11.subtype)
         if pkt.haslayer(EAPOL):
-            self.eapol_count += 1
-            if self.eapol_count > 3:
-                self.handshake_detected = True
+            self._count_eapol()
 
     def get_features(self):
-    """Returns a dictionary with features obtained during offline analysis."""
+        """Returns a dictionary with features obtained during offline analysis."""
         return {
             "eapol_count": getattr(self, "eapol_count", 0),
             "handshake_detected": int(getattr(self, "handshake_detected", False))
         }
 
+    def get_feature_vector(self, window=0.5):
+        """
+        Fixed-size per-step feature vector (features.FEATURE_NAMES) built from
+        the frames of the last native analysis; requires collect_frames=True.
+        """
+        from features import window_features, N_FEATURES
+        import numpy as np
+        if self.frames is None:
+            return np.zeros(N_FEATURES)
+        return window_features(*self.frames.arrays(), window=window)
+
+    def get_counters(self):
+        """Raw counters of the last analysis, mergeable across chunks (see batch.py)."""
+        return {
+            "packet_count": self.packet_count,
+            "fallback_count": self.fallback_count,
+            "eapol_count": self.eapol_count,
+            "handshake_detected": int(self.handshake_detected),
+            "subtype_counts": dict(self.subtype_counts),
+        }
+
     def reset(self):
-    """Reset analyzer state and recalculate baseline."""
+        """Reset analyzer state and recalculate baseline."""
         if os.path.exists(self.pcap_file):
             os.remove(self.pcap_file)
         self.establish_baseline()
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+vector_env.py - Batched offline training over many environments at once.
+
+VectorSimEnv steps N independent SimulatedEnv-style environments with one
+set of NumPy draws; VectorReplayEnv walks N cursors over a recorded trace.
+train_vectorized() drives either with QLearningAgent semantics: epsilon-
+greedy selection for all N states in one call (random tie-breaking, as in
+select_action), one batched TD update per step (update_q_batch on the dense
+Q-store) and one decay_epsilon per episode of steps_per_episode steps.
+A replay env cannot act out the chosen actions, so there the update is
+off-policy on the logged (state, action) of each record (env.logged).
+
+Run: python vector_env.py --envs 256 --episodes 2000
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from reward import step_reward_array
+from sim_env import ATTACK_MODELS, combo_params
+
+
+def action_tables(action_space, models=None):
+    """combo_params of every rank as three float arrays (stay, share, handshake)."""
+    table = np.array([combo_params(combo, models or ATTACK_MODELS) for combo in action_space],
+                     dtype=np.float64)
+    return table[:, 0], table[:, 1], table[:, 2]
+
+
+class VectorSimEnv:
+    def __init__(self, action_space, n_envs=64, models=None, stations=8,
+                 baseline_throughput=50.0, noise=2.0, reconnect=0.3, seed=None):
+        self.n_envs = n_envs
+        self.stations = stations
+        self.baseline = baseline_throughput
+        self.noise = noise
+        self.reconnect = reconnect
+        self.rng = np.random.default_rng(seed)
+        self.stay, self.share, self.p_handshake = action_tables(action_space, models)
+        self.connected = np.full(n_envs, stations, dtype=np.int64)
+        self.states = None
+
+    def reset(self):
+        """(n_envs, 3) int array of initial states."""
+        self.connected[:] = self.stations
+        self.states = np.zeros((self.n_envs, 3), dtype=np.int64)
+        self.states[:, 0] = self.stations
+        return self.states.copy()
+
+    def step(self, actions):
+        """
+        Plays one step in every env (actions: array of ranks). Returns
+        (next_states, rewards, preds) as arrays.
+        """
+        if self.states is None:
+            self.reset()
+        rng = self.rng
+        knocked = rng.binomial(self.connected, 1.0 - self.stay[actions])
+        new_count = self.connected - knocked
+        handshake = (knocked > 0) & (rng.random(self.n_envs) < self.p_handshake[actions])
+        throughput = np.maximum(self.baseline * self.share[actions]
+                                + rng.normal(0.0, self.noise, self.n_envs), 0.0)
+        effective = np.where(new_count >= self.stations / 2, new_count, 0)
+        rewards = step_reward_array(self.baseline, throughput, self.states[:, 0], effective)
+
+        self.connected = new_count + rng.binomial(self.stations - new_count, self.reconnect)
+        self.states = np.stack([effective, handshake.astype(np.int64),
+                                np.zeros(self.n_envs, dtype=np.int64)], axis=1)
+        return self.states.copy(), rewards, (rewards >= 1.0).astype(np.int8)
+
+
+class VectorReplayEnv:
+    """
+    N cursors replaying a step_trace record array in order, spread over the
+    trace. step() ignores the actions passed in; after each step, logged
+    holds the (states, action ranks) the returned rewards belong to.
+    """
+
+    def __init__(self, records, n_envs=64):
+        if len(records) == 0:
+            raise ValueError("empty trace")
+        self.records = records
+        self.n_envs = n_envs
+        self.pos = None
+        self.states = None
+        self.logged = None
+
+    def reset(self):
+        n = len(self.records)
+        self.pos = (np.arange(self.n_envs) * n // self.n_envs) % n
+        self.states = np.asarray(self.records["state"][self.pos], dtype=np.int64)
+        return self.states.copy()
+
+    def step(self, actions):
+        if self.pos is None:
+            self.reset()
+        rec = self.records[self.pos]
+        self.pos = (self.pos + 1) % len(self.records)
+        self.logged = (np.asarray(rec["state"], dtype=np.int64),
+                       np.asarray(rec["action"], dtype=np.int64))
+        self.states = np.asarray(rec["next_state"], dtype=np.int64)
+        rewards = np.asarray(rec["reward"], dtype=np.float64)
+        return self.states.copy(), rewards, (rewards >= 1.0).astype(np.int8)
+
+
+class _StateRows:
+    """Maps (N, 3) state arrays to dense Q-store rows, interning new states."""
+
+    def __init__(self, store):
+        self.store = store
+        self.rows = {}
+
+    def __call__(self, states):
+        keys = (states[:, 0] << 32) | (states[:, 1] << 16) | states[:, 2]
+        uniq, inverse = np.unique(keys, return_inverse=True)
+        lookup = np.empty(len(uniq), dtype=np.int64)
+        for i, key in enumerate(uniq.tolist()):
+            row = self.rows.get(key)
+            if row is None:
+                row = self.rows[key] = self.store.intern((key >> 32, (key >> 16) & 0xFFFF, key & 0xFFFF))
+            lookup[i] = row
+        return lookup[inverse]
+
+
+def train_vectorized(agent, env, episodes=100, steps_per_episode=3, seed=None):
+    """
+    Trains agent (q_backend="dense") on all envs of a vector env in lockstep.
+    Returns (mean reward per episode, (tp, fn) outcome counts); per-step
+    outcomes go to agent.confusion in bulk, not one by one into agent.history.
+    """
+    if agent.q_backend != "dense":
+        raise ValueError("train_vectorized needs QLearningAgent(q_backend='dense')")
+    rng = np.random.default_rng(seed)
+    store = agent.Q
+    to_rows = _StateRows(store)
+    n_actions = len(agent.actions)
+    rows = to_rows(env.reset())
+    n = len(rows)
+    means = np.zeros(episodes)
+    tp = fn = 0
+    for episode in range(episodes):
+        total = 0.0
+        for _ in range(steps_per_episode):
+            actions = store.best_actions_rows(rows, rng)
+            explore = rng.random(n) < agent.epsilon
+            actions[explore] = rng.integers(0, n_actions, int(explore.sum()))
+            next_states, rewards, preds = env.step(actions)
+            next_rows = to_rows(next_states)
+            logged = getattr(env, "logged", None)
+            if logged is None:
+                store.batch_td_update_rows(rows, actions, rewards, next_rows, agent.alpha, agent.gamma)
+            else:
+                # credit each logged outcome to the logged action that produced it
+                store.batch_td_update_rows(to_rows(logged[0]), logged[1], rewards, next_rows,
+                                           agent.alpha, agent.gamma)
+            rows = next_rows
+            total += rewards.sum()
+            hits = int(preds.sum())
+            tp += hits
+            fn += n - hits
+            agent.confusion.update_many(preds, np.ones(n, dtype=np.int8))
+        means[episode] = total / (n * steps_per_episode)
+        agent.decay_epsilon()
+    return means, (tp, fn)
+
+
+def main():
+    from attacks import ATTACK_CLASSES
+    from ml_core import QLearningAgent
+
+    parser = argparse.ArgumentParser(description="Vectorized Q-learning against N simulated envs.")
+    parser.add_argument("--envs", type=int, default=256)
+    parser.add_argument("--episodes", type=int, default=2000)
+    parser.add_argument("--steps", type=int, default=3, help="steps per episode")
+    parser.add_argument("--alpha", type=float, default=0.1)
+    parser.add_argument("--gamma", type=float, default=0.9)
+    parser.add_argument("--epsilon-decay", type=float, default=0.98)
+    parser.add_argument("--max-combo", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    agent = QLearningAgent(
+        attack_classes=ATTACK_CLASSES,
+        pps_levels=[1, 2], threads_levels=[1, 2], power_levels=[1], duration_levels=[1, 2],
+        max_combo=args.max_combo, alpha=args.alpha, gamma=args.gamma,
+        epsilon_start=0.9, epsilon_end=0.1, epsilon_decay=args.epsilon_decay,
+        q_backend="dense",
+    )
+    env = VectorSimEnv(agent.actions, n_envs=args.envs, seed=args.seed)
+    start = time.perf_counter()
+    means, (tp, fn) = train_vectorized(agent, env, args.episodes, args.steps, seed=args.seed)
+    elapsed = time.perf_counter() - start
+    steps = args.envs * args.episodes * args.steps
+    tail = means[-max(1, len(means) // 10):]
+    print(f"[INFO] {steps} env steps in {elapsed:.2f}s ({steps / elapsed:,.0f} steps/s)")
+    print(f"[INFO] mean reward first episode={means[0]:.2f}, last 10%={tail.mean():.2f}, "
+          f"success rate={tp / max(tp + fn, 1):.2f}")
+    best = agent.get_best_action((env.stations, 0, 0))
+    if best:
+        print("[INFO] Best combo at full association: "
+              + ", ".join(f"{atk.name}(pps={pps}, thr={thr}, dur={dur})" for atk, pps, thr, _, dur in best))
+
+
+if __name__ == "__main__":
+    main()